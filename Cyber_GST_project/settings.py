@@ -40,14 +40,19 @@ CRISPY_TEMPLATE_PACK = "tailwind"
 
 
 MIDDLEWARE = [
+    'Lost_Found.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'Lost_Found.middleware.MediaMiddleware',
+    'Lost_Found.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'Lost_Found.middleware.CampusMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'Lost_Found.middleware.ItemEventMiddleware',
 ]
 
 ROOT_URLCONF = 'Cyber_GST_project.urls'
@@ -77,8 +82,15 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # The database is switched to WAL once, by migration 0016; NORMAL
+            # sync is safe in WAL mode and is a per-connection setting
+            'init_command': 'PRAGMA synchronous=NORMAL;',
+            'timeout': 20,
+        },
     }
 }
+DATABASE_ROUTERS = []
 
 
 # Password validation
@@ -131,6 +143,25 @@ STATICFILES_DIRS = [
 # WhiteNoise static file compression & caching
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Uploaded media (item images), served by Lost_Found/media.py through
+# MediaMiddleware or the `media` route. Uploads have always been written
+# below the project directory (items/), so only MEDIA_SERVE_DIRS are reachable.
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', str(BASE_DIR))
+MEDIA_SERVE_DIRS = ('items',)
+# Uploaded photos are stored upright and at most this many pixels on a side
+# (process_item_image task)
+ITEM_IMAGE_MAX_SIDE = 1600
+MEDIA_MAX_AGE = 3600
+# Content-addressed names (new uploads) never change
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+STORAGES = {
+    'default': {'BACKEND': 'Lost_Found.media.HashedFileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
 
 
 # Default primary key field type
@@ -144,4 +175,200 @@ AUTH_USER_MODEL = 'Lost_Found.User'
 AUTHENTICATION_BACKENDS = [
     'Lost_Found.backends.EmailOrUsernameBackend',  # This should be first
     'django.contrib.auth.backends.ModelBackend',   # This is fallback
-]
\ No newline at end of file
+]
+
+
+# Response compression for dynamic pages (Lost_Found.middleware.CompressionMiddleware).
+# Brotli is used when the optional `brotli` package is installed, gzip otherwise.
+
+COMPRESSION_MIN_SIZE = 512
+COMPRESSION_BROTLI_QUALITY = 4
+
+
+# Metrics
+# Exposed at /metrics for staff users or with "Authorization: Bearer <METRICS_TOKEN>".
+# Set METRICS_DIR to a directory shared by all gunicorn workers so a scrape
+# aggregates every worker (clear it on deploy).
+
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_DIR = os.environ.get('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = 1.0
+
+
+# Logging
+# Records are queued and written as JSON lines by a background thread
+# (see Lost_Found/logs.py). Per-module levels can be overridden with
+# LOG_LEVELS, e.g. LOG_LEVELS="Lost_Found.backends=DEBUG,Lost_Found.views=INFO"
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+
+# Key of the HMAC that logs.mask() writes instead of usernames and emails;
+# changing it breaks correlation with older log lines only
+LOG_MASK_KEY = os.environ.get('LOG_MASK_KEY', SECRET_KEY)
+
+LOG_MODULE_LEVELS = {
+    'Lost_Found.backends': LOG_LEVEL,
+    'Lost_Found.views': LOG_LEVEL,
+}
+for _entry in filter(None, os.environ.get('LOG_LEVELS', '').split(',')):
+    _name, _, _level = _entry.partition('=')
+    LOG_MODULE_LEVELS[_name.strip()] = _level.strip().upper()
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'Lost_Found.logs.JSONFormatter'},
+    },
+    'filters': {
+        'hot_path_sampling': {
+            '()': 'Lost_Found.logs.RateLimitFilter',
+            'burst': 20,
+            'period': 60,
+        },
+    },
+    'handlers': {
+        'queue': {
+            '()': 'Lost_Found.logs.QueueLogHandler',
+            'stream': 'ext://sys.stderr',
+            'formatter': 'json',
+            'filters': ['hot_path_sampling'],
+        },
+    },
+    'root': {
+        'handlers': ['queue'],
+        'level': 'WARNING',
+    },
+    'loggers': {
+        'Lost_Found': {
+            'handlers': ['queue'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+        **{name: {'level': level} for name, level in LOG_MODULE_LEVELS.items()},
+    },
+}
+
+# Campuses (Lost_Found/campus.py)
+# Items, students and departments are kept per campus. DEFAULT_CAMPUS lives in
+# the default database; CAMPUS_DATABASES adds campuses with their own SQLite
+# file, e.g. "kaduna=/srv/afit/kaduna.sqlite3,zaria=/srv/afit/zaria.sqlite3".
+# Create their tables with `manage.py migrate_campuses`. Cross-campus searches
+# query the campuses in parallel on CAMPUS_FANOUT_WORKERS threads.
+
+DEFAULT_CAMPUS = os.environ.get('DEFAULT_CAMPUS', 'main')
+CAMPUSES = {DEFAULT_CAMPUS: 'default'}
+for _entry in filter(None, os.environ.get('CAMPUS_DATABASES', '').split(',')):
+    _code, _, _path = _entry.partition('=')
+    _code = _code.strip().lower()
+    CAMPUSES[_code] = f'campus_{_code}'
+    DATABASES[CAMPUSES[_code]] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': _path.strip(),
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+    }
+CAMPUS_FANOUT_WORKERS = int(os.environ.get('CAMPUS_FANOUT_WORKERS', 4))
+
+# Archive
+# `archive_items` moves returned items older than ARCHIVE_RETURNED_AFTER_DAYS
+# and unresolved items older than ARCHIVE_STALE_AFTER_DAYS from Item into
+# ItemArchive. Set ARCHIVE_DB_PATH to keep the archive in a separate SQLite
+# file. Item ids are only unique within a campus, so every other campus gets
+# its own archive file next to it (archive.sqlite3 -> archive_kaduna.sqlite3).
+# Create the tables with `manage.py migrate_campuses`.
+
+ARCHIVE_RETURNED_AFTER_DAYS = int(os.environ.get('ARCHIVE_RETURNED_AFTER_DAYS', 30))
+ARCHIVE_STALE_AFTER_DAYS = int(os.environ.get('ARCHIVE_STALE_AFTER_DAYS', 365))
+ARCHIVE_DB_PATH = os.environ.get('ARCHIVE_DB_PATH', '')
+# Campus code -> archive database alias; empty keeps ItemArchive with the items
+ARCHIVE_DATABASES = {}
+
+if ARCHIVE_DB_PATH:
+    _root, _ext = os.path.splitext(ARCHIVE_DB_PATH)
+    for _code in CAMPUSES:
+        _default = _code == DEFAULT_CAMPUS
+        ARCHIVE_DATABASES[_code] = 'archive' if _default else f'archive_{_code}'
+        DATABASES[ARCHIVE_DATABASES[_code]] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': ARCHIVE_DB_PATH if _default else f'{_root}_{_code}{_ext}',
+        }
+
+# ArchiveRouter goes first: ItemArchive is a campus table too
+if ARCHIVE_DATABASES:
+    DATABASE_ROUTERS.append('Lost_Found.routers.ArchiveRouter')
+if len(CAMPUSES) > 1:
+    DATABASE_ROUTERS.append('Lost_Found.routers.CampusRouter')
+
+# Email and notifications
+# Owner/finder notifications are queued in the Notification outbox and sent by
+# `manage.py send_notifications`. For local testing use
+# EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend with
+# EMAIL_FILE_PATH, or a debugging SMTP server on EMAIL_HOST/EMAIL_PORT.
+
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 25))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '') == '1'
+EMAIL_FILE_PATH = os.environ.get('EMAIL_FILE_PATH', str(BASE_DIR / 'sent_emails'))
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'AFIT Lost & Found <no-reply@afit.edu.ng>')
+
+NOTIFICATION_BATCH_SIZE = 100
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_RETRY_BASE_SECONDS = 60
+NOTIFICATION_RETRY_MAX_SECONDS = 3600
+
+
+# Background tasks (Lost_Found/tasks.py, `manage.py run_worker`)
+# A running task whose worker has not finished within TASK_VISIBILITY_TIMEOUT
+# seconds is handed to another worker.
+
+TASK_VISIBILITY_TIMEOUT = 300
+TASK_RETRY_BASE_SECONDS = 30
+
+# Reference data (Lost_Found/refdata.py)
+# Departments are cached per process; other workers pick up an edit within
+# REFDATA_CHECK_SECONDS.
+
+REFDATA_CHECK_SECONDS = 5
+
+# Registration availability checks (Lost_Found/availability.py)
+# "Available" answers are cached this long in the default cache (per process
+# unless CACHES points at a shared backend); registration re-checks uncached.
+
+AVAILABILITY_CACHE_SECONDS = 30
+
+# Checks allowed per client IP and window (answered 429 beyond that), and
+# whether the email check may say that an address is registered.
+
+AVAILABILITY_RATE_LIMIT = int(os.environ.get('AVAILABILITY_RATE_LIMIT', 60))
+AVAILABILITY_RATE_WINDOW = 60
+AVAILABILITY_CONFIRM_EMAILS = os.environ.get('AVAILABILITY_CONFIRM_EMAILS', '') == '1'
+
+# Search autocomplete (Lost_Found/autocomplete.py)
+# New items are added to each process's index within AUTOCOMPLETE_CHECK_SECONDS;
+# edits and deletions show up after the next full rebuild.
+
+AUTOCOMPLETE_MIN_CHARS = 2
+AUTOCOMPLETE_CHECK_SECONDS = 5
+AUTOCOMPLETE_REBUILD_SECONDS = 1800
+AUTOCOMPLETE_REFRESH_BATCH = 5000
+AUTOCOMPLETE_MAX_AGE = 60
+
+# Location gazetteer (Lost_Found/gazetteer.py)
+# Default radius of the "found near" filter on the found-item list, in metres.
+
+GAZETTEER_NEAR_RADIUS = 300
+
+# Filter chip counts on the item lists (Lost_Found/facets.py), cached per search
+FACET_CACHE_SECONDS = 60
+
+# Item detail page body (Lost_Found/detail.py), cached per item and item version
+ITEM_DETAIL_CACHE_SECONDS = 300
+
+# Startup (gunicorn.conf.py, Lost_Found/warmup.py)
+# `manage.py bench_startup` fails when loading the WSGI application spends
+# more than this in imports (python -X importtime, median of several runs).
+
+STARTUP_IMPORT_BUDGET_MS = int(os.environ.get('STARTUP_IMPORT_BUDGET_MS', 800))
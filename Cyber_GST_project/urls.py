@@ -1,12 +1,12 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
+
+from Lost_Found import media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Normally answered by MediaMiddleware before URL resolution; this serves media without it
+    path(settings.MEDIA_URL.lstrip('/') + '<path:path>', media.serve, name='media'),
     path('', include('Lost_Found.url'))
-]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+]
\ No newline at end of file
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Cyber_GST_project.settings')
 
 application = get_wsgi_application()
+
+# Compile templates, build the URL resolver and load the reference caches before the first
+# request instead of during it (once in the master when gunicorn preloads; see gunicorn.conf.py)
+from Lost_Found import warmup  # noqa: E402
+
+warmup.run()
@@ -1,12 +1,186 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
 from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count, Q
+from django.utils.functional import cached_property
 from .models import *
+from . import campus
+from .bulk import mark_returned, reassign_claimer, verify_items
+from .exports import export_response
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that estimates the size of unfiltered changelists.
+    
+    An exact COUNT(*) over a table with millions of rows is the slowest query
+    on the changelist. When no filter or search is applied the count is read
+    from table statistics instead (pg_class on PostgreSQL, sqlite_stat1 after
+    ANALYZE on SQLite); filtered changelists, small tables and tables without
+    statistics are counted exactly. Statistics go stale, so a page that comes
+    up short corrects the count, and a page past the real end is answered
+    with the last page.
+    """
+    exact_below = 10000
+    estimated = False
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if getattr(queryset, 'query', None) is not None and not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.exact_below:
+                self.estimated = True
+                return estimate
+        return super().count
+    
+    def _set_count(self, count):
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
+    
+    def page(self, number):
+        page = super().page(number)
+        if not self.estimated or len(page.object_list) == self.per_page:
+            return page
+        self.estimated = False
+        if page.object_list:
+            # The end of the table: no pages are linked after this one
+            self._set_count(page.start_index() - 1 + len(page.object_list))
+            return page
+        self._set_count(Paginator.count.func(self))
+        return super().page(self.num_pages)
+
+
+def estimated_row_count(model, using='default'):
+    """Row count from the database's statistics, or None when it has none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        elif connection.vendor == 'sqlite':
+            # sqlite_stat1 only exists after the first ANALYZE
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            # The first number of each stat is the row count ANALYZE saw
+            cursor.execute('SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl = %s', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist settings shared by the admins of the big tables.
+    
+    search_fields should use prefix (^) and exact (=) lookups, which the
+    NOCASE indexes serve. A search starting with FULL_SEARCH_PREFIX uses
+    full_search_fields instead: substring matches, which scan the table.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    full_search_fields = ()
+    
+    FULL_SEARCH_PREFIX = '~'
+    
+    def _full_search(self, request):
+        term = request.GET.get('q', '').strip()
+        return bool(self.full_search_fields) and term.startswith(self.FULL_SEARCH_PREFIX)
+    
+    def search_text(self, search_term):
+        """The search term without the full-search prefix."""
+        return search_term.strip().removeprefix(self.FULL_SEARCH_PREFIX).strip()
+    
+    def get_search_fields(self, request):
+        if self._full_search(request):
+            return self.full_search_fields
+        return super().get_search_fields(request)
+    
+    def get_search_results(self, request, queryset, search_term):
+        return super().get_search_results(request, queryset, self.search_text(search_term))
+
+
+class CampusTableAdmin(LargeTableAdmin):
+    """Changelist of a per-campus table (campus.py).
+    
+    On a campus with its own database the users are in another database:
+    relations to User are prefetched instead of joined, searches through a
+    user are run on User first and matched by id, and columns ordered
+    through a user are not sortable.
+    """
+    
+    def _joins_users(self):
+        return campus.shares_user_db(self.model)
+    
+    @cached_property
+    def user_relations(self):
+        return {
+            field.name for field in self.model._meta.get_fields()
+            if field.is_relation and field.concrete and field.related_model is User
+        }
+    
+    def _through_user(self, lookup):
+        relation, _, rest = lookup.lstrip('-^=@').partition('__')
+        return relation in self.user_relations and bool(rest)
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if self._joins_users():
+            return queryset
+        return queryset.prefetch_related(*(name for name in self.list_select_related if name in self.user_relations))
+    
+    def get_list_select_related(self, request):
+        if self._joins_users():
+            return self.list_select_related
+        return tuple(name for name in self.list_select_related if name not in self.user_relations)
+    
+    def get_search_fields(self, request):
+        fields = super().get_search_fields(request)
+        if self._joins_users():
+            return fields
+        return tuple(field for field in fields if not self._through_user(field))
+    
+    def get_search_results(self, request, queryset, search_term):
+        if self._joins_users() or not self.search_text(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        if self.get_search_fields(request):
+            results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        else:
+            results, may_have_duplicates = queryset.none(), False
+        term = self.search_text(search_term)
+        lookups = {'^': 'istartswith', '=': 'iexact'}
+        for field in super().get_search_fields(request):
+            if not self._through_user(field):
+                continue
+            relation, _, user_field = field.lstrip('^=@').partition('__')
+            condition = Q(**{f"{user_field}__{lookups.get(field[0], 'icontains')}": term})
+            ids = list(User.objects.filter(condition).values_list('pk', flat=True)[:1000])
+            results = results | queryset.filter(**{f'{relation}__in': ids})
+        return results, may_have_duplicates
+    
+    def get_sortable_by(self, request):
+        sortable = super().get_sortable_by(request)
+        if self._joins_users():
+            return sortable
+        return [name for name in sortable if not self._sorts_through_user(name)]
+    
+    def _sorts_through_user(self, name):
+        column = getattr(self, name, None) if isinstance(name, str) else name
+        order_field = getattr(column, 'admin_order_field', None)
+        return isinstance(order_field, str) and self._through_user(order_field)
+
 
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(LargeTableAdmin, UserAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'user_type', 'is_verified', 'date_joined')
     list_filter = ('user_type', 'is_verified', 'date_joined')
-    search_fields = ('username', 'email', 'first_name', 'last_name')
+    # Prefix/exact lookups only, so the NOCASE indexes are used (also serves the autocomplete widgets)
+    search_fields = ('^username', '^email', '^last_name')
+    full_search_fields = ('username', 'email', 'first_name', 'last_name')
+    search_help_text = 'Matches the start of the username, email or last name. Start with ~ to match anywhere (slower).'
     fieldsets = UserAdmin.fieldsets + (
         ('AFIT Information', {'fields': ('user_type', 'phone_number', 'is_verified')}),
     )
@@ -21,12 +195,40 @@ class DepartmentAdmin(admin.ModelAdmin):
     search_fields = ('name', 'code')
     ordering = ('name',)
 
+class LocationAliasInline(admin.TabularInline):
+    model = LocationAlias
+    fields = ('alias', 'key')
+    readonly_fields = ('key',)
+    extra = 1
+
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'latitude', 'longitude', 'geohash', 'alias_count')
+    search_fields = ('name', 'aliases__alias')
+    readonly_fields = ('geohash',)
+    ordering = ('name',)
+    inlines = (LocationAliasInline,)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(alias_total=Count('aliases'))
+    
+    def alias_count(self, obj):
+        return obj.alias_total
+    alias_count.short_description = 'Aliases'
+    alias_count.admin_order_field = 'alias_total'
+
 @admin.register(Student)
-class StudentAdmin(admin.ModelAdmin):
+class StudentAdmin(CampusTableAdmin):
     list_display = ('matric_no', 'user_full_name', 'department', 'level', 'email')
     list_filter = ('department', 'level')
-    search_fields = ('matric_no', 'user__username', 'user__email', 'user__first_name', 'user__last_name')
+    list_select_related = ('user', 'department')
+    search_fields = ('^matric_no', '=user__username', '=user__email', '^user__last_name')
+    full_search_fields = ('matric_no', 'user__username', 'user__email', 'user__first_name', 'user__last_name')
+    search_help_text = ('Matches the start of the matric number or last name, or an exact username or email. '
+                        'Start with ~ to match anywhere (slower).')
+    autocomplete_fields = ('user',)
     ordering = ('matric_no',)
+    actions = ('export_csv', 'export_jsonl')
     
     def user_full_name(self, obj):
         return obj.user.get_full_name()
@@ -37,22 +239,42 @@ class StudentAdmin(admin.ModelAdmin):
         return obj.user.email
     email.short_description = 'Email'
     email.admin_order_field = 'user__email'
+    
+    def export_csv(self, request, queryset):
+        return export_response(queryset, 'students', 'csv')
+    export_csv.short_description = 'Export selected students as CSV'
+    
+    def export_jsonl(self, request, queryset):
+        return export_response(queryset, 'students', 'jsonl')
+    export_jsonl.short_description = 'Export selected students as JSONL'
+
+class ItemActionForm(ActionForm):
+    claimer = forms.CharField(required=False, label='Claimer username',
+                              help_text='Used by "Reassign claimer".')
 
 @admin.register(Item)
-class ItemAdmin(admin.ModelAdmin):
+class ItemAdmin(CampusTableAdmin):
     list_display = ('title', 'category', 'status', 'reported_by', 'date_reported', 'is_verified')
     list_filter = ('category', 'status', 'is_verified', 'date_reported')
-    search_fields = ('title', 'description', 'reported_by__username')
-    readonly_fields = ('date_reported',)
+    list_select_related = ('reported_by',)
+    search_fields = ('^title', '=reported_by__username', '=reported_by__email')
+    full_search_fields = ('title', 'description', 'reported_by__username', 'reported_by__email')
+    search_help_text = ('Matches the start of the title, or an exact reporter username or email. '
+                        'Start with ~ to match anywhere in the title, description or reporter (slower).')
     date_hierarchy = 'date_reported'
+    autocomplete_fields = ('reported_by', 'claimed_by', 'verified_by')
+    readonly_fields = ('date_reported', 'found_place', 'lost_place')
     ordering = ('-date_reported',)
+    action_form = ItemActionForm
+    actions = ('verify_selected', 'mark_returned', 'reassign_claimer', 'export_csv', 'export_jsonl')
     
     fieldsets = (
         ('Item Details', {
             'fields': ('title', 'description', 'category', 'status')
         }),
         ('Location Information', {
-            'fields': ('location_found', 'location_lost')
+            'fields': ('location_found', 'location_lost', 'found_place', 'lost_place'),
+            'description': 'Places are matched from the location text through the gazetteer when the item is saved.',
         }),
         ('Date & Time', {
             'fields': ('date_occurred', 'date_reported')
@@ -70,4 +292,61 @@ class ItemAdmin(admin.ModelAdmin):
             'fields': ('is_verified', 'verified_by')
         }),
     )
+    
+    def _report(self, request, verb, updated, skipped):
+        self.message_user(request, f'{updated} item(s) {verb}; {skipped} skipped (already done or not eligible).')
+    
+    def verify_selected(self, request, queryset):
+        self._report(request, 'verified', *verify_items(queryset, request.user))
+    verify_selected.short_description = 'Verify selected items'
+    
+    def mark_returned(self, request, queryset):
+        self._report(request, 'marked returned', *mark_returned(queryset, request.user))
+    mark_returned.short_description = 'Mark selected items as returned'
+    
+    def reassign_claimer(self, request, queryset):
+        username = request.POST.get('claimer', '').strip()
+        claimer = User.objects.filter(username=username).first() if username else None
+        if claimer is None:
+            self.message_user(request, 'Enter the username of an existing user as the claimer.', messages.ERROR)
+            return
+        self._report(request, f'reassigned to {claimer.username}', *reassign_claimer(queryset, claimer, request.user))
+    reassign_claimer.short_description = 'Reassign claimer of selected items'
+    
+    def export_csv(self, request, queryset):
+        return export_response(queryset, 'items', 'csv')
+    export_csv.short_description = 'Export selected items as CSV'
+    
+    def export_jsonl(self, request, queryset):
+        return export_response(queryset, 'items', 'jsonl')
+    export_jsonl.short_description = 'Export selected items as JSONL'
 
+@admin.register(ItemArchive)
+class ItemArchiveAdmin(LargeTableAdmin):
+    list_display = ('title', 'category', 'status', 'reported_by_id', 'date_reported', 'archived_at')
+    list_filter = ('category', 'status')
+    search_fields = ('^title', '=id')
+    full_search_fields = ('title', 'description')
+    search_help_text = 'Matches the start of the title, or an exact id. Start with ~ to match anywhere (slower).'
+    ordering = ('-date_reported',)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(ItemAudit)
+class ItemAuditAdmin(CampusTableAdmin):
+    list_display = ('item_id', 'action', 'actor', 'old_value', 'new_value', 'created_at')
+    list_filter = ('action',)
+    # item_id only: audit rows outlive archived items
+    list_select_related = ('actor',)
+    raw_id_fields = ('item', 'actor')
+    ordering = ('-created_at',)
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,288 @@
+# Lost_Found/api.py
+"""
+Read-only JSON API for items (v1).
+
+    GET api/v1/items/?status=lost|found&search=&category=&date=&claim=
+    GET api/v1/items/search/?q=...          (lost and found together)
+    GET api/v1/items/search/?q=...&campus=all   (every campus, see below)
+    GET api/v1/items/stats/
+    GET api/v1/items/suggest/?q=lap&limit=8  (autocomplete)
+    GET api/v1/items/<id>/
+    GET api/v1/accounts/available/<username|email|matric_no>/?value=...
+
+Lists accept ?fields=id,title,... (sparse fieldsets), ?limit= (max 100) and
+?cursor= (the `next` value of the previous page). With ?include_archived=1
+lists continue into ItemArchive once the live items run out, the detail view
+falls back to it, and every row carries "archived": true/false. Rows are read with
+.values().iterator() and written to a StreamingHttpResponse one at a time,
+so no model instances or result lists are built. Responses carry the same
+ETag / Last-Modified validators as the HTML lists.
+
+Lists read the active campus (?campus=<code>, see campus.py). A search with
+?campus=all asks every campus database for its newest matches in parallel
+(campus.fan_out) and merges them by date_reported; its rows carry
+"campus": code and its cursors apply to every campus.
+"""
+import json
+from functools import wraps
+
+from django.db.models import Count
+from django.http import JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import require_GET
+
+from . import autocomplete, availability, campus
+from .conditional import item_page_conditional
+from .filters import after_cursor, filter_items, list_filters, make_cursor
+from .models import Item, ItemArchive
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+# Cursors into the archive part of an include_archived listing
+ARCHIVE_CURSOR_PREFIX = 'a.'
+
+# ?campus= value of a search over every campus
+ALL_CAMPUSES = 'all'
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _media_url(value):
+    return default_storage.url(value) if value else None
+
+
+# API field name -> (column read with .values(), converter)
+FIELDS = {
+    'id': ('id', None),
+    'title': ('title', None),
+    'description': ('description', None),
+    'category': ('category', None),
+    'status': ('status', None),
+    'location_lost': ('location_lost', None),
+    'location_found': ('location_found', None),
+    'date_reported': ('date_reported', _isoformat),
+    'date_occurred': ('date_occurred', _isoformat),
+    'date_claimed': ('date_claimed', _isoformat),
+    'image': ('image', _media_url),
+    'reported_by': ('reported_by_id', None),
+    'claimed': ('claimed_by_id', lambda value: value is not None),
+    'is_verified': ('is_verified', None),
+}
+
+
+class FieldError(ValueError):
+    pass
+
+
+def api_login_required(view_func):
+    """Like login_required, but answers 401 JSON instead of redirecting."""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required.'}, status=401)
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def requested_fields(request):
+    raw = request.GET.get('fields', '')
+    if not raw:
+        return list(FIELDS)
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in FIELDS]
+    if unknown:
+        raise FieldError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def include_archived(request):
+    return request.GET.get('include_archived') in ('1', 'true', 'yes')
+
+
+def serialize_row(row, fields, extra=None):
+    data = dict(extra) if extra else {}
+    for name in fields:
+        column, convert = FIELDS[name]
+        value = row[column]
+        data[name] = convert(value) if convert else value
+    return data
+
+
+def stream_page(queryset, fields, cursor=None, limit=DEFAULT_LIMIT, extra=None, cursor_prefix='', then=None):
+    """Yield a JSON page {"results": [...], "next": cursor} row by row.
+
+    Next cursors get `cursor_prefix`; when the queryset is exhausted `next`
+    is `then` (where a listing continues, e.g. into the archive).
+    """
+    columns = {FIELDS[name][0] for name in fields} | {'id', 'date_reported'}
+    rows = after_cursor(queryset, cursor).values(*columns)[:limit + 1].iterator(chunk_size=limit + 1)
+
+    yield '{"results":['
+    last = None
+    next_cursor = then
+    for index, row in enumerate(rows):
+        if index == limit:
+            next_cursor = cursor_prefix + make_cursor(last['date_reported'], last['id'])
+            break
+        yield (',' if index else '') + json.dumps(serialize_row(row, fields, extra), separators=(',', ':'))
+        last = row
+    yield '],"next":' + json.dumps(next_cursor) + '}'
+
+
+def _page_params(request):
+    """(fields, limit), or a 400 response for invalid ones."""
+    try:
+        fields = requested_fields(request)
+        limit = min(max(int(request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except FieldError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    except ValueError:
+        return JsonResponse({'error': 'limit must be an integer.'}, status=400)
+    return fields, limit
+
+
+def _list_response(request, queryset, archived_queryset=None):
+    params = _page_params(request)
+    if isinstance(params, JsonResponse):
+        return params
+    fields, limit = params
+
+    cursor = request.GET.get('cursor')
+    if archived_queryset is None:
+        page = stream_page(queryset, fields, cursor, limit)
+    elif cursor and cursor.startswith(ARCHIVE_CURSOR_PREFIX):
+        page = stream_page(archived_queryset, fields, cursor[len(ARCHIVE_CURSOR_PREFIX):], limit,
+                           extra={'archived': True}, cursor_prefix=ARCHIVE_CURSOR_PREFIX)
+    else:
+        page = stream_page(queryset, fields, cursor, limit,
+                           extra={'archived': False}, then=ARCHIVE_CURSOR_PREFIX)
+
+    return StreamingHttpResponse(page, content_type='application/json')
+
+
+# ================= VIEWS ==================
+
+@api_login_required
+@item_page_conditional
+def item_list(request):
+    status = request.GET.get('status', 'lost')
+    if status not in ('lost', 'found'):
+        return JsonResponse({'error': 'status must be "lost" or "found".'}, status=400)
+    filters = list_filters(request.GET)
+    archived = filter_items(status, filters, ItemArchive.objects.all()) if include_archived(request) else None
+    return _list_response(request, filter_items(status, filters), archived)
+
+
+@api_login_required
+@item_page_conditional
+def item_search(request):
+    filters = list_filters(request.GET)
+    filters['search'] = request.GET.get('q', '').strip()
+    if not filters['search']:
+        return JsonResponse({'error': 'q is required.'}, status=400)
+    if request.GET.get('campus') == ALL_CAMPUSES:
+        if include_archived(request):
+            return JsonResponse({'error': 'include_archived cannot be combined with campus=all.'}, status=400)
+        return _search_all_campuses(request, filters)
+    archived = filter_items(None, filters, ItemArchive.objects.all()) if include_archived(request) else None
+    return _list_response(request, filter_items(None, filters), archived)
+
+
+def _search_all_campuses(request, filters):
+    params = _page_params(request)
+    if isinstance(params, JsonResponse):
+        return params
+    fields, limit = params
+    cursor = request.GET.get('cursor')
+    columns = {FIELDS[name][0] for name in fields} | {'id', 'date_reported'}
+
+    def newest():
+        # One page per campus is enough: the merged page cannot take more than that from any one
+        return list(after_cursor(filter_items(None, filters), cursor).values(*columns)[:limit + 1])
+
+    merged = campus.merge_recent(campus.fan_out(newest), limit + 1)
+    next_cursor = None
+    if len(merged) > limit:
+        last = merged[limit - 1][1]
+        next_cursor = make_cursor(last['date_reported'], last['id'])
+    return JsonResponse({
+        'results': [serialize_row(row, fields, {'campus': code}) for code, row in merged[:limit]],
+        'next': next_cursor,
+    })
+
+
+@api_login_required
+@item_page_conditional
+def item_detail(request, item_id):
+    try:
+        fields = requested_fields(request)
+    except FieldError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    columns = {FIELDS[name][0] for name in fields}
+    row = Item.objects.filter(id=item_id).values(*columns).first()
+    if not include_archived(request):
+        extra = None
+    elif row is not None:
+        extra = {'archived': False}
+    else:
+        row = ItemArchive.objects.filter(id=item_id).values(*columns).first()
+        extra = {'archived': True}
+    if row is None:
+        return JsonResponse({'error': 'Item not found.'}, status=404)
+    return JsonResponse(serialize_row(row, fields, extra))
+
+
+@api_login_required
+@item_page_conditional
+def item_stats(request):
+    by_status = {}
+    by_category = {}
+    total = 0
+    # One grouped query for every (status, category) pair
+    for row in Item.objects.order_by().values('status', 'category').annotate(n=Count('id')):
+        by_status[row['status']] = by_status.get(row['status'], 0) + row['n']
+        by_category[row['category']] = by_category.get(row['category'], 0) + row['n']
+        total += row['n']
+
+    return JsonResponse({
+        'total': total,
+        'by_status': by_status,
+        'by_category': by_category,
+    })
+
+
+@api_login_required
+def item_suggest(request):
+    """Autocomplete for the search boxes: title words, locations and categories by prefix."""
+    try:
+        limit = min(max(int(request.GET.get('limit', 8)), 1), 20)
+    except ValueError:
+        limit = 8
+    query = request.GET.get('q', '').strip()
+    suggestions = autocomplete.suggest(query, limit) if len(query) >= settings.AUTOCOMPLETE_MIN_CHARS else []
+    response = JsonResponse({'query': query, 'suggestions': suggestions})
+    # Same prefix, same answer for a while; typing back and forth hits the browser cache
+    patch_cache_control(response, private=True, max_age=settings.AUTOCOMPLETE_MAX_AGE)
+    patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+# ================= ACCOUNTS ==================
+
+@require_GET
+def account_availability(request, field):
+    """Live check for the registration form; no login required."""
+    if field not in availability.FIELDS:
+        return JsonResponse({'error': f'Unknown field "{field}".'}, status=404)
+    if not availability.allow(request.META.get('REMOTE_ADDR', '')):
+        response = JsonResponse({'error': 'Too many checks; try again shortly.'}, status=429)
+        response['Retry-After'] = str(settings.AVAILABILITY_RATE_WINDOW)
+        return response
+    available, message = availability.check(field, request.GET.get('value', ''))
+    return JsonResponse({'field': field, 'available': available, 'message': message})
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LostFoundConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Lost_Found'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,125 @@
+# Lost_Found/archive.py
+"""
+Hot/cold split for items.
+
+Returned items and items nobody has resolved for a long time are moved from
+Item into ItemArchive, a chunk at a time: each chunk is copied with
+bulk_create and deleted from Item inside a transaction (one per database
+when the archive lives in its own file). An item whose row is already in
+the archive (an interrupted run) is only deleted; one whose id is taken by
+a different archived row stays in Item, so an interrupted run can simply
+be started again and nothing is lost. Each campus has its own archive.
+
+Archived rows keep their id and column names, so filter_items() and the API
+serializers work on ItemArchive unchanged; the API opts in with
+?include_archived=1.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .conditional import ITEM_MARKER
+from .models import ChangeMarker, Item, ItemArchive
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+ARCHIVED_FIELDS = [field.attname for field in ItemArchive._meta.concrete_fields if field.name != 'archived_at']
+
+
+def archivable(now=None, returned_after=None, stale_after=None):
+    """Items due for archiving: returned ones past the grace period, and anything too old."""
+    now = now or timezone.now()
+    if returned_after is None:
+        returned_after = settings.ARCHIVE_RETURNED_AFTER_DAYS
+    if stale_after is None:
+        stale_after = settings.ARCHIVE_STALE_AFTER_DAYS
+    returned_before = now - timedelta(days=returned_after)
+    return Item.objects.filter(
+        Q(status='returned', date_reported__lt=returned_before) &
+        (Q(date_claimed__isnull=True) | Q(date_claimed__lt=returned_before)) |
+        Q(date_reported__lt=now - timedelta(days=stale_after))
+    )
+
+
+def archive_chunk(ids):
+    """Copy the given items to ItemArchive and delete them from Item; returns rows moved.
+
+    Only items whose archived copy is in place are deleted.
+    """
+    rows = list(Item.objects.filter(pk__in=ids).values(*ARCHIVED_FIELDS))
+    if not rows:
+        return 0
+    now = timezone.now()
+    archive_db = router.db_for_write(ItemArchive)
+    item_db = router.db_for_write(Item)
+    with transaction.atomic(using=item_db), transaction.atomic(using=archive_db):
+        archived = dict(
+            ItemArchive.objects.using(archive_db)
+            .filter(pk__in=[row['id'] for row in rows])
+            .values_list('pk', 'date_reported')
+        )
+        ItemArchive.objects.using(archive_db).bulk_create(
+            [ItemArchive(archived_at=now, **row) for row in rows if row['id'] not in archived]
+        )
+        # An archived row with this id and date is this item, copied by an interrupted run
+        copied = [
+            row['id'] for row in rows
+            if row['id'] not in archived or archived[row['id']] == row['date_reported']
+        ]
+        skipped = len(rows) - len(copied)
+        if skipped:
+            logger.warning("Not archiving %d items: their ids are taken by other archived rows", skipped)
+        moved = _delete_rows(Item, copied, item_db)
+    return moved
+
+
+def _delete_rows(model, ids, using):
+    """DELETE the rows by id with plain SQL; returns the number deleted.
+
+    QuerySet.delete() would send post_delete per row, and each one bumps the
+    ChangeMarker; archive_items() bumps it once per run instead. Nothing
+    cascades from Item (the tables that point at it carry no constraint).
+    """
+    if not ids:
+        return 0
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({", ".join(["%s"] * len(ids))})', ids)
+        return cursor.rowcount
+
+
+def archive_items(queryset=None, chunk_size=DEFAULT_CHUNK_SIZE, limit=None, on_chunk=None):
+    """Archive `queryset` (default: archivable()) in chunks; returns the number moved."""
+    queryset = archivable() if queryset is None else queryset
+    moved = 0
+    last_id = 0
+    while limit is None or moved < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - moved)
+        # Keyset over pk: items archive_chunk() leaves behind are not picked again
+        ids = list(queryset.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:size])
+        if not ids:
+            break
+        last_id = ids[-1]
+        moved += archive_chunk(ids)
+        if on_chunk:
+            on_chunk(moved)
+    if moved:
+        ChangeMarker.bump(ITEM_MARKER)
+        analyze(Item)
+    return moved
+
+
+def analyze(model):
+    """Refresh SQLite's statistics for `model`'s table (the admin's row estimate reads them)."""
+    connection = connections[router.db_for_write(model)]
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
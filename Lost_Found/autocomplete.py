@@ -0,0 +1,256 @@
+# Lost_Found/autocomplete.py
+"""
+Prefix index behind the search box autocomplete.
+
+Suggestions come from the words of item titles, the location_lost /
+location_found values and the category labels. Each process keeps them as
+one sorted list of keys. A lookup bisects to the prefix range and returns
+the most frequent entries in it, so its cost depends on how many distinct
+terms share the prefix, not on how many items exist.
+
+The index is built once per process and campus (campus.py). Titles are grouped in SQL, so a title
+shared by many items is split into words only once. After that:
+
+    - new items: when the `item` ChangeMarker has moved (checked at most every
+      AUTOCOMPLETE_CHECK_SECONDS), rows with an id above the highest indexed
+      id are added in place
+    - edits, deletions, archiving: picked up by a full rebuild in a background
+      thread every AUTOCOMPLETE_REBUILD_SECONDS
+"""
+import heapq
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Count, Max
+
+from . import campus
+from .conditional import ITEM_MARKER
+from .models import ChangeMarker, Item
+from .refdata import CATEGORY_CHOICES
+from .rollups import normalize_location
+
+logger = logging.getLogger(__name__)
+
+MIN_WORD_LENGTH = 2
+# Prefixes matching more keys than this have their answers memoized until the next change
+WIDE_RANGE = 1000
+STOPWORDS = frozenset({'a', 'an', 'and', 'at', 'for', 'in', 'my', 'of', 'on', 'the', 'to', 'with'})
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+# Sorts after every character that can appear in a key
+_PREFIX_END = '\U0010ffff'
+
+CATEGORY_LABELS = dict(CATEGORY_CHOICES)
+
+# Entry fields
+TEXT, KIND, COUNT, VALUE = range(4)
+
+
+def normalize(value):
+    return ' '.join((value or '').lower().split())
+
+
+def title_words(title):
+    return {
+        word for word in _WORD_RE.findall((title or '').lower())
+        # Bare numbers (serials, years) make poor completions
+        if len(word) >= MIN_WORD_LENGTH and word not in STOPWORDS and not word.isdigit()
+    }
+
+
+def _match_keys(kind, text):
+    """Keys an entry is found under: the whole text, and for locations every later word."""
+    norm = normalize(text)
+    words = norm.split(' ')
+    matches = [norm] if kind != 'location' else [' '.join(words[i:]) for i in range(len(words))]
+    return [f'{match}\x00{kind}\x00{norm}' for match in matches]
+
+
+class SuggestionIndex:
+    """Sorted keys -> shared entries [text, kind, count, value]."""
+
+    def __init__(self):
+        self.keys = []
+        self.by_key = {}
+        self.entries = {}
+        self.wide = {}
+        self.max_id = 0
+        self.version = None
+        self.built_at = time.monotonic()
+
+    def add(self, kind, text, count=1, value=None, sort=True):
+        """Add `count` occurrences; with sort=False call finish() once at the end."""
+        text = ' '.join(text.split())
+        if not text:
+            return
+        self.wide.clear()
+        entry = self.entries.get((kind, text.lower()))
+        if entry is not None:
+            entry[COUNT] += count
+            return
+        entry = self.entries[(kind, text.lower())] = [text, kind, count, value]
+        for key in _match_keys(kind, text):
+            if key not in self.by_key:
+                self.by_key[key] = entry
+                if sort:
+                    insort(self.keys, key)
+
+    def finish(self):
+        self.keys = sorted(self.by_key)
+        return self
+
+    def add_item(self, title, location_lost, location_found, category):
+        for word in title_words(title):
+            self.add('title', word)
+        for location in {normalize_location(location_lost), normalize_location(location_found)} - {''}:
+            self.add('location', location)
+        if category in CATEGORY_LABELS:
+            self.add('category', CATEGORY_LABELS[category], value=category)
+
+    def suggest(self, prefix, limit=8):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        keys = self.keys
+        lo = bisect_left(keys, prefix)
+        hi = bisect_left(keys, prefix + _PREFIX_END, lo)
+        if hi - lo > WIDE_RANGE:
+            cached = self.wide.get((prefix, limit))
+            if cached is None:
+                cached = self.wide[(prefix, limit)] = self._top(keys[lo:hi], limit)
+            return cached
+        return self._top(keys[lo:hi], limit)
+
+    def _top(self, keys, limit):
+        by_key = self.by_key
+        # A location can sit under several keys of the same prefix; ask for spares
+        best = heapq.nlargest(limit * 2, (by_key[key] for key in keys), key=itemgetter(COUNT))
+        seen = set()
+        suggestions = []
+        for entry in best:
+            if id(entry) in seen:
+                continue
+            seen.add(id(entry))
+            suggestion = {'text': entry[TEXT], 'kind': entry[KIND], 'count': entry[COUNT]}
+            if entry[VALUE] is not None:
+                suggestion['value'] = entry[VALUE]
+            suggestions.append(suggestion)
+            if len(suggestions) == limit:
+                break
+        return suggestions
+
+
+# ================= BUILDING ==================
+
+def _marker_version():
+    return ChangeMarker.objects.filter(name=ITEM_MARKER).values_list('version', flat=True).first() or 0
+
+
+def build():
+    """Full index from the Item table (grouped queries)."""
+    started = time.perf_counter()
+    index = SuggestionIndex()
+    index.version = _marker_version()
+    index.max_id = Item.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    items = Item.objects.filter(id__lte=index.max_id).order_by()
+
+    words = Counter()
+    for title, n in items.values_list('title').annotate(n=Count('id')).iterator(chunk_size=5000):
+        for word in title_words(title):
+            words[word] += n
+    for word, n in words.items():
+        index.add('title', word, n, sort=False)
+
+    for field in ('location_lost', 'location_found'):
+        for location, n in items.exclude(**{field: ''}).values_list(field).annotate(n=Count('id')).iterator(chunk_size=5000):
+            index.add('location', normalize_location(location), n, sort=False)
+
+    category_counts = dict(items.values_list('category').annotate(n=Count('id')))
+    for value, label in CATEGORY_CHOICES:
+        index.add('category', label, category_counts.get(value, 0), value=value, sort=False)
+
+    index.finish()
+    logger.info("Autocomplete index built", extra={
+        'terms': len(index.entries), 'keys': len(index.keys),
+        'duration_ms': round((time.perf_counter() - started) * 1000),
+    })
+    return index
+
+
+def refresh(index):
+    """Add items created since the index was built or last refreshed."""
+    version = _marker_version()
+    if version == index.version:
+        return
+    batch = settings.AUTOCOMPLETE_REFRESH_BATCH
+    rows = list(
+        Item.objects.filter(id__gt=index.max_id).order_by('id')
+        .values_list('id', 'title', 'location_lost', 'location_found', 'category')[:batch]
+    )
+    for pk, title, location_lost, location_found, category in rows:
+        index.add_item(title, location_lost, location_found, category)
+        index.max_id = pk
+    # A full batch may have more behind it; keep the old version so the next check continues
+    if len(rows) < batch:
+        index.version = version
+
+
+# ================= PROCESS CACHE ==================
+
+_lock = threading.Lock()
+# Per campus (campus.py): code -> index, last refresh check
+_indexes = {}
+_checked_at = {}
+_rebuilding = set()
+
+
+def _rebuild_in_background(code):
+    try:
+        with campus.using_campus(code):
+            index = build()
+        with _lock:
+            _indexes[code] = index
+            _checked_at[code] = time.monotonic()
+    except DatabaseError:
+        logger.exception("Autocomplete rebuild failed")
+    finally:
+        _rebuilding.discard(code)
+        campus.close_connections(code)
+
+
+def current():
+    code = campus.active()
+    now = time.monotonic()
+    with _lock:
+        index = _indexes.get(code)
+        if index is None:
+            index = _indexes[code] = build()
+            _checked_at[code] = now
+        elif now - _checked_at[code] >= settings.AUTOCOMPLETE_CHECK_SECONDS:
+            refresh(index)
+            _checked_at[code] = now
+        if code not in _rebuilding and now - index.built_at >= settings.AUTOCOMPLETE_REBUILD_SECONDS:
+            _rebuilding.add(code)
+            threading.Thread(target=_rebuild_in_background, args=(code,), name='autocomplete-rebuild', daemon=True).start()
+    return index
+
+
+def suggest(prefix, limit=8):
+    return current().suggest(prefix, limit)
+
+
+def warm():
+    """Build every campus's index ahead of the first request; skipped if the tables do not exist yet."""
+    for code in campus.campuses():
+        try:
+            with campus.using_campus(code):
+                current()
+        except DatabaseError as e:
+            logger.warning("Autocomplete index not preloaded", extra={'campus': code, 'error': str(e)})
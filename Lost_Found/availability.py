@@ -0,0 +1,110 @@
+# Lost_Found/availability.py
+"""
+Username / email / matric number availability for the registration page.
+
+Each check is one case-insensitive EXISTS query; iexact on SQLite is a
+LIKE that uses the NOCASE indexes on those columns. "Available" answers are
+cached for AVAILABILITY_CACHE_SECONDS, because a user typing into the form
+probes many values nobody has. A new account drops its own entries, and the
+registration form re-checks without the cache, so a stale entry can never
+let a duplicate through.
+
+The endpoint needs no login, so it is rate limited per client IP with a
+counter in the cache (AVAILABILITY_RATE_LIMIT checks per
+AVAILABILITY_RATE_WINDOW seconds). Email addresses are only checked for
+their format unless AVAILABILITY_CONFIRM_EMAILS is on, so the endpoint
+cannot be used to find out who has an account.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+from . import campus, metrics
+from .models import Student, User
+from .validators import normalize_matric_no
+
+FIELDS = ('username', 'email', 'matric_no')
+
+EMAIL_FORMAT_MESSAGE = 'Valid email address.'
+
+TAKEN_MESSAGES = {
+    'username': 'This username is already taken.',
+    'email': 'An account with this email already exists.',
+    'matric_no': 'A student with this matric number is already registered.',
+}
+
+
+def normalize(field, value):
+    """Return the value as the form would store it, or raise ValidationError."""
+    value = (value or '').strip()
+    if field == 'matric_no':
+        return normalize_matric_no(value)
+    if not value:
+        raise ValidationError('This field is required.')
+    if field == 'username':
+        UnicodeUsernameValidator()(value)
+    elif field == 'email':
+        validate_email(value)
+    return value
+
+
+def is_taken(field, value):
+    """One indexed EXISTS query; no cache."""
+    if field == 'matric_no':
+        return Student.objects.filter(matric_no__iexact=value).exists()
+    return User.objects.filter(**{f'{field}__iexact': value}).exists()
+
+
+def _cache_key(field, value):
+    digest = hashlib.sha1(value.lower().encode('utf-8')).hexdigest()
+    # Matric numbers are unique per campus database, usernames and emails everywhere
+    scope = f'{campus.active()}:' if field == 'matric_no' else ''
+    return f'available:{field}:{scope}{digest}'
+
+
+def check(field, value):
+    """Return (available, message) for a raw value typed into the form."""
+    try:
+        value = normalize(field, value)
+    except ValidationError as e:
+        return False, e.messages[0]
+
+    if field == 'email' and not settings.AVAILABILITY_CONFIRM_EMAILS:
+        return True, EMAIL_FORMAT_MESSAGE
+
+    key = _cache_key(field, value)
+    if cache.get(key):
+        metrics.record_cache('availability', hit=True)
+        return True, ''
+    metrics.record_cache('availability', hit=False)
+
+    if is_taken(field, value):
+        return False, TAKEN_MESSAGES[field]
+    cache.set(key, True, settings.AVAILABILITY_CACHE_SECONDS)
+    return True, ''
+
+
+def forget(field, value):
+    """Drop a cached "available" answer once the value is registered."""
+    if value:
+        cache.delete(_cache_key(field, value))
+
+
+def allow(client_ip, now=None):
+    """Count one check for `client_ip`; False once it is over the limit for this window."""
+    window = settings.AVAILABILITY_RATE_WINDOW
+    key = f'available-rate:{client_ip}:{int((now or time.time()) // window)}'
+    # add() only creates the counter, so concurrent first requests share it
+    cache.add(key, 0, window)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, window)
+        count = 1
+    return count <= settings.AVAILABILITY_RATE_LIMIT
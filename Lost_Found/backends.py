@@ -1,40 +1,43 @@
 # Lost_Found/backends.py
+import logging
+
 from django.contrib.auth.backends import ModelBackend
 from django.db.models import Q
+from .logs import mask
 from .models import User
 
+logger = logging.getLogger(__name__)
+
 class EmailOrUsernameBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
-        print(f"🔍 DEBUG: Authentication attempt with username: '{username}'")
+        logger.debug('auth attempt', extra={'login_ref': mask(username)})
         
         try:
             # Try to find user by email OR username
             user = User.objects.get(
                 Q(email__iexact=username) | Q(username__iexact=username)
             )
-            print(f"✅ DEBUG: Found user: {user.username}, email: {user.email}")
+            logger.debug('auth user found', extra={'user_id': user.pk})
             
         except User.DoesNotExist:
-            print(f"❌ DEBUG: No user found with email or username: '{username}'")
+            logger.debug('auth no such user', extra={'login_ref': mask(username)})
             return None
         except User.MultipleObjectsReturned:
-            print(f"⚠️ DEBUG: Multiple users found with email or username: '{username}'")
+            logger.warning('auth multiple users match', extra={'login_ref': mask(username)})
             user = User.objects.filter(
                 Q(email__iexact=username) | Q(username__iexact=username)
             ).first()
         
         # Check password
         if user:
-            print(f"🔑 DEBUG: Checking password for user: {user.username}")
             if user.check_password(password):
-                print(f"✅ DEBUG: Password correct for user: {user.username}")
                 if self.user_can_authenticate(user):
-                    print(f"✅ DEBUG: User can authenticate: {user.username}")
+                    logger.debug('auth success', extra={'user_id': user.pk})
                     return user
                 else:
-                    print(f"❌ DEBUG: User cannot authenticate (inactive): {user.username}")
+                    logger.info('auth rejected inactive user', extra={'user_id': user.pk})
             else:
-                print(f"❌ DEBUG: Password incorrect for user: {user.username}")
+                logger.debug('auth bad password', extra={'user_id': user.pk})
         
         return None
     
@@ -0,0 +1,123 @@
+# Lost_Found/bulk.py
+"""
+Bulk item transitions used by the item admin actions and the bulk_items command.
+
+    verify_items(queryset, actor)
+    mark_returned(queryset, actor)
+    reassign_claimer(queryset, claimer, actor)
+
+The selected ids are processed in chunks inside a single transaction. For each
+chunk the rows that still qualify are read (locked with SELECT ... FOR UPDATE
+where the database supports it), changed with one UPDATE, and one audit row per
+item is written with bulk_create. Nothing calls save(), so post_save does not
+fire: the daily rollups (and, for returns, the ItemEvent history) are updated
+per chunk and the item ChangeMarker is bumped once at the end, which keeps
+the list pages' ETags and the dashboard counts in step.
+"""
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import campus, metrics, rollups
+from .conditional import ITEM_MARKER
+from .imports import chunked
+from .models import ChangeMarker, Item, ItemAudit, ItemEvent
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class BulkActionError(Exception):
+    pass
+
+
+def _apply(queryset, action, actor, eligible, old_field, changes, new_value, after_update=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Update the eligible rows of `queryset`; return (updated, skipped)."""
+    ids = list(queryset.order_by().values_list('pk', flat=True))
+    updated = 0
+    with campus.atomic():
+        for chunk in chunked(ids, chunk_size):
+            rows = list(
+                Item.objects.select_for_update()
+                .filter(eligible, pk__in=chunk)
+                .values_list('pk', old_field)
+            )
+            if not rows:
+                continue
+            Item.objects.filter(pk__in=[pk for pk, _ in rows]).update(**changes)
+            ItemAudit.objects.bulk_create([
+                ItemAudit(
+                    item_id=pk,
+                    action=action,
+                    actor=actor,
+                    old_value='' if old is None else str(old),
+                    new_value=new_value,
+                )
+                for pk, old in rows
+            ])
+            if after_update:
+                after_update(rows)
+            updated += len(rows)
+        if updated:
+            ChangeMarker.bump(ITEM_MARKER)
+
+    metrics.ITEMS_BULK_UPDATED.inc(updated, action=action)
+    return updated, len(ids) - updated
+
+
+def verify_items(queryset, actor, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Mark unverified items as verified by `actor`."""
+    return _apply(
+        queryset, 'verify', actor,
+        eligible=Q(is_verified=False),
+        old_field='is_verified',
+        changes={'is_verified': True, 'verified_by': actor},
+        new_value='True',
+        chunk_size=chunk_size,
+    )
+
+
+def mark_returned(queryset, actor, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Close lost/found items as returned, stamping date_claimed if it was empty."""
+    now = timezone.now()
+
+    def after_update(rows):
+        rollups.record_transition(Item.objects.filter(pk__in=[pk for pk, _ in rows]), 'returned', now)
+        ItemEvent.objects.bulk_create([
+            ItemEvent(item_id=pk, actor=actor, from_status=old, to_status='returned', created_at=now)
+            for pk, old in rows
+        ])
+
+    return _apply(
+        queryset, 'return', actor,
+        eligible=~Q(status='returned'),
+        old_field='status',
+        changes={'status': 'returned', 'date_claimed': Coalesce('date_claimed', now)},
+        new_value='returned',
+        after_update=after_update,
+        chunk_size=chunk_size,
+    )
+
+
+def reassign_claimer(queryset, claimer, actor, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Set `claimer` as the claimer of found/returned items they did not report."""
+    if claimer is None:
+        raise BulkActionError("A claimer is required.")
+    now = timezone.now()
+    return _apply(
+        queryset, 'reassign', actor,
+        eligible=Q(status__in=('found', 'returned')) & ~Q(reported_by=claimer) & ~Q(claimed_by=claimer),
+        old_field='claimed_by_id',
+        changes={'claimed_by': claimer, 'date_claimed': now},
+        # Only first claims count towards the claim rollups
+        after_update=lambda rows: rollups.record_transition(
+            Item.objects.filter(pk__in=[pk for pk, old in rows if old is None]), 'claimed', now),
+        new_value=str(claimer.pk),
+        chunk_size=chunk_size,
+    )
+
+
+ACTIONS = {
+    'verify': verify_items,
+    'return': mark_returned,
+    'reassign': reassign_claimer,
+}
@@ -0,0 +1,270 @@
+# Lost_Found/campus.py
+"""
+Per-campus databases.
+
+Items, students and departments, together with the tables that hang off
+items (events, audits, archive, rollups), are kept in one database per
+campus, so each campus writes to its own SQLite file. Users, locations,
+notifications, tasks and the change markers stay in the shared 'default'
+database. CAMPUSES in settings maps campus codes to database aliases;
+DEFAULT_CAMPUS is the 'default' database itself, so a single-campus
+install changes nothing.
+
+CampusRouter (routers.py) sends the campus tables to the active campus:
+
+    - CampusMiddleware activates ?campus=, the session's choice or the
+      user's campus for each request
+    - management commands take --campus (CampusCommandMixin)
+    - code can switch explicitly:
+
+        with campus.using_campus('kaduna'):
+            Item.objects.count()
+        Item.objects.campus('kaduna').count()
+
+Nothing joins across databases: relations to User and Location carry no
+database constraint, and code that needs users next to campus rows loads
+them with a second query (see select_people). Deleting a user still
+cascades through the ORM in the database that holds the users (which on a
+single-campus install holds everything); delete_user_rows() applies the
+same on_delete rules on the other campus databases once the deletion has
+committed. Archived items keep their reporter id.
+
+Cross-campus reads use fan_out(), which runs a function once per campus on
+a thread pool (each thread has its own connections), and merge_recent()
+to combine the per-campus pages by date_reported.
+"""
+import heapq
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from itertools import islice, repeat
+from operator import itemgetter
+
+from django.conf import settings
+from django.db import connections, models, router, transaction
+
+SHARED_DB = 'default'
+
+APP_LABEL = 'Lost_Found'
+# Model names of the per-campus tables
+CAMPUS_MODELS = frozenset({
+    'department',
+    'student',
+    'item',
+    'itemarchive',
+    'itemaudit',
+    'itemevent',
+    'dailyitemstat',
+    'dailyclaimtime',
+})
+
+SESSION_KEY = 'campus'
+
+_active = ContextVar('campus', default=None)
+
+
+class UnknownCampus(ValueError):
+    pass
+
+
+# ================= ACTIVE CAMPUS ==================
+
+def campuses():
+    """Campus code -> database alias."""
+    return settings.CAMPUSES
+
+
+def is_sharded():
+    return len(settings.CAMPUSES) > 1
+
+
+def is_campus_model(model):
+    return model._meta.app_label == APP_LABEL and model._meta.model_name in CAMPUS_MODELS
+
+
+def active():
+    """Code of the campus the current request / thread works on."""
+    return _active.get() or settings.DEFAULT_CAMPUS
+
+
+def alias(code=None):
+    """Database alias of `code` (default: the active campus)."""
+    code = code or active()
+    try:
+        return settings.CAMPUSES[code]
+    except KeyError:
+        raise UnknownCampus(code)
+
+
+def archive_alias(code=None):
+    """Database alias of the archive of `code` (settings.ARCHIVE_DATABASES)."""
+    code = code or active()
+    try:
+        return settings.ARCHIVE_DATABASES[code]
+    except KeyError:
+        raise UnknownCampus(code)
+
+
+def code_for_alias(db):
+    for code, campus_db in settings.CAMPUSES.items():
+        if campus_db == db:
+            return code
+    return None
+
+
+def activate(code):
+    """Make `code` the active campus; returns a token for deactivate()."""
+    if code is not None and code not in settings.CAMPUSES:
+        raise UnknownCampus(code)
+    return _active.set(code)
+
+
+def deactivate(token):
+    _active.reset(token)
+
+
+@contextmanager
+def using_campus(code):
+    """Run the block against campus `code` (None: DEFAULT_CAMPUS)."""
+    token = activate(code)
+    try:
+        yield
+    finally:
+        deactivate(token)
+
+
+@contextmanager
+def atomic():
+    """A transaction on the active campus database and one on the shared database.
+
+    A single transaction when they are the same database. Not two-phase:
+    the campus transaction commits first.
+    """
+    with ExitStack() as stack:
+        for db in dict.fromkeys((SHARED_DB, alias())):
+            stack.enter_context(transaction.atomic(using=db))
+        yield
+
+
+class CampusCommandMixin:
+    """For management commands on campus tables: adds --campus and runs the command with it active."""
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        parser = super().create_parser(prog_name, subcommand, **kwargs)
+        parser.add_argument(
+            '--campus', choices=sorted(settings.CAMPUSES), default=None,
+            help=f"Campus to work on (default: {settings.DEFAULT_CAMPUS})",
+        )
+        return parser
+
+    def execute(self, *args, **options):
+        with using_campus(options.get('campus')):
+            return super().execute(*args, **options)
+
+
+# ================= MANAGERS ==================
+
+class CampusQuerySet(models.QuerySet):
+    def campus(self, code):
+        """This queryset on the database of campus `code`."""
+        return self.using(alias(code))
+
+
+CampusManager = models.Manager.from_queryset(CampusQuerySet)
+
+
+def shares_user_db(model):
+    """True when `model` rows of the active campus sit in the same database as the users."""
+    from django.contrib.auth import get_user_model
+
+    return router.db_for_read(model) == router.db_for_read(get_user_model())
+
+
+def select_people(queryset, *lookups):
+    """select_related() the users when they are in the queryset's database, else prefetch_related()."""
+    from django.contrib.auth import get_user_model
+
+    if queryset.db == router.db_for_read(get_user_model()):
+        return queryset.select_related(*lookups)
+    return queryset.prefetch_related(*lookups)
+
+
+# ================= FAN-OUT ==================
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool, _pool_pid
+    with _pool_lock:
+        # Threads do not survive a fork (gunicorn preload); start a pool per process
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ThreadPoolExecutor(max_workers=settings.CAMPUS_FANOUT_WORKERS, thread_name_prefix='campus')
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _run_on(code, fn):
+    with using_campus(code):
+        return fn()
+
+
+def fan_out(fn, codes=None):
+    """{code: fn()} with fn run once per campus, in parallel on the campus thread pool.
+
+    Each call runs with its campus active. The pool threads keep their own
+    database connections between calls.
+    """
+    codes = list(codes or settings.CAMPUSES)
+    if len(codes) == 1:
+        return {codes[0]: _run_on(codes[0], fn)}
+    pool = _executor()
+    futures = {code: pool.submit(_run_on, code, fn) for code in codes}
+    return {code: future.result() for code, future in futures.items()}
+
+
+# ================= USER DELETION ==================
+
+def delete_user_rows(user_id):
+    """Apply a deleted user's on_delete rules on every campus database without the users."""
+    from django.contrib.auth import get_user_model
+
+    user_db = router.db_for_write(get_user_model())
+    codes = [code for code, db in settings.CAMPUSES.items() if db != user_db]
+    if codes:
+        fan_out(lambda: _delete_user_rows_here(user_id), codes=codes)
+
+
+def _delete_user_rows_here(user_id):
+    from .models import Item, ItemAudit, ItemEvent, Student
+
+    with transaction.atomic(using=alias()):
+        # SET_NULL relations first, so the deletes below see the final rows
+        Item.objects.filter(claimed_by_id=user_id).update(claimed_by=None)
+        Item.objects.filter(verified_by_id=user_id).update(verified_by=None)
+        ItemEvent.objects.filter(actor_id=user_id).update(actor=None)
+        ItemAudit.objects.filter(actor_id=user_id).update(actor=None)
+        # CASCADE relations: a delete() per model so the item signals still run
+        Item.objects.filter(reported_by_id=user_id).delete()
+        Student.objects.filter(user_id=user_id).delete()
+
+
+def close_connections(code=None):
+    """Close this thread's connections to the shared and the campus database."""
+    for db in {SHARED_DB, alias(code)}:
+        connections[db].close()
+
+
+def merge_recent(results, limit, key=itemgetter('date_reported', 'id')):
+    """The newest `limit` rows of per-campus lists that are each sorted newest first.
+
+    `results` is {code: rows}; returns [(code, row), ...]. The default key
+    reads .values() dicts; pass attrgetter('date_reported', 'id') for instances.
+    """
+    streams = [zip(repeat(code), rows) for code, rows in results.items()]
+    merged = heapq.merge(*streams, key=lambda pair: key(pair[1]), reverse=True)
+    return list(islice(merged, limit))
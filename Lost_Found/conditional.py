@@ -0,0 +1,86 @@
+# Lost_Found/conditional.py
+"""
+HTTP conditional GET for pages whose content only depends on the Item table
+and on who is looking at it.
+
+The validator comes from the `item` ChangeMarker row (one primary-key
+lookup), the active campus, the requesting user and their CSRF cookie. When the browser's
+If-None-Match / If-Modified-Since still match, Django's `condition`
+decorator answers 304 before the view runs, so no list queries are made and
+no template is rendered.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from . import campus
+from .models import ChangeMarker
+
+ITEM_MARKER = 'item'
+
+
+def _item_marker(request):
+    # Both validator functions need the marker; fetch it once per request
+    if not hasattr(request, '_item_marker'):
+        request._item_marker = (
+            ChangeMarker.objects.filter(name=ITEM_MARKER)
+            .values_list('version', 'changed_at')
+            .first()
+        )
+    return request._item_marker
+
+
+def item_version(request=None):
+    """Current `item` marker version; reuses the request's copy when it has one."""
+    if request is None:
+        return ChangeMarker.objects.filter(name=ITEM_MARKER).values_list('version', flat=True).first() or 0
+    marker = _item_marker(request)
+    return marker[0] if marker else 0
+
+
+def _has_pending_messages(request):
+    # len() loads the messages without marking them as consumed
+    return bool(len(get_messages(request)))
+
+
+def item_page_etag(request, *args, **kwargs):
+    if request.method not in ('GET', 'HEAD') or _has_pending_messages(request):
+        return None
+    marker = _item_marker(request)
+    version = marker[0] if marker else 0
+    user = request.user
+    parts = [
+        str(version),
+        campus.active(),
+        str(user.pk or ''),
+        user.get_full_name() if user.is_authenticated else '',
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    ]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def item_page_last_modified(request, *args, **kwargs):
+    if request.method not in ('GET', 'HEAD') or _has_pending_messages(request):
+        return None
+    marker = _item_marker(request)
+    return marker[1] if marker else None
+
+
+def item_page_conditional(view_func):
+    """Decorate a page that renders from Item rows with ETag/Last-Modified."""
+    conditional_view = condition(etag_func=item_page_etag, last_modified_func=item_page_last_modified)(view_func)
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        if response.has_header('ETag'):
+            # Always revalidate; the validator is per user so keep it out of shared caches
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Cookie',))
+        return response
+
+    return wrapper
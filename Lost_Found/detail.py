@@ -0,0 +1,122 @@
+# Lost_Found/detail.py
+"""
+Loading and rendering of a single item's page.
+
+load_item() fetches an item together with its reporter and claimer, their
+Student rows and departments in one query. The detail page and the claim /
+found confirmation views all use it. related_items() is the only other
+query: unclaimed items of the opposite status in the same category, with
+the ones at the same place first.
+
+The detail page is cached in two parts for ITEM_DETAIL_CACHE_SECONDS. The
+item's own part is keyed on a stamp of the item's row (one primary-key
+lookup), so a write to some other item leaves it cached. The related items
+come from other rows and are keyed on the `item` ChangeMarker version
+instead. Neither part depends on who is looking; the claim links and owner
+actions are rendered around them on every request, from the few fields
+cached next to the HTML. Edits to the reporter's profile show once the
+entry expires.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, Value, When
+from django.template.loader import render_to_string
+
+from . import campus, metrics
+from .conditional import item_version
+from .models import Item
+
+RELATED_LIMIT = 4
+BODY_TEMPLATE = 'Lost_Found/studentPage/partials/item-detail-body.html'
+RELATED_TEMPLATE = 'Lost_Found/studentPage/partials/item-detail-related.html'
+
+# Reporter and claimer with their Student row and department, in one join
+# (prefetched instead on a campus whose items are not next to the users)
+PEOPLE = (
+    'reported_by__student__department',
+    'claimed_by__student__department',
+)
+
+OPPOSITE_STATUS = {'lost': 'found', 'found': 'lost'}
+
+# What the page outside the cached body needs to know about the item
+SUMMARY_FIELDS = ('id', 'title', 'status', 'reported_by_id', 'claimed_by_id')
+
+# Every column the cached body shows; a change to any of them changes the stamp
+STAMP_FIELDS = (
+    'title', 'description', 'category', 'status', 'location_found', 'location_lost',
+    'date_occurred', 'image', 'reported_by_id', 'claimed_by_id', 'date_claimed',
+)
+
+
+def summary(item):
+    fields = {field: getattr(item, field) for field in SUMMARY_FIELDS}
+    fields['claimed_by_email'] = item.claimed_by.email if item.claimed_by_id else ''
+    return fields
+
+
+def load_item(item_id):
+    """The item with reporter and claimer loaded; raises Item.DoesNotExist."""
+    return campus.select_people(Item.objects.all(), *PEOPLE).get(pk=item_id)
+
+
+def related_items(item, limit=RELATED_LIMIT):
+    """Possible matches: unclaimed items of the opposite status in the same category."""
+    status = OPPOSITE_STATUS.get(item.status)
+    if status is None:
+        return []
+    items = (
+        Item.objects.filter(status=status, category=item.category, claimed_by__isnull=True)
+        .exclude(reported_by_id=item.reported_by_id)
+        .only('id', 'title', 'status', 'category', 'location_lost', 'location_found', 'date_occurred', 'image')
+    )
+    # Found items are compared by where they were found, lost items by where they were lost
+    place_id = getattr(item, f'{item.status}_place_id')
+    if place_id:
+        items = items.annotate(
+            same_place=Case(When(**{f'{status}_place_id': place_id}, then=Value(1)),
+                            default=Value(0), output_field=IntegerField())
+        ).order_by('-same_place', '-date_reported')
+    else:
+        items = items.order_by('-date_reported')
+    return list(items[:limit])
+
+
+def item_stamp(item_id):
+    """Short digest of the item's displayed columns; raises Item.DoesNotExist."""
+    row = Item.objects.filter(pk=item_id).values_list(*STAMP_FIELDS).first()
+    if row is None:
+        raise Item.DoesNotExist(f'Item {item_id} does not exist.')
+    return hashlib.sha1(repr(row).encode('utf-8')).hexdigest()[:16]
+
+
+def render_body(item):
+    return render_to_string(BODY_TEMPLATE, {'item': item})
+
+
+def render_related(item):
+    return render_to_string(RELATED_TEMPLATE, {'item': item, 'related': related_items(item)})
+
+
+def cached_page(item_id, request=None):
+    """{'item': summary dict, 'html': rendered body}; raises Item.DoesNotExist."""
+    code = campus.active()
+    key = f'item-detail:{code}:{item_id}:{item_stamp(item_id)}'
+    related_key = f'item-related:{code}:{item_id}:{item_version(request)}'
+    cached = cache.get_many([key, related_key])
+    page, related = cached.get(key), cached.get(related_key)
+    metrics.record_cache('item_detail', hit=page is not None)
+    metrics.record_cache('item_related', hit=related is not None)
+
+    item = None
+    if page is None:
+        item = load_item(item_id)
+        page = {'item': summary(item), 'html': render_body(item)}
+        cache.set(key, page, settings.ITEM_DETAIL_CACHE_SECONDS)
+    if related is None:
+        item = item or Item.objects.get(pk=item_id)
+        related = render_related(item)
+        cache.set(related_key, related, settings.ITEM_DETAIL_CACHE_SECONDS)
+    return {'item': page['item'], 'html': page['html'] + related}
@@ -0,0 +1,90 @@
+# Lost_Found/events.py
+"""
+Item status history (ItemEvent).
+
+Views call log_event(); the events are buffered on the request and written
+with one bulk_create when the response is ready (ItemEventMiddleware), so a
+request that changes several items costs a single INSERT. Without a request
+buffer (management commands, shell) events are written immediately.
+
+activity_feed() reads the user's own actions (actor index) and the events on
+the user's reports (timeline index) as two queries and merges them, rather
+than OR-ing across a join, which scans the table. Titles are looked up
+afterwards, from the archive when the item has been moved there, so events
+of archived items stay in the feed.
+"""
+from django.utils import timezone
+
+from . import campus
+from .models import Item, ItemArchive, ItemEvent
+
+BUFFER_ATTR = '_item_events'
+
+
+def log_event(request, item, to_status, from_status='', actor=None):
+    """Record that `item` went from `from_status` to `to_status`."""
+    if actor is None and request is not None and request.user.is_authenticated:
+        actor = request.user
+    event = ItemEvent(
+        item_id=item.pk,
+        actor=actor,
+        from_status=from_status,
+        to_status=to_status,
+        created_at=timezone.now(),
+    )
+    buffer = getattr(request, BUFFER_ATTR, None)
+    if buffer is None:
+        event.save()
+    else:
+        buffer.append(event)
+
+
+def start_buffer(request):
+    setattr(request, BUFFER_ATTR, [])
+
+
+def flush_buffer(request):
+    """Write the request's buffered events; returns how many were written."""
+    buffer = getattr(request, BUFFER_ATTR, None)
+    if not buffer:
+        return 0
+    ItemEvent.objects.bulk_create(buffer)
+    setattr(request, BUFFER_ATTR, [])
+    return len(buffer)
+
+
+def _reported_ids(user):
+    live = Item.objects.filter(reported_by=user).values_list('pk', flat=True)
+    archived = ItemArchive.objects.filter(reported_by_id=user.pk).values_list('pk', flat=True)
+    return set(live) | set(archived)
+
+
+def _titles(item_ids):
+    titles = dict(Item.objects.filter(pk__in=item_ids).values_list('pk', 'title'))
+    missing = set(item_ids) - set(titles)
+    if missing:
+        titles.update(ItemArchive.objects.filter(pk__in=missing).values_list('pk', 'title'))
+    return titles
+
+
+def activity_feed(user, limit=10):
+    """Latest events on the user's own reports and on items the user acted on.
+
+    Each event gets an `item_title` attribute ('' if the item is gone).
+    """
+    recent = ItemEvent.objects.order_by('-created_at', '-pk')
+    queries = [recent.filter(actor=user)]
+    reported = _reported_ids(user)
+    if reported:
+        queries.append(recent.filter(item_id__in=reported))
+
+    merged = {}
+    for events in queries:
+        for event in campus.select_people(events, 'actor')[:limit]:
+            merged[event.pk] = event
+    feed = sorted(merged.values(), key=lambda event: (event.created_at, event.pk), reverse=True)[:limit]
+
+    titles = _titles({event.item_id for event in feed})
+    for event in feed:
+        event.item_title = titles.get(event.item_id, '')
+    return feed
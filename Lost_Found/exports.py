@@ -0,0 +1,198 @@
+# Lost_Found/exports.py
+"""
+Streaming CSV / JSONL exports of items and students for administrators.
+
+Rows are read with .values_list() over the reporter/claimer/department
+joins and .iterator(chunk_size=...), so one query streams the whole table
+without building model instances, and memory stays flat however many rows
+there are. Output is written in ~64 KB chunks.
+
+On a campus whose tables are in their own database (campus.py) the users
+cannot be joined: user columns are then read with one extra query per
+chunk, and student columns of a user with a subquery.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from django.db.models import OuterRef, Subquery
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from . import campus
+from .imports import chunked
+from .models import Item, Student, User
+
+CHUNK_SIZE = 2000
+WRITE_BUFFER = 64 * 1024
+
+# (column header, lookup)
+ITEM_COLUMNS = (
+    ('id', 'id'),
+    ('title', 'title'),
+    ('category', 'category'),
+    ('status', 'status'),
+    ('location_lost', 'location_lost'),
+    ('location_found', 'location_found'),
+    ('date_occurred', 'date_occurred'),
+    ('date_reported', 'date_reported'),
+    ('reported_by', 'reported_by__username'),
+    ('reporter_email', 'reported_by__email'),
+    ('reporter_matric_no', 'reported_by__student__matric_no'),
+    ('reporter_department', 'reported_by__student__department__code'),
+    ('claimed_by', 'claimed_by__username'),
+    ('date_claimed', 'date_claimed'),
+    ('is_verified', 'is_verified'),
+    ('verified_by', 'verified_by__username'),
+)
+
+STUDENT_COLUMNS = (
+    ('matric_no', 'matric_no'),
+    ('username', 'user__username'),
+    ('first_name', 'user__first_name'),
+    ('last_name', 'user__last_name'),
+    ('email', 'user__email'),
+    ('phone_number', 'user__phone_number'),
+    ('department', 'department__name'),
+    ('department_code', 'department__code'),
+    ('level', 'level'),
+    ('date_joined', 'user__date_joined'),
+)
+
+# CSV text cells starting with these are read as formulas by spreadsheet apps
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+EXPORTS = {
+    'items': (Item, ITEM_COLUMNS),
+    'students': (Student, STUDENT_COLUMNS),
+}
+
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+def export_rows(queryset, columns):
+    """Yield one tuple per row, in column order."""
+    lookups = [lookup for _, lookup in columns]
+    if campus.shares_user_db(queryset.model):
+        return queryset.order_by('pk').values_list(*lookups).iterator(chunk_size=CHUNK_SIZE)
+    return _rows_without_user_joins(queryset, lookups)
+
+
+def _user_relation(model, lookup):
+    """(foreign key, rest of the lookup) when `lookup` goes through a relation to User."""
+    name, _, rest = lookup.partition('__')
+    if not rest:
+        return None, None
+    field = model._meta.get_field(name)
+    if field.is_relation and field.related_model is User:
+        return field, rest
+    return None, None
+
+
+def _rows_without_user_joins(queryset, lookups):
+    local = []
+    user_columns = {}  # index -> (fk attname, User field)
+    annotations = {}
+    for index, lookup in enumerate(lookups):
+        field, rest = _user_relation(queryset.model, lookup)
+        if field is None:
+            local.append(lookup)
+        elif rest.startswith('student__'):
+            # Students are in the campus database: a subquery instead of the join
+            name = f'_export_{index}'
+            students = Student.objects.filter(user_id=OuterRef(field.attname))
+            annotations[name] = Subquery(students.values(rest[len('student__'):])[:1])
+            local.append(name)
+        else:
+            user_columns[index] = (field.attname, rest)
+            local.append(field.attname)
+
+    user_fields = sorted({rest for _, rest in user_columns.values()})
+    rows = queryset.annotate(**annotations).order_by('pk').values_list(*local).iterator(chunk_size=CHUNK_SIZE)
+    for chunk in chunked(rows, CHUNK_SIZE):
+        ids = {row[index] for row in chunk for index in user_columns} - {None}
+        users = {
+            values['pk']: values
+            for values in User.objects.filter(pk__in=ids).values('pk', *user_fields)
+        }
+        for row in chunk:
+            row = list(row)
+            for index, (_, rest) in user_columns.items():
+                user = users.get(row[index])
+                row[index] = user[rest] if user else None
+            yield tuple(row)
+
+
+def _csv_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Keep spreadsheet apps from evaluating user-entered text as a formula
+        return "'" + value
+    return value
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def csv_lines(rows, headers):
+    """CSV text in WRITE_BUFFER-sized chunks.
+
+    Every text cell is sanitized: most columns (usernames and emails too)
+    are typed in by users at some point.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for row in rows:
+        writer.writerow([_csv_cell(value) for value in row])
+        if buffer.tell() >= WRITE_BUFFER:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def jsonl_lines(rows, headers):
+    for row in rows:
+        record = {header: _json_value(value) for header, value in zip(headers, row)}
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def buffered(lines, size=WRITE_BUFFER):
+    """Join small lines into chunks of roughly `size` characters."""
+    buffer = []
+    length = 0
+    for line in lines:
+        buffer.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def export_chunks(queryset, columns, fmt):
+    headers = [header for header, _ in columns]
+    rows = export_rows(queryset, columns)
+    if fmt == 'csv':
+        return csv_lines(rows, headers)
+    return buffered(jsonl_lines(rows, headers))
+
+
+def export_response(queryset, kind, fmt):
+    _, columns = EXPORTS[kind]
+    filename = f"{kind}-{timezone.now():%Y%m%d-%H%M%S}.{fmt}"
+    response = StreamingHttpResponse(
+        export_chunks(queryset, columns, fmt),
+        content_type=FORMATS[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
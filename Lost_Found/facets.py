@@ -0,0 +1,94 @@
+# Lost_Found/facets.py
+"""
+Counts for the filter chips on the lost and found item lists.
+
+Each chip link keeps the search (and place) and replaces the other filters.
+Its count is therefore "items matching the search with this one facet
+value". All of them come from one grouped query over the search results:
+one row per category, with conditional counts for each date bucket and
+for claimed items.
+
+Results are cached per campus and search state. The key includes the
+`item` ChangeMarker version, so any item write invalidates them, and they
+expire after FACET_CACHE_SECONDS because the date buckets move with the
+clock.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from . import campus, metrics
+from .conditional import item_version
+from .filters import DATE_BUCKETS, filter_items
+from .models import Item
+
+# Filters that narrow the base set; the chip facets are counted within it
+BASE_FILTERS = ('search', 'near', 'radius')
+
+
+def _state(status, filters):
+    """Search state as filter_items() sees it.
+
+    Kept verbatim: icontains is only case-insensitive for ASCII on SQLite and
+    does not collapse spaces, so "Été" / "été" or "black  phone" / "black
+    phone" can match different rows. The views pass list_filters() values,
+    which are already stripped.
+    """
+    state = {name: str(filters.get(name) or '') for name in BASE_FILTERS}
+    state['status'] = status
+    return state
+
+
+def _cache_key(state, version):
+    digest = hashlib.sha1(json.dumps(state, sort_keys=True).encode('utf-8')).hexdigest()
+    return f'facets:{campus.active()}:{version}:{digest}'
+
+
+def compute(status, filters):
+    """{'total', 'category': {value: n}, 'date': {bucket: n}, 'claim': {'claimed': n, 'unclaimed': n}}"""
+    base = filter_items(status, {name: filters.get(name) for name in BASE_FILTERS}).order_by()
+    now = timezone.now()
+    buckets = {
+        f'date_{name}': Count('id', filter=Q(date_occurred__gte=now - delta))
+        for name, delta in DATE_BUCKETS.items()
+    }
+    rows = base.values('category').annotate(
+        total=Count('id'),
+        claimed=Count('id', filter=Q(claimed_by__isnull=False)),
+        **buckets,
+    )
+
+    counts = {
+        'total': 0,
+        'category': {value: 0 for value, _ in Item.CATEGORY_CHOICES},
+        'date': {name: 0 for name in DATE_BUCKETS},
+        'claim': {'claimed': 0, 'unclaimed': 0},
+    }
+    for row in rows:
+        counts['total'] += row['total']
+        counts['category'][row['category']] = counts['category'].get(row['category'], 0) + row['total']
+        for name in DATE_BUCKETS:
+            counts['date'][name] += row[f'date_{name}']
+        counts['claim']['claimed'] += row['claimed']
+        counts['claim']['unclaimed'] += row['total'] - row['claimed']
+    return counts
+
+
+def facet_counts(status, filters, request=None):
+    """compute(), cached per search state and item version."""
+    key = _cache_key(_state(status, filters), item_version(request))
+    counts = cache.get(key)
+    metrics.record_cache('facets', hit=counts is not None)
+    if counts is None:
+        counts = compute(status, filters)
+        cache.set(key, counts, settings.FACET_CACHE_SECONDS)
+    return counts
+
+
+def category_chips(counts):
+    """(value, label, count) for every category, for the chip row."""
+    return [(value, label, counts['category'].get(value, 0)) for value, label in Item.CATEGORY_CHOICES]
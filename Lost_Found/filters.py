@@ -0,0 +1,192 @@
+# Lost_Found/filters.py
+"""
+Search/filter rules for the lost and found item lists, shared by the full
+pages, the HTML fragment endpoints and anything else that lists items.
+"""
+import base64
+from datetime import timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import gazetteer
+from .models import Item
+
+PAGE_SIZE = 10
+
+# Field searched for the item location, per list
+LOCATION_FIELDS = {
+    'lost': 'location_lost',
+    'found': 'location_found',
+}
+
+# Gazetteer place matched from each location field
+PLACE_FIELDS = {
+    'location_lost': 'lost_place_id',
+    'location_found': 'found_place_id',
+}
+
+# ?date= values: items that occurred within this long before now
+DATE_BUCKETS = {
+    'today': timedelta(days=1),
+    'week': timedelta(days=7),
+}
+
+MIN_RADIUS_M = 50
+MAX_RADIUS_M = 5000
+
+
+def list_filters(params):
+    """Pick the supported filter values out of a QueryDict / dict."""
+    return {
+        'search': params.get('search', '').strip(),
+        'category': params.get('category', ''),
+        'date': params.get('date', ''),
+        'claim': params.get('claim', ''),
+        'near': params.get('near', '').strip(),
+        'radius': params.get('radius', ''),
+    }
+
+
+def _radius(value):
+    try:
+        return min(max(int(value), MIN_RADIUS_M), MAX_RADIUS_M)
+    except (TypeError, ValueError):
+        return None
+
+
+def filter_items(status, filters, queryset=None):
+    """Items with the given status narrowed by the list filters, newest first.
+
+    status=None searches lost and found items together (both location fields).
+    """
+    items = Item.objects.all() if queryset is None else queryset
+    if status is None:
+        items = items.filter(status__in=list(LOCATION_FIELDS))
+        location_fields = list(LOCATION_FIELDS.values())
+    else:
+        items = items.filter(status=status)
+        location_fields = [LOCATION_FIELDS[status]]
+
+    search_query = filters.get('search')
+    if search_query:
+        location_q = Q()
+        for field in location_fields:
+            location_q |= Q(**{f'{field}__icontains': search_query})
+        items = items.filter(
+            Q(title__icontains=search_query) |
+            Q(description__icontains=search_query) |
+            location_q |
+            Q(category__icontains=search_query)
+        )
+
+    # "near": a place id or name; items whose place is within the radius of it
+    near = filters.get('near')
+    if near:
+        # isdigit() alone accepts characters such as '²' that int() rejects
+        origin = gazetteer.place(int(near)) if near.isascii() and near.isdigit() else gazetteer.resolve(near)
+        near_q = Q()
+        if origin is None:
+            # Not a known place: fall back to matching the location text
+            for field in location_fields:
+                near_q |= Q(**{f'{field}__icontains': near})
+        else:
+            place_ids = gazetteer.nearby_place_ids(origin, _radius(filters.get('radius')))
+            for field in location_fields:
+                near_q |= Q(**{f'{PLACE_FIELDS[field]}__in': place_ids})
+        items = items.filter(near_q)
+
+    category_filter = filters.get('category')
+    if category_filter:
+        items = items.filter(category=category_filter)
+
+    # Claim filter (found items only)
+    claim_filter = filters.get('claim')
+    if status in ('found', None):
+        if claim_filter == 'unclaimed':
+            items = items.filter(claimed_by__isnull=True)
+        elif claim_filter == 'claimed':
+            items = items.filter(claimed_by__isnull=False)
+
+    date_filter = filters.get('date')
+    if date_filter in DATE_BUCKETS:
+        items = items.filter(date_occurred__gte=timezone.now() - DATE_BUCKETS[date_filter])
+
+    return items.order_by('-date_reported', '-id')
+
+
+# ================= CURSOR PAGINATION ==================
+
+def encode_cursor(item):
+    return make_cursor(item.date_reported, item.pk)
+
+
+def make_cursor(date_reported, pk):
+    raw = f"{date_reported.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (date_reported, id) for a cursor token, or None if it is invalid."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('utf-8')
+        stamp, _, pk = raw.partition('|')
+        date_reported = parse_datetime(stamp)
+        if date_reported is None:
+            return None
+        return date_reported, int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def after_cursor(queryset, cursor):
+    """Rows that come after the cursor position; invalid cursors start at the top."""
+    position = decode_cursor(cursor)
+    if not position:
+        return queryset
+    date_reported, pk = position
+    return queryset.filter(
+        Q(date_reported__lt=date_reported) |
+        Q(date_reported=date_reported, id__lt=pk)
+    )
+
+
+def cursor_page(queryset, cursor=None, size=PAGE_SIZE):
+    """Keyset page over a queryset ordered by (-date_reported, -id).
+
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    items = list(after_cursor(queryset, cursor)[:size + 1])
+    if len(items) > size:
+        items = items[:size]
+        return items, encode_cursor(items[-1])
+    return items, None
+
+
+# ================= REPORTER LISTS ==================
+
+# ?status= values on "my reports"; 'claimed' is any item someone has claimed
+REPORT_STATUSES = ('lost', 'found', 'returned', 'claimed')
+
+
+def reported_items(user, status=''):
+    """Items the user reported, newest first; walks item_reporter_recent_idx."""
+    items = Item.objects.filter(reported_by=user)
+    if status == 'claimed':
+        items = items.filter(claimed_by__isnull=False)
+    elif status in REPORT_STATUSES:
+        items = items.filter(status=status)
+    return items.order_by('-date_reported', '-id')
+
+
+def report_counts(user):
+    """{'total', 'lost', 'found', 'returned', 'claimed'} for the user's reports, in one query."""
+    by_status = {status: Count('id', filter=Q(status=status)) for status in ('lost', 'found', 'returned')}
+    return Item.objects.filter(reported_by=user).aggregate(
+        total=Count('id'),
+        claimed=Count('id', filter=Q(claimed_by__isnull=False)),
+        **by_status,
+    )
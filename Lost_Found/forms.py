@@ -1,8 +1,49 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from .models import *
+from . import availability, refdata
+from .validators import check_matric_department, normalize_matric_no, normalize_phone
 from django.utils import timezone
 
+
+class CachedDepartmentIterator(forms.models.ModelChoiceIterator):
+    """Department options from the reference-data cache instead of a query per render."""
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for department in refdata.departments():
+            yield self.choice(department)
+
+    def __len__(self):
+        return len(refdata.departments()) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(refdata.departments())
+
+
+class DepartmentChoiceField(forms.ModelChoiceField):
+    iterator = CachedDepartmentIterator
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        self.validate_no_null_characters(value)
+        if isinstance(value, Department):
+            value = value.pk
+        try:
+            department = refdata.department(int(value))
+        except (TypeError, ValueError):
+            department = None
+        if department is None:
+            raise forms.ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return department
+
+
 class StudentRegistrationForm(UserCreationForm):
 
     email = forms.EmailField(
@@ -57,7 +98,7 @@ class StudentRegistrationForm(UserCreationForm):
             'title': 'Format: U + Year(2 digits) + Dept Code(3 letters) + Number(4 digits)'
         })
     )
-    department = forms.ModelChoiceField(
+    department = DepartmentChoiceField(
         queryset=Department.objects.all().order_by('name'),
         empty_label="Select Department",
         label="Department",
@@ -66,14 +107,7 @@ class StudentRegistrationForm(UserCreationForm):
         })
     )
     level = forms.ChoiceField(
-        choices=(
-            ('', 'Select Level'),
-            ('100', '100 Level'),
-            ('200', '200 Level'),
-            ('300', '300 Level'),
-            ('400', '400 Level'),
-            ('500', '500 Level'),
-        ),
+        choices=(('', 'Select Level'),) + refdata.LEVEL_CHOICES,
         label="Level",
         widget=forms.Select(attrs={
             'class': 'w-full px-3 py-2 border border-gray-300 rounded-md shadow-sm focus:outline-none focus:ring-blue-500 focus:border-blue-500'
@@ -116,48 +150,21 @@ class StudentRegistrationForm(UserCreationForm):
         phone_number = self.cleaned_data.get('phone_number', '').strip()
         
         if phone_number:
-            # Remove any non-digit characters
-            phone_digits = ''.join(filter(str.isdigit, phone_number))
-            
-            # Ensure exactly 11 digits
-            if len(phone_digits) != 11:
-                raise forms.ValidationError('Phone number must be exactly 11 digits.')
-            
-            # Ensure it starts with 0
-            if not phone_digits.startswith('0'):
-                raise forms.ValidationError('Phone number must start with 0.')
-            
-            return phone_digits
+            return normalize_phone(phone_number)
         
         return phone_number
     
+    def clean_email(self):
+        email = self.cleaned_data.get('email', '')
+        # The unique constraint is case-sensitive; logins are not
+        if email and availability.is_taken('email', email):
+            raise forms.ValidationError(availability.TAKEN_MESSAGES['email'])
+        return email
+
     def clean_matric_no(self):
-        matric_no = self.cleaned_data.get('matric_no', '').strip().upper()
-        
-        if not matric_no:
-            raise forms.ValidationError('Matric number is required.')
-        
-        # Validate length exactly 10
-        if len(matric_no) != 10:
-            raise forms.ValidationError('Matric number must be exactly 10 characters.')
-        
-        # Validate format: U25CYS2001
-        if not matric_no.startswith('U'):
-            raise forms.ValidationError('Matric number must start with "U".')
-        
-        # Validate year digits
-        if not matric_no[1:3].isdigit():
-            raise forms.ValidationError('Characters 2-3 must be year digits (e.g., 25 for 2025).')
-        
-        # Validate department code (3 uppercase letters)
-        department_code = matric_no[3:6]
-        if not department_code.isalpha() or not department_code.isupper():
-            raise forms.ValidationError('Characters 4-6 must be uppercase department code letters (e.g., CYS for Cyber Security).')
-        
-        # Validate serial number (4 digits)
-        if not matric_no[6:].isdigit():
-            raise forms.ValidationError('Characters 7-10 must be numeric.')
-        
+        matric_no = normalize_matric_no(self.cleaned_data.get('matric_no', ''))
+        if availability.is_taken('matric_no', matric_no):
+            raise forms.ValidationError(availability.TAKEN_MESSAGES['matric_no'])
         return matric_no
     
     def clean(self):
@@ -167,11 +174,7 @@ class StudentRegistrationForm(UserCreationForm):
         
         # Validate department code matches selected department
         if matric_no and department:
-            department_code = matric_no[3:6]
-            if department.code.upper() != department_code:
-                raise forms.ValidationError(
-                    f'Matric number department code "{department_code}" does not match selected department "{department.name}" (code: {department.code}).'
-                )
+            check_matric_department(matric_no, department)
         
         return cleaned_data
 
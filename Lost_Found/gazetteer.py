@@ -0,0 +1,216 @@
+# Lost_Found/gazetteer.py
+"""
+Campus location gazetteer.
+
+Free-text locations are resolved to a Location through their alias key
+(lower case, letters and digits only), so "Lab 2", "lab2" and "LAB-2" are
+one place, and "Cyber lab 2" joins them once it is added as an alias. The
+alias map is a per-process snapshot (refdata.VersionedCache). Resolving an
+item on save is therefore a dict lookup, not a query.
+
+    resolve("lab2")               -> Location-like Place or None
+    normalize_item(item)          -> sets lost_place/found_place and the canonical names
+    normalize_existing()          -> the same for rows already stored, in id-ordered chunks
+    nearby_place_ids(place, 300)  -> ids of places within 300 m
+
+Proximity uses geohash cells. The radius is covered by at most 3x3 cells
+at the finest precision whose cells are still at least as large as the
+radius. Each cell is one indexed range on Location.geohash, and an exact
+haversine check drops places in the corners.
+"""
+import math
+import re
+from collections import namedtuple
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import tasks
+from .conditional import ITEM_MARKER
+from .models import ChangeMarker, Item, Location, LocationAlias
+from .refdata import VersionedCache
+
+LOCATION_MARKER = 'location'
+
+GEOHASH_PRECISION = 9
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+EARTH_RADIUS_M = 6371000
+METERS_PER_DEGREE = 111320
+
+Place = namedtuple('Place', 'id name latitude longitude')
+_Gazetteer = namedtuple('_Gazetteer', 'version by_id by_key')
+
+
+# ================= KEYS / GEOHASH ==================
+
+def alias_key(value):
+    return _NON_ALNUM.sub('', (value or '').lower())[:100]
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if value >= middle:
+            bits = bits * 2 + 1
+            bounds[0] = middle
+        else:
+            bits *= 2
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = bit_count = 0
+    return ''.join(chars)
+
+
+def _cell_size_m(precision, latitude):
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    height = 180 / 2 ** lat_bits * METERS_PER_DEGREE
+    width = 360 / 2 ** lon_bits * METERS_PER_DEGREE * math.cos(math.radians(latitude))
+    return min(height, width)
+
+
+def covering_cells(latitude, longitude, radius_m):
+    """Geohash prefixes whose cells together contain the circle (at most 9)."""
+    precision = 1
+    while precision < GEOHASH_PRECISION and _cell_size_m(precision + 1, latitude) >= radius_m:
+        precision += 1
+    # Cells are at least `radius` wide, so sampling the box at -r, 0, +r touches every one of them
+    dlat = radius_m / METERS_PER_DEGREE
+    dlon = radius_m / (METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+    return sorted({
+        encode_geohash(latitude + y, longitude + x, precision)
+        for y in (-dlat, 0, dlat) for x in (-dlon, 0, dlon)
+    })
+
+
+def distance_m(lat1, lon1, lat2, lon2):
+    """Haversine distance in metres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+# ================= ALIAS LOOKUP ==================
+
+def _load(version):
+    by_id = {
+        pk: Place(pk, name, latitude, longitude)
+        for pk, name, latitude, longitude in Location.objects.values_list('id', 'name', 'latitude', 'longitude')
+    }
+    by_key = {alias_key(place.name): place for place in by_id.values()}
+    for key, location_id in LocationAlias.objects.values_list('key', 'location_id'):
+        # A place's own name wins over another place's alias
+        by_key.setdefault(key, by_id[location_id])
+    return _Gazetteer(version, by_id, by_key)
+
+
+_gazetteer = VersionedCache(LOCATION_MARKER, _load, 'gazetteer')
+location_changed = _gazetteer.changed
+invalidate = _gazetteer.invalidate
+warm = _gazetteer.warm
+
+
+def places():
+    """All places ordered by name."""
+    return sorted(_gazetteer.get().by_id.values(), key=lambda place: place.name)
+
+
+def place(pk):
+    return _gazetteer.get().by_id.get(pk)
+
+
+def resolve(text):
+    """The Place a free-text location refers to, or None."""
+    key = alias_key(text)
+    return _gazetteer.get().by_key.get(key) if key else None
+
+
+def normalize_item(item):
+    """Point the item at its places and use their canonical names; returns True if anything changed."""
+    changed = False
+    for text_field, place_field in (('location_lost', 'lost_place_id'), ('location_found', 'found_place_id')):
+        match = resolve(getattr(item, text_field))
+        place_id = match.id if match else None
+        if getattr(item, place_field) != place_id:
+            setattr(item, place_field, place_id)
+            changed = True
+        if match and getattr(item, text_field) != match.name:
+            setattr(item, text_field, match.name)
+            changed = True
+    return changed
+
+
+NORMALIZED_FIELDS = ['location_lost', 'location_found', 'lost_place', 'found_place']
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def normalize_existing(chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, unmatched=None, on_chunk=None):
+    """Run normalize_item over stored items; returns (scanned, changed).
+
+    Walks the table by id, one transaction per chunk. Only changed rows are
+    written (bulk_update, which skips signals). The rollups group events by
+    location text, so a `rebuild_rollups` task is queued for the days since
+    the oldest changed item was reported. Unresolved location texts are
+    counted into `unmatched` (a Counter) when one is given.
+    """
+    scanned = changed_total = 0
+    last_id = 0
+    oldest = None
+    while True:
+        with transaction.atomic(using=router.db_for_write(Item)):
+            chunk = list(
+                Item.objects.filter(id__gt=last_id).order_by('id')
+                .only('id', 'date_reported', *NORMALIZED_FIELDS)[:chunk_size]
+            )
+            if not chunk:
+                break
+            changed = [item for item in chunk if normalize_item(item)]
+            if changed and not dry_run:
+                Item.objects.bulk_update(changed, NORMALIZED_FIELDS)
+                chunk_oldest = min(item.date_reported for item in changed)
+                oldest = chunk_oldest if oldest is None else min(oldest, chunk_oldest)
+        if unmatched is not None:
+            for item in chunk:
+                if item.location_lost and item.lost_place_id is None:
+                    unmatched[item.location_lost] += 1
+                if item.location_found and item.found_place_id is None:
+                    unmatched[item.location_found] += 1
+        scanned += len(chunk)
+        changed_total += len(changed)
+        last_id = chunk[-1].pk
+        if on_chunk:
+            on_chunk(scanned, changed_total)
+    if changed_total and not dry_run:
+        ChangeMarker.bump(ITEM_MARKER)
+        tasks.rebuild_rollups.delay(since=timezone.localdate(oldest).isoformat())
+    return scanned, changed_total
+
+
+# ================= PROXIMITY ==================
+
+def nearby_place_ids(origin, radius_m=None):
+    """Ids of places within radius_m of `origin` (a Place), including itself."""
+    radius_m = radius_m or settings.GAZETTEER_NEAR_RADIUS
+    cells = covering_cells(origin.latitude, origin.longitude, radius_m)
+    # geohash >= cell AND geohash < cell + '~' is a prefix match the index can serve
+    in_cells = reduce(or_, (Q(geohash__gte=cell, geohash__lt=cell + '~') for cell in cells))
+    return [
+        pk for pk, latitude, longitude in Location.objects.filter(in_cells).values_list('id', 'latitude', 'longitude')
+        if distance_m(origin.latitude, origin.longitude, latitude, longitude) <= radius_m
+    ]
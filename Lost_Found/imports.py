@@ -0,0 +1,435 @@
+# Lost_Found/imports.py
+"""
+Bulk import of students (User + Student) and legacy items from CSV or JSONL.
+
+Rows are handled in chunks. Each chunk is validated as a batch: the
+registration rules from validators.py run per row, while uniqueness and
+foreign keys are checked with one `__in` query per column (departments come
+from a single preloaded code map). Only rows that pass have their passwords
+hashed, in a process pool, and the chunk is inserted with bulk_create inside
+one transaction.
+
+After every committed chunk the last row number is saved to a progress file,
+so an interrupted import can be resumed. Rows that fail validation are
+written to an error report CSV and do not stop the import.
+"""
+import csv
+import json
+import os
+import string
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db.models import Q
+from django.db.models.functions import Collate
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import campus, gazetteer, refdata, rollups
+from .conditional import ITEM_MARKER
+from .models import ChangeMarker, Item, Student, User
+from .validators import check_matric_department, normalize_matric_no, normalize_phone
+
+DEFAULT_CHUNK_SIZE = 500
+
+STUDENT_LEVELS = {value for value, _ in Student._meta.get_field('level').choices}
+ITEM_CATEGORIES = {value for value, _ in Item.CATEGORY_CHOICES}
+ITEM_STATUSES = {value for value, _ in Item.STATUS_CHOICES}
+
+
+class BulkImportError(Exception):
+    pass
+
+
+# ================= READING ==================
+
+def read_rows(path, fmt=None):
+    """Yield (row_number, dict) for each data row; row numbers start at 1."""
+    fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+    with open(path, newline='', encoding='utf-8-sig') as fh:
+        if fmt == 'csv':
+            for number, row in enumerate(csv.DictReader(fh), start=1):
+                yield number, {key.strip(): (value or '').strip() for key, value in row.items() if key}
+        else:
+            number = 0
+            for line in fh:
+                if not line.strip():
+                    continue
+                number += 1
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    row = {'__error__': f'Invalid JSON: {e}'}
+                yield number, {key: '' if value is None else str(value).strip() for key, value in row.items()}
+
+
+def chunked(iterable, size):
+    chunk = []
+    for entry in iterable:
+        chunk.append(entry)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _parse_when(value):
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValidationError(f'"{value}" is not a valid date or datetime.')
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+# SQLite's NOCASE only folds ASCII letters; batch keys must fold the same way
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def nocase_key(value):
+    """`value` as the NOCASE collation compares it."""
+    return value.translate(_ASCII_LOWER)
+
+
+def _existing_nocase(model, field, values):
+    """nocase_key()s of the `field` values of `model` rows matching `values` in any case."""
+    matches = model.objects.annotate(nocase=Collate(field, 'NOCASE')).filter(nocase__in=values)
+    return {nocase_key(value) for value in matches.values_list(field, flat=True)}
+
+
+def _hash_password(raw_password):
+    return make_password(raw_password or None)
+
+
+# ================= STUDENTS ==================
+
+class StudentImporter:
+    kind = 'students'
+    required = ('username', 'email', 'matric_no', 'department', 'level')
+
+    def __init__(self, pool=None):
+        self.pool = pool
+        self.departments = refdata.departments_by_code()
+        self.username_validator = UnicodeUsernameValidator()
+
+    def clean_row(self, row):
+        for field in self.required:
+            if not row.get(field):
+                raise ValidationError({field: 'This field is required.'})
+
+        cleaned = {
+            'username': row['username'],
+            'email': row['email'].lower(),
+            'first_name': row.get('first_name', ''),
+            'last_name': row.get('last_name', ''),
+            'phone_number': row.get('phone_number', ''),
+            'level': row['level'],
+            'password': row.get('password', ''),
+        }
+        try:
+            self.username_validator(cleaned['username'])
+        except ValidationError as e:
+            raise ValidationError({'username': e.messages})
+        try:
+            validate_email(cleaned['email'])
+        except ValidationError as e:
+            raise ValidationError({'email': e.messages})
+        if cleaned['phone_number']:
+            try:
+                cleaned['phone_number'] = normalize_phone(cleaned['phone_number'])
+            except ValidationError as e:
+                raise ValidationError({'phone_number': e.messages})
+        if cleaned['level'] not in STUDENT_LEVELS:
+            raise ValidationError({'level': f'Unknown level "{cleaned["level"]}".'})
+
+        department = self.departments.get(row['department'].upper())
+        if department is None:
+            raise ValidationError({'department': f'Unknown department code "{row["department"]}".'})
+        try:
+            cleaned['matric_no'] = normalize_matric_no(row['matric_no'])
+            check_matric_department(cleaned['matric_no'], department)
+        except ValidationError as e:
+            raise ValidationError({'matric_no': e.messages})
+        cleaned['department'] = department
+        return cleaned
+
+    def check_batch(self, rows):
+        """Drop rows whose username/email/matric repeat in the batch or already exist.
+
+        Compared case-insensitively, like the registration form, through the
+        NOCASE indexes.
+        """
+        errors = []
+        existing = {
+            'username': _existing_nocase(User, 'username', [r['username'] for _, r in rows]),
+            'email': _existing_nocase(User, 'email', [r['email'] for _, r in rows]),
+            'matric_no': _existing_nocase(Student, 'matric_no', [r['matric_no'] for _, r in rows]),
+        }
+        seen = {field: set() for field in existing}
+        accepted = []
+        for number, row in rows:
+            problem = None
+            for field in existing:
+                value = row[field]
+                if nocase_key(value) in existing[field]:
+                    problem = (field, f'{field} "{value}" is already registered.')
+                elif nocase_key(value) in seen[field]:
+                    problem = (field, f'{field} "{value}" appears more than once in this file.')
+                if problem:
+                    break
+            if problem:
+                errors.append((number, *problem))
+                continue
+            for field in seen:
+                seen[field].add(nocase_key(row[field]))
+            accepted.append((number, row))
+        return accepted, errors
+
+    def prepare(self, rows):
+        """Hash passwords of the accepted rows before the insert transaction opens (slow by design)."""
+        passwords = [row['password'] for _, row in rows]
+        if self.pool is not None and any(passwords):
+            hashes = self.pool.map(_hash_password, passwords, chunksize=max(1, len(passwords) // 32))
+        else:
+            hashes = map(_hash_password, passwords)
+        for (_, row), password_hash in zip(rows, hashes):
+            row['password'] = password_hash
+
+    def insert(self, rows):
+        users = [
+            User(
+                username=row['username'],
+                email=row['email'],
+                first_name=row['first_name'],
+                last_name=row['last_name'],
+                phone_number=row['phone_number'],
+                user_type='student',
+                password=row['password'],
+                campus=campus.active(),
+            )
+            for _, row in rows
+        ]
+        User.objects.bulk_create(users)
+        Student.objects.bulk_create([
+            Student(user=user, matric_no=row['matric_no'], department=row['department'], level=row['level'])
+            for user, (_, row) in zip(users, rows)
+        ])
+
+
+# ================= ITEMS ==================
+
+class ItemImporter:
+    kind = 'items'
+    required = ('title', 'category', 'status', 'date_occurred', 'reported_by')
+
+    def __init__(self, pool=None):
+        self.pool = pool
+
+    def clean_row(self, row):
+        for field in self.required:
+            if not row.get(field):
+                raise ValidationError({field: 'This field is required.'})
+
+        cleaned = {
+            'title': row['title'],
+            'description': row.get('description', ''),
+            'category': row['category'].lower(),
+            'status': row['status'].lower(),
+            'location_lost': row.get('location_lost', ''),
+            'location_found': row.get('location_found', ''),
+            'reported_by': row['reported_by'],
+            'claimed_by': row.get('claimed_by', ''),
+        }
+        for field, limit in (('title', 200), ('location_lost', 200), ('location_found', 200)):
+            if len(cleaned[field]) > limit:
+                raise ValidationError({field: f'Ensure this value has at most {limit} characters.'})
+        if cleaned['category'] not in ITEM_CATEGORIES:
+            raise ValidationError({'category': f'Unknown category "{row["category"]}".'})
+        if cleaned['status'] not in ITEM_STATUSES:
+            raise ValidationError({'status': f'Unknown status "{row["status"]}".'})
+        for field in ('date_occurred', 'date_reported', 'date_claimed'):
+            try:
+                cleaned[field] = _parse_when(row.get(field, ''))
+            except ValidationError as e:
+                raise ValidationError({field: e.messages})
+        return cleaned
+
+    def prepare(self, rows):
+        pass
+
+    def _resolve_users(self, identifiers):
+        """Map usernames, emails (in any case) and matric numbers to user ids in two queries."""
+        identifiers = {value for value in identifiers if value}
+        resolved = {}
+        users = User.objects.annotate(
+            username_nocase=Collate('username', 'NOCASE'), email_nocase=Collate('email', 'NOCASE'),
+        ).filter(Q(username_nocase__in=identifiers) | Q(email_nocase__in=identifiers))
+        for user_id, username, email in users.values_list('id', 'username', 'email'):
+            resolved[nocase_key(username)] = user_id
+            resolved[nocase_key(email)] = user_id
+        for matric_no, user_id in Student.objects.filter(
+            matric_no__in={value.upper() for value in identifiers}
+        ).values_list('matric_no', 'user_id'):
+            resolved[matric_no] = user_id
+        return {value: resolved.get(value.upper()) or resolved.get(nocase_key(value)) for value in identifiers}
+
+    def check_batch(self, rows):
+        users = self._resolve_users([r['reported_by'] for _, r in rows] + [r['claimed_by'] for _, r in rows])
+        errors = []
+        accepted = []
+        for number, row in rows:
+            row['reported_by_id'] = users.get(row['reported_by'])
+            row['claimed_by_id'] = users.get(row['claimed_by']) if row['claimed_by'] else None
+            if row['reported_by_id'] is None:
+                errors.append((number, 'reported_by', f'No user matches "{row["reported_by"]}".'))
+            elif row['claimed_by'] and row['claimed_by_id'] is None:
+                errors.append((number, 'claimed_by', f'No user matches "{row["claimed_by"]}".'))
+            else:
+                accepted.append((number, row))
+        return accepted, errors
+
+    def insert(self, rows):
+        items = [
+            Item(
+                title=row['title'],
+                description=row['description'],
+                category=row['category'],
+                status=row['status'],
+                location_lost=row['location_lost'],
+                location_found=row['location_found'],
+                date_occurred=row['date_occurred'],
+                reported_by_id=row['reported_by_id'],
+                claimed_by_id=row['claimed_by_id'],
+                date_claimed=row['date_claimed'],
+            )
+            for _, row in rows
+        ]
+        # bulk_create skips the pre_save signal that resolves places
+        for item in items:
+            gazetteer.normalize_item(item)
+        Item.objects.bulk_create(items)
+
+        # date_reported is auto_now_add, so bulk_create stamps "now"; restore historical dates
+        dated = []
+        for item, (_, row) in zip(items, rows):
+            if row['date_reported']:
+                item.date_reported = row['date_reported']
+                dated.append(item)
+        if dated:
+            Item.objects.bulk_update(dated, ['date_reported'])
+        # bulk_create skips post_save, so bump the list validators and rollups here
+        ChangeMarker.bump(ITEM_MARKER)
+        rollups.record_history(Item.objects.filter(pk__in=[item.pk for item in items]))
+
+
+IMPORTERS = {
+    'students': StudentImporter,
+    'items': ItemImporter,
+}
+
+
+# ================= DRIVER ==================
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.last_row = 0
+
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+
+def run_import(kind, path, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE, workers=None,
+               resume=False, progress_path=None, errors_path=None, dry_run=False, on_chunk=None):
+    """Import `path` into `kind` ('students' or 'items') and return an ImportReport."""
+    progress_path = progress_path or f'{path}.progress.json'
+    errors_path = errors_path or f'{path}.errors.csv'
+    signature = _file_signature(path)
+
+    report = ImportReport()
+    if resume and os.path.exists(progress_path):
+        with open(progress_path) as fh:
+            progress = json.load(fh)
+        if progress.get('file') != signature:
+            raise BulkImportError(f'{path} changed since the last run; cannot resume from {progress_path}.')
+        report.last_row = progress['row']
+        report.imported = progress['imported']
+        report.failed = progress['failed']
+
+    workers = os.cpu_count() if workers is None else workers
+    pool = ProcessPoolExecutor(max_workers=workers) if kind == 'students' and workers > 1 else None
+    importer = IMPORTERS[kind](pool=pool)
+
+    append = resume and report.last_row > 0 and os.path.exists(errors_path)
+    with open(errors_path, 'a' if append else 'w', newline='', encoding='utf-8') as error_file:
+        errors = csv.writer(error_file)
+        if not append:
+            errors.writerow(['row', 'field', 'error'])
+
+        def check_batch(rows):
+            accepted, batch_errors = importer.check_batch(rows)
+            errors.writerows(batch_errors)
+            report.failed += len(batch_errors)
+            return accepted
+
+        try:
+            rows = ((n, row) for n, row in read_rows(path, fmt) if n > report.last_row)
+            for chunk in chunked(rows, chunk_size):
+                valid = []
+                for number, row in chunk:
+                    try:
+                        if '__error__' in row:
+                            raise ValidationError(row['__error__'])
+                        valid.append((number, importer.clean_row(row)))
+                    except ValidationError as e:
+                        for field, messages in getattr(e, 'message_dict', {'': e.messages}).items():
+                            errors.writerow([number, field, '; '.join(messages)])
+                        report.failed += 1
+
+                # Checked before prepare(), so rejected rows are not hashed
+                valid = check_batch(valid)
+                if valid and not dry_run:
+                    importer.prepare(valid)
+                    # Users are shared; students and items are in the campus database
+                    with campus.atomic():
+                        # Again inside the transaction, for rows registered meanwhile
+                        valid = check_batch(valid)
+                        if valid:
+                            importer.insert(valid)
+                report.imported += len(valid)
+                report.last_row = chunk[-1][0]
+
+                error_file.flush()
+                if not dry_run:
+                    _save_progress(progress_path, signature, report)
+                if on_chunk:
+                    on_chunk(report)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+    return report
+
+
+def _save_progress(progress_path, signature, report):
+    tmp_path = f'{progress_path}.tmp'
+    with open(tmp_path, 'w') as fh:
+        json.dump({
+            'file': signature,
+            'row': report.last_row,
+            'imported': report.imported,
+            'failed': report.failed,
+        }, fh)
+    os.replace(tmp_path, progress_path)
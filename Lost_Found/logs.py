@@ -0,0 +1,155 @@
+# Lost_Found/logs.py
+import atexit
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+
+# Attributes every LogRecord carries; anything else came in through `extra=`
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def mask(value):
+    """Return a short stable reference for an identifier (username, email...)
+    so it can be correlated in logs without being written out in clear text.
+
+    Keyed with settings.LOG_MASK_KEY, so a reference cannot be reversed by
+    hashing candidate usernames without the key."""
+    if not value:
+        return '-'
+    from django.conf import settings
+
+    message = str(value).strip().lower().encode('utf-8')
+    return hmac.new(settings.LOG_MASK_KEY.encode('utf-8'), message, hashlib.sha256).hexdigest()[:12]
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message and extras."""
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_'):
+                payload[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """Sample hot-path DEBUG events.
+
+    Each (logger, message template) pair may emit `burst` records per `period`
+    seconds; the rest are dropped and the number dropped is reported on the
+    next record that gets through. Records above DEBUG are never sampled.
+    """
+
+    def __init__(self, burst=20, period=60.0, max_level=logging.DEBUG):
+        super().__init__()
+        self.burst = int(burst)
+        self.period = float(period)
+        self.max_level = max_level
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            started, count, dropped = self._windows.get(key, (now, 0, 0))
+            if now - started >= self.period:
+                started, count = now, 0
+            if count >= self.burst:
+                self._windows[key] = (started, count, dropped + 1)
+                return False
+            self._windows[key] = (started, count + 1, 0)
+
+        if dropped:
+            record.sampled_out = dropped
+        return True
+
+
+class QueueLogHandler(QueueHandler):
+    """Hand records to a background thread instead of writing them inline.
+
+    The calling thread only merges the message arguments and puts the record
+    on a bounded queue; JSON formatting and the actual stream write happen in
+    a QueueListener thread. When the queue is full the record is dropped
+    rather than blocking the request.
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.maxsize = maxsize
+        self.target = logging.StreamHandler(stream)
+        self.target.setFormatter(JSONFormatter())
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self.start()
+        _handlers.append(self)
+
+    def setFormatter(self, fmt):
+        # The formatter belongs to the writer thread, not the enqueueing side
+        self.target.setFormatter(fmt)
+
+    def start(self):
+        self._listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self._listener.start()
+        self._pid = os.getpid()
+
+    def stop(self):
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+        self._listener = None
+
+    def prepare(self, record):
+        # Skip QueueHandler's eager self.format(); the listener formats.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            # Forked worker (e.g. gunicorn preload): the listener thread did not survive the fork
+            with self._start_lock:
+                if self._pid != os.getpid():
+                    self.queue = queue.Queue(maxsize=self.maxsize)
+                    self.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handlers = []
+
+
+@atexit.register
+def stop_listeners():
+    """Flush and stop every listener thread started in this process."""
+    for handler in _handlers:
+        handler.stop()
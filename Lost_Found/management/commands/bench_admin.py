@@ -0,0 +1,82 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from Lost_Found.conditional import ITEM_MARKER
+from Lost_Found.models import ChangeMarker, Item, Student, User
+
+
+class Command(BaseCommand):
+    help = "Time admin changelists, searches and change forms for items and students (time, queries)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Staff username to log in as (default: first active superuser)")
+        parser.add_argument('--iterations', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Insert this many synthetic items first (bulk_create) to test at scale")
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True, is_staff=True)
+        user = users.filter(username=options['user']).first() if options['user'] else users.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError("Need an active staff user to log in as.")
+
+        if options['seed']:
+            self.seed(user, options['seed'])
+
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+
+        targets = [
+            ('items', reverse('admin:Lost_Found_item_changelist')),
+            ('items search', reverse('admin:Lost_Found_item_changelist') + '?q=wallet'),
+            ('items filtered', reverse('admin:Lost_Found_item_changelist') + '?status__exact=lost'),
+            ('students', reverse('admin:Lost_Found_student_changelist')),
+            ('students search', reverse('admin:Lost_Found_student_changelist') + '?q=U25CYS2001'),
+        ]
+        item = Item.objects.order_by('-pk').first()
+        if item is not None:
+            targets.append(('item change', reverse('admin:Lost_Found_item_change', args=[item.pk])))
+        student = Student.objects.order_by('-pk').first()
+        if student is not None:
+            targets.append(('student change', reverse('admin:Lost_Found_student_change', args=[student.pk])))
+
+        iterations = options['iterations']
+        self.stdout.write(f"{'page':<18}{'status':>7}{'queries':>9}{'ms/req':>10}")
+        for label, path in targets:
+            queries = []
+            with connection.execute_wrapper(lambda execute, sql, *rest: queries.append(sql) or execute(sql, *rest)):
+                status = client.get(path).status_code
+            started = time.perf_counter()
+            for _ in range(iterations):
+                client.get(path)
+            elapsed_ms = (time.perf_counter() - started) * 1000 / iterations
+            self.stdout.write(f"{label:<18}{status:>7}{len(queries):>9}{elapsed_ms:>10.2f}")
+
+    def seed(self, user, count):
+        words = ['wallet', 'phone', 'keys', 'bag', 'laptop', 'id card', 'book', 'bottle']
+        categories = [value for value, _ in Item.CATEGORY_CHOICES]
+        now = timezone.now()
+        batch = []
+        for n in range(count):
+            batch.append(Item(
+                title=f"{random.choice(words)} {n}",
+                description="Synthetic item for admin benchmarking.",
+                category=random.choice(categories),
+                status=random.choice(['lost', 'found']),
+                location_lost="Main library",
+                date_occurred=now,
+                reported_by=user,
+            ))
+            if len(batch) == 5000:
+                Item.objects.bulk_create(batch)
+                batch = []
+        Item.objects.bulk_create(batch)
+        # bulk_create skips post_save, so invalidate cached item pages by hand
+        ChangeMarker.bump(ITEM_MARKER)
+        self.stdout.write(f"Seeded {count} items.")
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from Lost_Found.models import User
+
+
+class Command(BaseCommand):
+    help = "Compare the JSON item API against the HTML list pages (time, bytes, queries)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Username to log in as (default: first active user)")
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--status', default='found', choices=['lost', 'found'])
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        user = users.filter(username=options['user']).first() if options['user'] else users.first()
+        if user is None:
+            raise CommandError("Need an active user to log in as.")
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+
+        status = options['status']
+        targets = [
+            ('html page', f'/{status}-item/'),
+            ('html fragment', f'/{status}-item/results/'),
+            ('json api', f'/api/v1/items/?status={status}&limit=10'),
+            ('json sparse', f'/api/v1/items/?status={status}&limit=10&fields=id,title,date_reported'),
+        ]
+
+        iterations = options['iterations']
+        self.stdout.write(f"{'path':<16}{'bytes':>10}{'queries':>9}{'ms/req':>10}")
+        for label, path in targets:
+            queries = []
+            with connection.execute_wrapper(lambda execute, sql, *rest: queries.append(sql) or execute(sql, *rest)):
+                body = b''.join(client.get(path, HTTP_ACCEPT_ENCODING='identity'))
+            started = time.perf_counter()
+            for _ in range(iterations):
+                b''.join(client.get(path, HTTP_ACCEPT_ENCODING='identity'))
+            elapsed_ms = (time.perf_counter() - started) * 1000 / iterations
+            self.stdout.write(f"{label:<16}{len(body):>10}{len(queries):>9}{elapsed_ms:>10.2f}")
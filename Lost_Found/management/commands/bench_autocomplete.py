@@ -0,0 +1,68 @@
+import random
+import string
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from Lost_Found import autocomplete
+from Lost_Found.refdata import CATEGORY_CHOICES
+
+
+class Command(BaseCommand):
+    help = (
+        "Time autocomplete lookups for every 2- and 3-character prefix in the index. "
+        "Uses the database unless --synthetic N builds an in-memory index of N made-up items."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--synthetic', type=int, default=0, metavar='N')
+        parser.add_argument('--limit', type=int, default=8)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['synthetic']:
+            index = self.synthetic(options['synthetic'])
+        else:
+            index = autocomplete.build()
+        build_seconds = time.perf_counter() - started
+        self.stdout.write(
+            f"index: {len(index.entries)} terms, {len(index.keys)} keys, built in {build_seconds:.2f}s"
+        )
+
+        prefixes = sorted({key[:n] for key in index.keys for n in (2, 3) if len(key.split('\x00')[0]) >= n})
+        timings = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            index.suggest(prefix, options['limit'])
+            timings.append(time.perf_counter() - started)
+        if not timings:
+            self.stdout.write("No terms to look up.")
+            return
+        timings.sort()
+
+        def ms(fraction):
+            return timings[min(int(len(timings) * fraction), len(timings) - 1)] * 1000
+
+        self.stdout.write(
+            f"{len(timings)} prefixes: p50 {ms(0.5):.3f} ms, p99 {ms(0.99):.3f} ms, max {timings[-1] * 1000:.3f} ms"
+        )
+
+    def synthetic(self, count):
+        rng = random.Random(42)
+        vocabulary = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9))) for _ in range(20000)]
+        places = [f"{rng.choice(vocabulary)} {rng.choice(['hall', 'block', 'library', 'lab', 'gate'])}"
+                  for _ in range(3000)]
+        index = autocomplete.SuggestionIndex()
+        titles = Counter()
+        locations = Counter()
+        for _ in range(count):
+            titles.update(autocomplete.title_words(' '.join(rng.choices(vocabulary, k=rng.randint(1, 4)))))
+            locations[rng.choice(places)] += 1
+        for word, n in titles.items():
+            index.add('title', word, n, sort=False)
+        for location, n in locations.items():
+            index.add('location', location, n, sort=False)
+        for value, label in CATEGORY_CHOICES:
+            index.add('category', label, count // len(CATEGORY_CHOICES), value=value, sort=False)
+        return index.finish()
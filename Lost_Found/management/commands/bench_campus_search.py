@@ -0,0 +1,106 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.utils import timezone
+
+from Lost_Found import campus, rollups
+from Lost_Found.conditional import ITEM_MARKER
+from Lost_Found.filters import filter_items
+from Lost_Found.models import ChangeMarker, Department, Item, User
+
+WORDS = ('phone', 'laptop', 'wallet', 'charger', 'id card', 'jacket', 'textbook', 'keys', 'watch', 'bag')
+PLACES = ('Library', 'Cafeteria', 'Lab 2', 'Hostel A', 'Main Gate', 'Lecture Hall 3')
+COLUMNS = ('id', 'title', 'status', 'category', 'date_reported')
+
+
+def newest_matches(query, limit):
+    """The active campus's newest `limit` items matching `query` (what a campus=all search runs per campus)."""
+    return list(filter_items(None, {'search': query}).values(*COLUMNS)[:limit])
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed every campus database with items (--seed) and compare a cross-campus search "
+        "run campus by campus against the parallel fan-out (campus.fan_out)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, metavar='N', help="First add N items to every campus")
+        parser.add_argument('--query', default='phone')
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--rounds', type=int, default=30)
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['seed'])
+
+        query, limit, rounds = options['query'], options['limit'], options['rounds']
+        codes = list(campus.campuses())
+        counts = campus.fan_out(lambda: Item.objects.count())
+        self.stdout.write("items: " + ", ".join(f"{code} {counts[code]}" for code in codes))
+
+        def sequential():
+            results = {}
+            for code in codes:
+                with campus.using_campus(code):
+                    results[code] = newest_matches(query, limit)
+            return results
+
+        def parallel():
+            return campus.fan_out(lambda: newest_matches(query, limit))
+
+        # The first round opens each thread's connections
+        expected = campus.merge_recent(sequential(), limit)
+        if campus.merge_recent(parallel(), limit) != expected:
+            raise CommandError("Sequential and fan-out searches returned different rows")
+
+        timings = {}
+        for label, search in (('sequential', sequential), ('fan-out', parallel)):
+            samples = []
+            for _ in range(rounds):
+                started = time.perf_counter()
+                campus.merge_recent(search(), limit)
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[label] = statistics.median(samples)
+            self.stdout.write(f"  {label:<11} {timings[label]:8.2f} ms (median of {rounds})")
+        self.stdout.write(
+            f"{len(codes)} campuses, {len(expected)} results for {query!r}: "
+            f"fan-out {timings['sequential'] / timings['fan-out']:.2f}x the sequential speed"
+        )
+
+    def seed(self, count):
+        user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True)[:200])
+        if not user_ids:
+            raise CommandError("Seeding needs users to report the items; create some first.")
+        templates = list(Department.objects.campus(campus.active()).values('name', 'code'))
+        now = timezone.now()
+        for code in campus.campuses():
+            with campus.using_campus(code):
+                # Departments are per campus; start new campuses with the active campus's list
+                if templates and not Department.objects.exists():
+                    Department.objects.bulk_create([Department(**template) for template in templates])
+                start = Item.objects.aggregate(last=Max('id'))['last'] or 0
+                categories = [value for value, _ in Item.CATEGORY_CHOICES]
+                items = []
+                for n in range(count):
+                    status = random.choice(('lost', 'found'))
+                    place = random.choice(PLACES)
+                    items.append(Item(
+                        title=f"{random.choice(WORDS).title()} {start + n + 1}",
+                        description=f"Seeded for bench_campus_search ({code})",
+                        category=random.choice(categories),
+                        status=status,
+                        location_lost=place if status == 'lost' else '',
+                        location_found=place if status == 'found' else '',
+                        date_occurred=now - timedelta(hours=random.randint(1, 24 * 60)),
+                        reported_by_id=random.choice(user_ids),
+                    ))
+                with campus.atomic():
+                    Item.objects.bulk_create(items, batch_size=1000)
+                    rollups.record_history(Item.objects.filter(id__gt=start))
+                    ChangeMarker.bump(ITEM_MARKER)
+                self.stdout.write(f"seeded {count} items into {code} ({campus.alias(code)})")
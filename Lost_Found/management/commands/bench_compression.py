@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from Lost_Found.middleware import brotli, compress_bytes
+from Lost_Found.models import User
+
+
+class Command(BaseCommand):
+    help = "Measure bytes-on-wire and CPU cost of compressing the dynamic HTML pages."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=['/', '/lost-item/', '/found-item/'])
+        parser.add_argument('--user', help="Username to log in as (default: first active user)")
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST='localhost')
+        users = User.objects.filter(is_active=True)
+        user = users.filter(username=options['user']).first() if options['user'] else users.first()
+        if options['user'] and user is None:
+            raise CommandError(f"No active user named {options['user']!r}")
+        if user is not None:
+            client.force_login(user)
+
+        codecs = [('gzip', 'gzip', None)]
+        if brotli is not None:
+            codecs += [('br q4', 'br', 4), ('br q11', 'br', 11)]
+        else:
+            self.stdout.write("brotli is not installed; only gzip is measured.")
+
+        iterations = options['iterations']
+        self.stdout.write(f"{'path':<16}{'codec':<10}{'bytes':>10}{'ratio':>8}{'ms/req':>10}")
+        for path in options['paths']:
+            started = time.perf_counter()
+            response = client.get(path, HTTP_ACCEPT_ENCODING='identity')
+            render_ms = (time.perf_counter() - started) * 1000
+            if response.status_code != 200:
+                self.stdout.write(f"{path:<16}HTTP {response.status_code}, skipped")
+                continue
+
+            body = response.content
+            self.stdout.write(f"{path:<16}{'identity':<10}{len(body):>10}{1.0:>8.2f}{render_ms:>10.2f}  (render)")
+            for label, encoding, quality in codecs:
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    compressed = compress_bytes(body, encoding, quality)
+                elapsed_ms = (time.perf_counter() - started) * 1000 / iterations
+                ratio = len(compressed) / len(body)
+                self.stdout.write(f"{'':<16}{label:<10}{len(compressed):>10}{ratio:>8.2f}{elapsed_ms:>10.3f}")
@@ -0,0 +1,105 @@
+import http.client
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from Lost_Found import media
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure media serving throughput for one file: full responses, 64 KiB ranges and 304s. "
+        "In-process by default (handler cost only); with --url, against a running server, "
+        "e.g. gunicorn, so sendfile() is part of the measurement."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help="Path below MEDIA_URL (default: the largest file in the first upload dir)")
+        parser.add_argument('--requests', type=int, default=2000, help="Requests per kind, in-process")
+        parser.add_argument('--url', help="Base URL of a running server, e.g. http://127.0.0.1:8000")
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        path = options['path'] or self.largest_file()
+        size = os.path.getsize(media._resolve(path))
+        self.stdout.write(f"{settings.MEDIA_URL}{path}: {size / 1024:.0f} KiB")
+        if options['url']:
+            self.over_http(options['url'], path, options['concurrency'], options['seconds'])
+        else:
+            self.in_process(path, options['requests'])
+
+    def largest_file(self):
+        directory = os.path.join(settings.MEDIA_ROOT, settings.MEDIA_SERVE_DIRS[0])
+        files = [entry for entry in os.scandir(directory) if entry.is_file()] if os.path.isdir(directory) else []
+        if not files:
+            raise CommandError(f"No files in {directory}; pass --path")
+        largest = max(files, key=lambda entry: entry.stat().st_size)
+        return f"{settings.MEDIA_SERVE_DIRS[0]}/{largest.name}"
+
+    def in_process(self, path, count):
+        factory = RequestFactory()
+        url = settings.MEDIA_URL + path
+        etag = media.serve(factory.get(url), path)['ETag']
+        kinds = (
+            ('full', {}),
+            ('range 64K', {'HTTP_RANGE': 'bytes=0-65535'}),
+            ('304', {'HTTP_IF_NONE_MATCH': etag}),
+        )
+        for label, headers in kinds:
+            sent = 0
+            started = time.perf_counter()
+            for _ in range(count):
+                response = media.serve(factory.get(url, **headers), path)
+                if response.streaming:
+                    for chunk in response.streaming_content:
+                        sent += len(chunk)
+                    response.close()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"  {label:<10} {count / elapsed:8.0f} req/s  {sent / elapsed / 2 ** 20:8.1f} MiB/s"
+            )
+
+    def over_http(self, base_url, path, concurrency, seconds):
+        parts = urlsplit(base_url)
+        target = parts.path.rstrip('/') + settings.MEDIA_URL + path
+        deadline = time.perf_counter() + seconds
+        totals = {'requests': 0, 'bytes': 0, 'errors': 0}
+        lock = threading.Lock()
+
+        def client():
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=10)
+            requests = received = errors = 0
+            while time.perf_counter() < deadline:
+                try:
+                    connection.request('GET', target)
+                    response = connection.getresponse()
+                    received += len(response.read())
+                    if response.status != 200:
+                        errors += 1
+                    requests += 1
+                except (OSError, http.client.HTTPException):
+                    errors += 1
+                    connection.close()
+            connection.close()
+            with lock:
+                totals['requests'] += requests
+                totals['bytes'] += received
+                totals['errors'] += errors
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"  {concurrency} clients: {totals['requests'] / elapsed:.0f} req/s, "
+            f"{totals['bytes'] / elapsed / 2 ** 20:.1f} MiB/s, {totals['errors']} errors"
+        )
@@ -0,0 +1,78 @@
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Loads the WSGI application the way a server does (wsgi.py runs the warmup)
+CHILD = """
+import json, time
+started = time.perf_counter()
+from {module} import application
+ready_ms = (time.perf_counter() - started) * 1000
+from Lost_Found import warmup
+print(json.dumps({{'ready_ms': ready_ms, 'warmup_ms': warmup.last_run}}))
+"""
+
+
+def parse_importtime(stderr):
+    """(module, self_us) for every import in `python -X importtime` output."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        imports.append((name.strip(), int(own)))
+    return imports
+
+
+class Command(BaseCommand):
+    help = (
+        "Start fresh interpreters with -X importtime, load the WSGI application (including the warmup) "
+        "and fail if the import time goes over the budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=3, help="Median of this many interpreter starts")
+        parser.add_argument('--budget-ms', type=float, default=settings.STARTUP_IMPORT_BUDGET_MS)
+        parser.add_argument('--top', type=int, default=10, help="Slowest top-level packages to list")
+
+    def handle(self, *args, **options):
+        module = settings.WSGI_APPLICATION.rsplit('.', 1)[0]
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        runs = []
+        for _ in range(max(options['runs'], 1)):
+            result = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', CHILD.format(module=module)],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            if result.returncode:
+                raise CommandError(f"Loading {module} failed:\n{result.stderr[-2000:]}")
+            # The WSGI module's own time is application setup and warmup, not imports
+            imports = [(name, us) for name, us in parse_importtime(result.stderr) if name != module]
+            report = json.loads(result.stdout.strip().splitlines()[-1])
+            runs.append((sum(us for _, us in imports) / 1000, imports, report))
+
+        runs.sort(key=lambda run: run[0])
+        import_ms, imports, report = runs[len(runs) // 2]
+        self.stdout.write(
+            f"{len(runs)} runs, median: imports {import_ms:.0f} ms, "
+            f"application ready {report['ready_ms']:.0f} ms "
+            f"(all runs: {', '.join(f'{run[0]:.0f}' for run in runs)} ms of imports)"
+        )
+        self.stdout.write("warmup: " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in report['warmup_ms'].items()))
+
+        by_package = Counter()
+        for name, us in imports:
+            by_package[name.split('.')[0]] += us
+        self.stdout.write("slowest top-level packages (median run):")
+        for name, us in by_package.most_common(options['top']):
+            self.stdout.write(f"  {us / 1000:8.1f} ms  {name}")
+
+        budget = options['budget_ms']
+        if budget and import_ms > budget:
+            raise CommandError(f"Import time {import_ms:.0f} ms is over the {budget:.0f} ms budget")
+        self.stdout.write(self.style.SUCCESS(f"Import time within the {budget:.0f} ms budget"))
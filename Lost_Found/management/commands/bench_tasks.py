@@ -0,0 +1,55 @@
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from Lost_Found.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure task queue throughput: enqueue N no-op tasks, then drain them with run_worker. "
+        "Run against a scratch database; the worker also runs any other queued tasks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--mode', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--keep', action='store_true', help="Keep the finished benchmark tasks")
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode')
+                mode = cursor.fetchone()[0]
+            self.stdout.write(f"SQLite journal_mode={mode}")
+            if mode.lower() != 'wal':
+                raise CommandError("Expected WAL mode; run `manage.py migrate` (migration 0016 enables it).")
+
+        count = options['tasks']
+        marker = f"bench-{time.time_ns()}"
+        started = time.perf_counter()
+        Task.objects.bulk_create(
+            [Task(name='noop', payload={'bench': marker}, priority=-20, max_attempts=1) for _ in range(count)],
+            batch_size=500,
+        )
+        enqueue_rate = count / (time.perf_counter() - started)
+
+        started = time.perf_counter()
+        call_command(
+            'run_worker', once=True, concurrency=options['concurrency'], mode=options['mode'],
+            poll_interval=0.05, stdout=self.stderr,
+        )
+        elapsed = time.perf_counter() - started
+
+        bench_tasks = Task.objects.filter(name='noop', payload__bench=marker)
+        done = bench_tasks.filter(status='done').count()
+        self.stdout.write(f"enqueue: {enqueue_rate:.0f} tasks/s (bulk)")
+        self.stdout.write(
+            f"process: {done}/{count} done in {elapsed:.2f}s = {done / elapsed:.0f} tasks/s "
+            f"({options['concurrency']} x {options['mode']})"
+        )
+        if not options['keep']:
+            bench_tasks.delete()
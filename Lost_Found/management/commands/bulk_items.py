@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Lost_Found.bulk import ACTIONS, DEFAULT_CHUNK_SIZE
+from Lost_Found.campus import CampusCommandMixin
+from Lost_Found.models import Item, User
+
+
+class Command(CampusCommandMixin, BaseCommand):
+    help = "Verify, mark returned, or reassign the claimer of many items with set-based updates."
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=sorted(ACTIONS))
+        parser.add_argument('--actor', required=True, help="Username recorded on the audit rows")
+        parser.add_argument('--claimer', help="Username of the new claimer (reassign only)")
+        parser.add_argument('--ids', help="Comma-separated item ids")
+        parser.add_argument('--ids-file', help="File with one item id per line")
+        parser.add_argument('--status', choices=[value for value, _ in Item.STATUS_CHOICES])
+        parser.add_argument('--category', choices=[value for value, _ in Item.CATEGORY_CHOICES])
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def _user(self, username):
+        try:
+            return User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {username!r}.")
+
+    def handle(self, *args, **options):
+        queryset = Item.objects.all()
+        ids = []
+        if options['ids']:
+            ids += options['ids'].split(',')
+        if options['ids_file']:
+            with open(options['ids_file']) as fh:
+                ids += fh.read().split()
+        if ids:
+            try:
+                queryset = queryset.filter(pk__in=[int(pk) for pk in ids if pk.strip()])
+            except ValueError:
+                raise CommandError("Item ids must be integers.")
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+        if options['category']:
+            queryset = queryset.filter(category=options['category'])
+        if not (ids or options['status'] or options['category']):
+            raise CommandError("Select items with --ids, --ids-file, --status or --category.")
+
+        actor = self._user(options['actor'])
+        kwargs = {'chunk_size': options['chunk_size']}
+        if options['action'] == 'reassign':
+            if not options['claimer']:
+                raise CommandError("reassign needs --claimer.")
+            kwargs['claimer'] = self._user(options['claimer'])
+
+        started = time.perf_counter()
+        updated, skipped = ACTIONS[options['action']](queryset, actor=actor, **kwargs)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{updated} updated, {skipped} skipped in {elapsed:.2f}s")
@@ -0,0 +1,33 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from Lost_Found.campus import CampusCommandMixin
+from Lost_Found.exports import EXPORTS, FORMATS, export_chunks
+
+
+class Command(CampusCommandMixin, BaseCommand):
+    help = "Stream all items or students to a CSV or JSONL file (or stdout)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', dest='fmt', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', '-o', default='-', help="File path, or - for stdout")
+
+    def handle(self, *args, **options):
+        model, columns = EXPORTS[options['kind']]
+        started = time.perf_counter()
+        written = 0
+
+        out = sys.stdout if options['output'] == '-' else open(options['output'], 'w', encoding='utf-8', newline='')
+        try:
+            for chunk in export_chunks(model.objects.all(), columns, options['fmt']):
+                out.write(chunk)
+                written += len(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(f"Exported {options['kind']} ({written} characters) in {elapsed:.2f}s")
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from Lost_Found.campus import CampusCommandMixin
+from Lost_Found.imports import DEFAULT_CHUNK_SIZE, IMPORTERS, BulkImportError, run_import
+
+
+class Command(CampusCommandMixin, BaseCommand):
+    help = (
+        "Bulk import students (username, email, first_name, last_name, phone_number, "
+        "matric_no, department, level, password) or legacy items (title, description, "
+        "category, status, location_lost, location_found, date_occurred, date_reported, "
+        "reported_by, claimed_by, date_claimed) from CSV or JSONL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path')
+        parser.add_argument('--format', dest='fmt', choices=['csv', 'jsonl'], help="Default: from the file extension")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--workers', type=int, help="Password hashing processes (default: CPU count)")
+        parser.add_argument('--resume', action='store_true', help="Continue after the last committed chunk")
+        parser.add_argument('--progress', help="Progress file (default: PATH.progress.json)")
+        parser.add_argument('--errors', help="Per-row error report (default: PATH.errors.csv)")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only, insert nothing")
+
+    def handle(self, *args, **options):
+        def progress(report):
+            self.stdout.write(f"  row {report.last_row}: {report.imported} imported, {report.failed} failed")
+
+        try:
+            report = run_import(
+                options['kind'],
+                options['path'],
+                fmt=options['fmt'],
+                chunk_size=options['chunk_size'],
+                workers=options['workers'],
+                resume=options['resume'],
+                progress_path=options['progress'],
+                errors_path=options['errors'],
+                dry_run=options['dry_run'],
+                on_chunk=progress,
+            )
+        except (BulkImportError, OSError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {report.imported} imported, {report.failed} failed "
+            f"(errors: {options['errors'] or options['path'] + '.errors.csv'})"
+        ))
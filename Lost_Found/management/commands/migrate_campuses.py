@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from Lost_Found import campus
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply migrations to the shared database and to every campus database in settings.CAMPUSES "
+        "(campus databases only get the per-campus tables), plus their archive databases if configured."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--campus', action='append', choices=sorted(settings.CAMPUSES),
+                            help="Only this campus (repeatable); default: all")
+
+    def handle(self, *args, **options):
+        codes = options['campus'] or list(campus.campuses())
+        # The shared database first: it holds the users the campus rows point at
+        databases = [campus.SHARED_DB] + [campus.alias(code) for code in codes]
+        if settings.ARCHIVE_DATABASES:
+            databases += [campus.archive_alias(code) for code in codes]
+        databases = dict.fromkeys(databases)
+        for db in databases:
+            code = campus.code_for_alias(db)
+            label = f"{code} ({db})" if code else db
+            if options['verbosity']:
+                self.stdout.write(self.style.MIGRATE_HEADING(f"{label}: {settings.DATABASES[db]['NAME']}"))
+            call_command('migrate', database=db, interactive=False,
+                         verbosity=options['verbosity'], stdout=self.stdout)
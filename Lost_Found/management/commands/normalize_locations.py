@@ -0,0 +1,37 @@
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from Lost_Found.campus import CampusCommandMixin
+from Lost_Found.gazetteer import DEFAULT_CHUNK_SIZE, normalize_existing
+
+
+class Command(CampusCommandMixin, BaseCommand):
+    help = "Resolve stored item locations through the gazetteer (places and canonical names), in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="Count the changes without writing them")
+        parser.add_argument('--unmatched', type=int, default=20, metavar='N',
+                            help="List the N most common locations that match no place or alias")
+
+    def handle(self, *args, **options):
+        unmatched = Counter()
+        started = time.perf_counter()
+        scanned, changed = normalize_existing(
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+            unmatched=unmatched,
+            on_chunk=lambda scanned, changed: self.stdout.write(f"  {scanned} scanned, {changed} changed"),
+        )
+        elapsed = time.perf_counter() - started
+        verb = "would change" if options['dry_run'] else "changed"
+        self.stdout.write(f"{scanned} items scanned, {changed} {verb} in {elapsed:.2f}s")
+
+        if unmatched and options['unmatched']:
+            self.stdout.write("Most common unmatched locations (add them as places or aliases):")
+            for text, count in unmatched.most_common(options['unmatched']):
+                self.stdout.write(f"  {count:>7}  {text}")
+        if changed and not options['dry_run']:
+            self.stdout.write("Location names changed; queued a rebuild_rollups task to regroup the dashboard.")
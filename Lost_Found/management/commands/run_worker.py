@@ -0,0 +1,108 @@
+import multiprocessing
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from Lost_Found import metrics
+
+
+# Spawned children unpickle these functions by importing this module before
+# django.setup() has run, so Lost_Found.tasks (and its models) is imported lazily.
+
+def _init_process():
+    # Children are spawned (not forked), so they open their own DB connections
+    django.setup()
+
+
+def run_task(leased):
+    from Lost_Found.tasks import execute
+
+    try:
+        return execute(leased)
+    finally:
+        close_old_connections()
+        metrics.registry.flush()
+
+
+class Command(BaseCommand):
+    help = "Run background tasks from the database queue with a thread or process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--mode', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds between polls when idle")
+        parser.add_argument('--once', action='store_true', help="Exit when the queue is empty")
+        parser.add_argument('--max-tasks', type=int, help="Exit after this many tasks")
+
+    def handle(self, *args, **options):
+        from Lost_Found.tasks import lease, worker_id
+
+        concurrency = options['concurrency']
+        worker = worker_id()
+        stopping = []
+
+        def stop(signum, frame):
+            stopping.append(signum)
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        if options['mode'] == 'process':
+            pool = ProcessPoolExecutor(
+                concurrency, mp_context=multiprocessing.get_context('spawn'), initializer=_init_process,
+            )
+        else:
+            pool = ThreadPoolExecutor(concurrency, thread_name_prefix='task')
+
+        running = {}
+        done_count = failed_count = leased_count = 0
+        started = time.perf_counter()
+        self.stdout.write(f"Worker {worker}: {concurrency} x {options['mode']}")
+        with pool:
+            while not stopping:
+                limit = concurrency - len(running)
+                if options['max_tasks'] is not None:
+                    limit = min(limit, options['max_tasks'] - leased_count)
+                if limit > 0:
+                    for leased in lease(limit, worker):
+                        running[pool.submit(run_task, leased)] = leased
+                        leased_count += 1
+
+                if not running:
+                    if options['once'] or (options['max_tasks'] is not None and leased_count >= options['max_tasks']):
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                finished, _ = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in finished:
+                    if self.collect(future, running.pop(future)):
+                        done_count += 1
+                    else:
+                        failed_count += 1
+
+            # Let in-flight tasks finish before exiting
+            for future in wait(running).done:
+                if self.collect(future, running.pop(future)):
+                    done_count += 1
+                else:
+                    failed_count += 1
+
+        elapsed = time.perf_counter() - started
+        metrics.registry.flush(force=True)
+        self.stdout.write(
+            f"{done_count} done, {failed_count} failed in {elapsed:.2f}s "
+            f"({(done_count + failed_count) / elapsed if elapsed else 0:.1f} tasks/s)"
+        )
+
+    def collect(self, future, leased):
+        try:
+            return future.result()
+        except Exception as e:
+            # Worker process died; the lease expires and the task runs again
+            self.stderr.write(f"Task {leased['name']} #{leased['id']} crashed: {e}")
+            return False
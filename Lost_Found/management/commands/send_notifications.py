@@ -0,0 +1,51 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from Lost_Found import metrics
+from Lost_Found.notifications import deliver_batch, open_connection
+
+
+class Command(BaseCommand):
+    help = "Drain the notification outbox: batched digest emails over one open connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.NOTIFICATION_BATCH_SIZE)
+        parser.add_argument('--once', action='store_true', help="Exit when no notification is due")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep when idle")
+
+    def handle(self, *args, **options):
+        connection = open_connection()
+        started = time.perf_counter()
+        total_sent = total_emails = total_failed = 0
+        try:
+            while True:
+                try:
+                    sent, emails, failed = deliver_batch(connection, options['batch_size'])
+                except OSError as e:
+                    # Mail server unreachable: leased rows are retried when the lease expires
+                    self.stderr.write(f"Delivery error: {e}")
+                    metrics.registry.flush()
+                    time.sleep(options['interval'])
+                    connection = open_connection()
+                    continue
+                total_sent += sent
+                total_emails += emails
+                total_failed += failed
+                metrics.registry.flush()
+                if sent or failed:
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f"{total_sent} sent in {total_emails} emails, {total_failed} failed "
+                        f"({total_sent / elapsed:.1f} notifications/s)"
+                    )
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+            metrics.registry.flush(force=True)
@@ -0,0 +1,294 @@
+# Lost_Found/media.py
+"""
+Serving and storage of uploaded media (item images).
+
+serve() answers GET/HEAD for a path under MEDIA_URL. It is used both by
+MediaMiddleware (middleware.py), which answers before sessions and auth
+run, and by the `media` route in the project urls.py, for setups without
+the middleware. Only the upload directories in MEDIA_SERVE_DIRS are
+reachable.
+
+    - the file object goes into a FileResponse, so a server with
+      wsgi.file_wrapper (gunicorn) sends it with sendfile(); ranges too,
+      since the file is positioned at the range start and Content-Length
+      bounds the copy
+    - single byte ranges (Range / If-Range) -> 206 / 416
+    - strong ETag; If-None-Match / If-Modified-Since -> 304
+    - name.ext.br / name.ext.gz next to a file are served instead of it
+      when the client accepts them
+
+New uploads are stored under content-addressed names
+(`items/flash.3f2a9c0b1d4e.webp`, see HashedFileSystemStorage). Such a name
+never points at other bytes, so it is served with an immutable, year-long
+Cache-Control and its hash as the ETag. Older names get MEDIA_MAX_AGE.
+
+process_image() (run by the `process_item_image` task after an upload)
+stores an upright, downscaled copy of a large or rotated photo.
+"""
+import hashlib
+import io
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from PIL import Image, ImageOps
+
+from . import metrics
+from .middleware import accepted_encodings
+
+HASH_LENGTH = 12
+# stem.<hash>.ext
+_HASHED_NAME = re.compile(r'\.([0-9a-f]{%d})\.[A-Za-z0-9]+$' % HASH_LENGTH)
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+# Precompressed variants, in order of preference
+VARIANTS = (('br', '.br'), ('gzip', '.gz'))
+
+
+# ================= STORAGE ==================
+
+def content_hash(content):
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()[:HASH_LENGTH]
+
+
+class HashedFileSystemStorage(FileSystemStorage):
+    """Store uploads as stem.<sha256 prefix>.ext; the same bytes are stored once."""
+
+    def hashed_name(self, name, content, max_length=None):
+        directory, filename = os.path.split(name)
+        stem, ext = os.path.splitext(filename)
+        suffix = f'.{content_hash(content)}{ext.lower()}'
+        if max_length:
+            # Shorten the stem, never the hash, to fit the column
+            stem = stem[:max(max_length - len(os.path.join(directory, suffix)), 1)]
+        return os.path.join(directory, stem + suffix)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        return super().save(self.hashed_name(name, content, max_length), content, max_length)
+
+    def get_available_name(self, name, max_length=None):
+        # A content-addressed name that exists already holds these bytes; _save reuses it
+        if _HASHED_NAME.search(name) and self.exists(name):
+            return name
+        return super().get_available_name(name, max_length)
+
+    def _save(self, name, content):
+        if _HASHED_NAME.search(name) and self.exists(name):
+            return name
+        return super()._save(name, content)
+
+
+# ================= PROCESSING ==================
+
+EXIF_ORIENTATION = 0x0112
+
+
+def process_image(field_file, max_side):
+    """Store an upright copy of an uploaded image no larger than `max_side` pixels.
+
+    Returns the new storage name, or None when the image is already upright
+    and small enough (it is left alone then).
+    """
+    with field_file.open('rb') as fh:
+        image = Image.open(fh)
+        image.load()
+    image_format = image.format
+    if max(image.size) <= max_side and image.getexif().get(EXIF_ORIENTATION, 1) == 1:
+        return None
+    image = ImageOps.exif_transpose(image)
+    image.thumbnail((max_side, max_side))
+    buffer = io.BytesIO()
+    options = {'quality': 85, 'optimize': True} if image_format == 'JPEG' else {}
+    image.save(buffer, format=image_format, **options)
+
+    # Named after the original without its content hash; the storage adds the new one
+    name = field_file.name
+    hashed = _HASHED_NAME.search(name)
+    if hashed:
+        name = name[:hashed.start()] + os.path.splitext(name)[1]
+    return field_file.storage.save(name, ContentFile(buffer.getvalue()))
+
+
+# ================= SERVING ==================
+
+class RangeFile:
+    """`length` bytes of an open file from its current position.
+
+    Exposes fileno() so wsgi.file_wrapper can sendfile() it; servers that
+    iterate instead get read(), which stops at the end of the range.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def _resolve(path):
+    """Absolute path of a servable media file, or raise Http404."""
+    top, _, rest = path.partition('/')
+    if top not in settings.MEDIA_SERVE_DIRS or not rest:
+        raise Http404('Not a media path')
+    try:
+        # Joined below the upload directory, so ".." cannot climb out of it
+        return safe_join(os.path.join(settings.MEDIA_ROOT, top), rest)
+    except SuspiciousFileOperation:
+        raise Http404('Not a media path')
+
+
+def _variant(full_path, accept_encoding):
+    """(encoding or None, path, stat result) of the representation to send."""
+    accepted = accepted_encodings(accept_encoding) if accept_encoding else {}
+    wildcard = accepted.get('*', 0.0)
+    for encoding, suffix in VARIANTS:
+        if accepted.get(encoding, wildcard) <= 0:
+            continue
+        try:
+            st = os.stat(full_path + suffix)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            return encoding, full_path + suffix, st
+    try:
+        st = os.stat(full_path)
+    except OSError:
+        raise Http404('No such media file')
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404('No such media file')
+    return None, full_path, st
+
+
+def has_variants(full_path):
+    return any(os.path.exists(full_path + suffix) for _, suffix in VARIANTS)
+
+
+def make_etag(path, st, encoding):
+    hashed = _HASHED_NAME.search(path)
+    tag = hashed.group(1) if hashed else f'{st.st_mtime_ns:x}-{st.st_size:x}'
+    return f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+
+
+def _etag_matches(header, etag):
+    # If-None-Match uses the weak comparison
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+
+def _byte_range(header, size):
+    """(start, end) inclusive for a single-range header; None to send the whole file; False if unsatisfiable."""
+    match = _RANGE.match(header.replace(' ', ''))
+    if not match:
+        # Multiple ranges or other units: answering with the whole file is allowed
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last or int(last) == 0:
+            return False
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        return False
+    return start, end
+
+
+def serve(request, path):
+    """Response for MEDIA_URL + path."""
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponseNotAllowed(['GET', 'HEAD'])
+    full_path = _resolve(path)
+    encoding, file_path, st = _variant(full_path, request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    etag = make_etag(path, st, encoding)
+
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(st.st_mtime),
+        'Accept-Ranges': 'bytes',
+        # no-transform: CompressionMiddleware and proxies leave the bytes (and byte ranges) alone
+        'Cache-Control': (
+            f'public, max-age={settings.MEDIA_IMMUTABLE_MAX_AGE}, immutable, no-transform'
+            if _HASHED_NAME.search(path) else f'public, max-age={settings.MEDIA_MAX_AGE}, no-transform'
+        ),
+    }
+    if encoding or has_variants(full_path):
+        headers['Vary'] = 'Accept-Encoding'
+
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    else:
+        since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        not_modified = since is not None and int(st.st_mtime) <= since
+    if not_modified:
+        metrics.MEDIA_RESPONSES.inc(status=304)
+        response = HttpResponseNotModified()
+        for name, value in headers.items():
+            response.headers[name] = value
+        return response
+
+    content_type, _ = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    if encoding:
+        headers['Content-Encoding'] = encoding
+
+    size = st.st_size
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    # If-Range needs a strong match; otherwise the client's partial copy is stale
+    if range_header and (if_range is None or if_range.strip() == etag):
+        byte_range = _byte_range(range_header, size)
+        if byte_range is False:
+            metrics.MEDIA_RESPONSES.inc(status=416)
+            response = HttpResponse(status=416)
+            response.headers['Content-Range'] = f'bytes */{size}'
+            return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+    status = 206 if byte_range else 200
+    if byte_range:
+        headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type, status=status)
+    else:
+        file = open(file_path, 'rb')
+        if start:
+            file.seek(start)
+        response = FileResponse(RangeFile(file, length), content_type=content_type, status=status)
+    for name, value in headers.items():
+        response.headers[name] = value
+    response.headers['Content-Length'] = str(length)
+    metrics.MEDIA_RESPONSES.inc(status=status)
+    return response
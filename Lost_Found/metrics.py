@@ -0,0 +1,311 @@
+# Lost_Found/metrics.py
+"""
+Small in-process metrics registry rendered in the Prometheus text format.
+
+Each process keeps its own values in memory. When METRICS_DIR is set, every
+process also writes a snapshot of its values to METRICS_DIR/<pid>.json (at
+most once per METRICS_FLUSH_INTERVAL seconds) and the /metrics view sums the
+snapshots of all workers, so a scrape that lands on any gunicorn worker sees
+the whole deployment. Snapshots of exited workers are kept so counters never
+go backwards; clear the directory on deploy.
+"""
+import atexit
+import bisect
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            # [count per bucket..., count above last bucket, sum]
+            values = self._values.get(key)
+            if values is None:
+                values = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            values[index] += 1
+            values[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), list(value)] for key, value in self._values.items()]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def reset(self):
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    # ---------- multiprocess ----------
+
+    def flush(self, force=False):
+        """Write this process's snapshot to METRICS_DIR (throttled)."""
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if not directory:
+            return
+        now = time.monotonic()
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+        if not force and now - self._last_flush < interval:
+            return
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = now
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as fh:
+                json.dump(self.snapshot(), fh)
+            os.replace(tmp_path, os.path.join(directory, f'{os.getpid()}.json'))
+        except OSError:
+            pass
+        finally:
+            self._flush_lock.release()
+
+    def collect(self):
+        """Return {name: {label_key: value}} summed over every process."""
+        merged = {name: {} for name in self._metrics}
+        snapshots = [self.snapshot()]
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if directory and os.path.isdir(directory):
+            own = f'{os.getpid()}.json'
+            for filename in os.listdir(directory):
+                if not filename.endswith('.json') or filename == own:
+                    continue
+                try:
+                    with open(os.path.join(directory, filename)) as fh:
+                        snapshots.append(json.load(fh))
+                except (OSError, ValueError):
+                    continue
+
+        for snapshot in snapshots:
+            for name, samples in snapshot.items():
+                if name not in merged:
+                    continue
+                target = merged[name]
+                for key, value in samples:
+                    key = tuple(key)
+                    if isinstance(value, list):
+                        current = target.get(key)
+                        target[key] = value if current is None else [a + b for a, b in zip(current, value)]
+                    else:
+                        target[key] = target.get(key, 0) + value
+        return merged
+
+    # ---------- exposition ----------
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        collected = self.collect()
+        for name, metric in self._metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for key, value in sorted(collected[name].items()):
+                labels = list(zip(metric.labelnames, key))
+                if metric.type == 'histogram':
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, value):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_format_labels(labels + [("le", _format_value(bound))])} {cumulative}')
+                    cumulative += value[len(metric.buckets)]
+                    lines.append(f'{name}_bucket{_format_labels(labels + [("le", "+Inf")])} {cumulative}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(value[-1])}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+                else:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+registry = Registry()
+
+# A forked worker must not report the values its parent had collected
+os.register_at_fork(after_in_child=registry.reset)
+atexit.register(registry.flush, force=True)
+
+
+# ================= APPLICATION METRICS ==================
+
+REQUEST_LATENCY = registry.histogram(
+    'lostfound_http_request_duration_seconds',
+    'Request latency by route name.',
+    ('route', 'method', 'status'),
+)
+DB_QUERIES = registry.counter(
+    'lostfound_db_queries_total',
+    'Database queries executed, by route name.',
+    ('route',),
+)
+CACHE_REQUESTS = registry.counter(
+    'lostfound_cache_requests_total',
+    'Cache lookups by cache name and result (hit/miss).',
+    ('cache', 'result'),
+)
+LOGINS = registry.counter(
+    'lostfound_logins_total',
+    'Login attempts by result.',
+    ('result',),
+)
+ITEMS_REPORTED = registry.counter(
+    'lostfound_items_reported_total',
+    'Items reported, by status at report time.',
+    ('status',),
+)
+ITEMS_CLAIMED = registry.counter(
+    'lostfound_items_claimed_total',
+    'Found items claimed by their owner.',
+)
+ITEMS_MARKED_FOUND = registry.counter(
+    'lostfound_items_marked_found_total',
+    'Lost items marked as found by another student.',
+)
+ITEMS_BULK_UPDATED = registry.counter(
+    'lostfound_items_bulk_updated_total',
+    'Items changed by bulk admin actions, by action.',
+    ('action',),
+)
+NOTIFICATIONS = registry.counter(
+    'lostfound_notifications_total',
+    'Outbox notifications processed, by kind and result (sent/retry/failed).',
+    ('kind', 'result'),
+)
+NOTIFICATION_EMAILS = registry.counter(
+    'lostfound_notification_emails_total',
+    'Digest emails sent by the notification worker.',
+)
+NOTIFICATION_BATCH_SECONDS = registry.histogram(
+    'lostfound_notification_batch_seconds',
+    'Time to lease and deliver one outbox batch.',
+)
+TASKS = registry.counter(
+    'lostfound_tasks_total',
+    'Background tasks finished, by task name and result (done/retry/failed).',
+    ('name', 'result'),
+)
+TASK_SECONDS = registry.histogram(
+    'lostfound_task_seconds',
+    'Background task run time.',
+    ('name',),
+)
+RESPONSE_BYTES = registry.counter(
+    'lostfound_response_bytes_total',
+    'Compressed response bytes before (raw) and after (sent) compression.',
+    ('encoding', 'stage'),
+)
+UPLOAD_BYTES = registry.counter(
+    'lostfound_upload_bytes_total',
+    'Bytes of uploaded item images.',
+)
+MEDIA_RESPONSES = registry.counter(
+    'lostfound_media_responses_total',
+    'Uploaded media responses, by status (200/206/304/416).',
+    ('status',),
+)
+
+
+def record_cache(cache, hit):
+    """Count a cache lookup; used by the caching layers for hit-rate metrics."""
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
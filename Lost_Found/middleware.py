@@ -0,0 +1,269 @@
+# Lost_Found/middleware.py
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+from . import campus, events, metrics
+
+try:
+    import brotli
+except ImportError:  # optional dependency, gzip is used without it
+    brotli = None
+
+
+class MetricsMiddleware:
+    """Record latency and DB query count per route name (see url.py)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0]
+
+        def count_query(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count_query))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        route = (match.url_name if match else None) or 'unmatched'
+        metrics.REQUEST_LATENCY.observe(elapsed, route=route, method=request.method, status=response.status_code)
+        if queries[0]:
+            metrics.DB_QUERIES.inc(queries[0], route=route)
+        metrics.registry.flush()
+        return response
+
+
+# ================= RESPONSE COMPRESSION ==================
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+# Random gzip header padding, as in Django's GZipMiddleware (BREACH mitigation)
+GZIP_MAX_RANDOM_BYTES = 100
+
+
+def accepted_encodings(header):
+    """Parse Accept-Encoding into {coding: q}."""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """Return 'br', 'gzip' or None for an Accept-Encoding header value."""
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get('*', 0.0)
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress_bytes(data, encoding, brotli_quality=4):
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality, mode=brotli.MODE_TEXT)
+    return compress_string(data, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+
+def brotli_sequence(sequence, quality=4):
+    # Flush after every chunk so streamed output reaches the client as it is produced
+    compressor = brotli.Compressor(quality=quality, mode=brotli.MODE_TEXT)
+    for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """Brotli/gzip compression for dynamic responses.
+
+    Static files are compressed ahead of time by WhiteNoise, so this sits
+    below WhiteNoiseMiddleware and only sees views. Responses smaller than
+    COMPRESSION_MIN_SIZE, non-text responses and responses that already carry
+    a Content-Encoding are passed through untouched. Streaming responses are
+    compressed chunk by chunk.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 512)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                original_iterator = response.streaming_content
+                quality = self.brotli_quality
+
+                async def compress_wrapper():
+                    if encoding == 'br':
+                        compressor = brotli.Compressor(quality=quality, mode=brotli.MODE_TEXT)
+                        async for chunk in original_iterator:
+                            yield compressor.process(chunk) + compressor.flush()
+                        yield compressor.finish()
+                    else:
+                        # Concatenated gzip members are a valid gzip stream
+                        async for chunk in original_iterator:
+                            yield compress_string(chunk, max_random_bytes=GZIP_MAX_RANDOM_BYTES)
+
+                response.streaming_content = compress_wrapper()
+            elif encoding == 'br':
+                response.streaming_content = brotli_sequence(response.streaming_content, self.brotli_quality)
+            else:
+                response.streaming_content = compress_sequence(
+                    response.streaming_content,
+                    max_random_bytes=GZIP_MAX_RANDOM_BYTES,
+                )
+            del response.headers['Content-Length']
+        else:
+            raw_size = len(response.content)
+            compressed = compress_bytes(response.content, encoding, self.brotli_quality)
+            if len(compressed) >= raw_size:
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+            metrics.RESPONSE_BYTES.inc(raw_size, encoding=encoding, stage='raw')
+            metrics.RESPONSE_BYTES.inc(len(compressed), encoding=encoding, stage='sent')
+
+        # A compressed body is a different representation: keep validators weak
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+# ================= MEDIA ==================
+
+class MediaMiddleware:
+    """Serve MEDIA_URL paths before sessions, auth and CSRF run (see media.py).
+
+    Put it next to WhiteNoiseMiddleware. Without it the `media` route in the
+    project urls.py serves the same responses.
+    """
+
+    def __init__(self, get_response):
+        from . import media  # media imports this module
+
+        self.get_response = get_response
+        self.serve = media.serve
+        self.prefix = settings.MEDIA_URL
+
+    def __call__(self, request):
+        if request.path_info.startswith(self.prefix):
+            return self.serve(request, request.path_info[len(self.prefix):])
+        return self.get_response(request)
+
+
+# ================= CAMPUS ==================
+
+def _stream_on_campus(code, content):
+    # Streaming bodies run their queries after the middleware has returned
+    iterator = iter(content)
+    while True:
+        with campus.using_campus(code):
+            chunk = next(iterator, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+class CampusMiddleware:
+    """Activate the request's campus (campus.py).
+
+    A valid ?campus= wins and is remembered in the session; then the
+    session's choice, then the user's campus, then DEFAULT_CAMPUS. Put it
+    after AuthenticationMiddleware. Does nothing with a single campus.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not campus.is_sharded():
+            return self.get_response(request)
+        code = self.campus_for(request)
+        with campus.using_campus(code):
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = _stream_on_campus(code, response.streaming_content)
+        return response
+
+    def campus_for(self, request):
+        campuses = campus.campuses()
+        requested = request.GET.get('campus')
+        if requested in campuses:
+            if request.session.get(campus.SESSION_KEY) != requested:
+                request.session[campus.SESSION_KEY] = requested
+            return requested
+        chosen = request.session.get(campus.SESSION_KEY)
+        if chosen in campuses:
+            return chosen
+        user_campus = getattr(request.user, 'campus', '')
+        return user_campus if user_campus in campuses else None
+
+
+# ================= ITEM EVENTS ==================
+
+class ItemEventMiddleware:
+    """Buffer ItemEvent rows logged during the request and insert them in one batch."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        events.start_buffer(request)
+        try:
+            return self.get_response(request)
+        finally:
+            # Also on errors: the item rows were already saved when the event was logged
+            events.flush_buffer(request)
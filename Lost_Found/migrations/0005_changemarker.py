@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Lost_Found', '0004_rename_current_location_item_location_found_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeMarker',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:15
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Lost_Found', '0005_changemarker'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['date_reported'], name='item_date_reported_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(django.db.models.functions.comparison.Collate('title', 'NOCASE'), name='item_title_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(django.db.models.functions.comparison.Collate('matric_no', 'NOCASE'), name='student_matric_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.comparison.Collate('username', 'NOCASE'), name='user_username_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.comparison.Collate('email', 'NOCASE'), name='user_email_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.comparison.Collate('last_name', 'NOCASE'), name='user_last_name_nocase_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['date_joined'], name='user_date_joined_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Lost_Found', '0006_admin_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemAudit',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('verify', 'Verified'), ('return', 'Marked returned'), ('reassign', 'Claimer reassigned')], max_length=20)),
+                ('old_value', models.CharField(blank=True, max_length=200)),
+                ('new_value', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='item_audits', to=settings.AUTH_USER_MODEL)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audits', to='Lost_Found.item')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
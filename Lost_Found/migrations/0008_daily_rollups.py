@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Lost_Found', '0007_itemaudit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyClaimTime',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('category', models.CharField(max_length=20)),
+                ('bucket', models.PositiveIntegerField(help_text='Upper bound of the bucket in hours')),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'category', 'bucket'), name='daily_claim_time_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyItemStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('metric', models.CharField(choices=[('reported', 'Reported'), ('found', 'Found'), ('claimed', 'Claimed'), ('returned', 'Returned')], max_length=10)),
+                ('category', models.CharField(max_length=20)),
+                ('department', models.CharField(blank=True, max_length=10)),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'metric', 'category', 'department', 'location'), name='daily_item_stat_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:21
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Lost_Found', '0008_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='itemaudit',
+            name='item',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='audits', to='Lost_Found.item'),
+        ),
+        migrations.CreateModel(
+            name='ItemArchive',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('category', models.CharField(choices=[('electronics', 'Electronics'), ('documents', 'Documents'), ('clothing', 'Clothing'), ('accessories', 'Accessories'), ('books', 'Books'), ('others', 'Others')], max_length=20)),
+                ('status', models.CharField(choices=[('lost', 'Lost'), ('found', 'Found'), ('returned', 'Returned')], max_length=10)),
+                ('location_found', models.CharField(blank=True, max_length=200)),
+                ('location_lost', models.CharField(blank=True, max_length=200)),
+                ('date_reported', models.DateTimeField()),
+                ('date_occurred', models.DateTimeField()),
+                ('image', models.ImageField(blank=True, null=True, upload_to='items/')),
+                ('date_claimed', models.DateTimeField(blank=True, null=True)),
+                ('is_verified', models.BooleanField(default=False)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('claimed_by', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('reported_by', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('verified_by', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date_reported'],
+                'indexes': [models.Index(fields=['date_reported', 'id'], name='archive_date_reported_idx'), models.Index(django.db.models.functions.comparison.Collate('title', 'NOCASE'), name='archive_title_nocase_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Lost_Found', '0009_itemarchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('lost', 'Lost'), ('found', 'Found'), ('returned', 'Returned'), ('claimed', 'Claimed')], max_length=10)),
+                ('to_status', models.CharField(choices=[('lost', 'Lost'), ('found', 'Found'), ('returned', 'Returned'), ('claimed', 'Claimed')], max_length=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='item_events', to=settings.AUTH_USER_MODEL)),
+                ('item', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='Lost_Found.item')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['item', 'created_at'], name='item_event_timeline_idx'), models.Index(fields=['created_at'], name='item_event_created_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Lost_Found', '0013_location_gazetteer'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['reported_by', 'date_reported', 'id', 'status', 'claimed_by'], name='item_reporter_recent_idx'),
+        ),
+    ]
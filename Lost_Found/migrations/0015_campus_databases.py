@@ -0,0 +1,65 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Lost_Found', '0014_item_reporter_recent_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='campus',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='campus',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='claimed_items', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='found_place',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='Lost_Found.location'),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='lost_place',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='Lost_Found.location'),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='reported_by',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='reported_items', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='item',
+            name='verified_by',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='verified_items', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='itemaudit',
+            name='actor',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='item_audits', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='itemevent',
+            name='actor',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='item_events', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='user',
+            field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
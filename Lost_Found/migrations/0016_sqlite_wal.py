@@ -0,0 +1,34 @@
+from django.db import migrations
+
+
+def enable_wal(apps, schema_editor):
+    # WAL lets page requests read while the task worker writes. The journal
+    # mode is stored in the database file, so it is set once here rather than
+    # on every connection.
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode=WAL')
+
+
+def disable_wal(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode=DELETE')
+
+
+class Migration(migrations.Migration):
+    # The journal mode cannot be changed inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('Lost_Found', '0015_campus_databases'),
+    ]
+
+    operations = [
+        # Routed like the item table, so campus databases are switched too
+        migrations.RunPython(enable_wal, disable_wal, hints={'model_name': 'item'}),
+    ]
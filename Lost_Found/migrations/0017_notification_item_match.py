@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Lost_Found', '0016_sqlite_wal'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='kind',
+            field=models.CharField(choices=[('item_found', 'Your lost item was found'), ('item_claimed', 'Your found item was claimed'), ('item_match', 'A found item may be yours')], max_length=20),
+        ),
+    ]
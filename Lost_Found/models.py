@@ -1,7 +1,12 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinLengthValidator, MaxLengthValidator
+from django.db.models.functions import Collate
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .campus import CampusManager
+from .validators import check_matric_department, normalize_matric_no, normalize_phone
 
 
 
@@ -23,6 +28,17 @@ class User(AbstractUser):
     email = models.EmailField(unique=True)
     date_joined = models.DateTimeField(auto_now_add=True)
     is_verified = models.BooleanField(default=False)
+    # Campus code (settings.CAMPUSES) whose database holds the student record; blank: DEFAULT_CAMPUS
+    campus = models.CharField(max_length=20, blank=True)
+    
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Case-insensitive lookups (login, admin search) can use these on SQLite
+            models.Index(Collate('username', 'NOCASE'), name='user_username_nocase_idx'),
+            models.Index(Collate('email', 'NOCASE'), name='user_email_nocase_idx'),
+            models.Index(Collate('last_name', 'NOCASE'), name='user_last_name_nocase_idx'),
+            models.Index(fields=['date_joined'], name='user_date_joined_idx'),
+        ]
     
     def __str__(self):
         return f"{self.username} ({self.get_user_type_display()})"
@@ -37,23 +53,10 @@ class User(AbstractUser):
         super().clean()
         
         if self.phone_number:
-            # Remove any non-digit characters
-            phone_digits = ''.join(filter(str.isdigit, self.phone_number))
-            
-            # Validate exactly 11 digits
-            if len(phone_digits) != 11:
-                raise ValidationError({
-                    'phone_number': 'Phone number must be exactly 11 digits.'
-                })
-            
-            # Validate starts with 0
-            if not phone_digits.startswith('0'):
-                raise ValidationError({
-                    'phone_number': 'Phone number must start with 0.'
-                })
-            
-            # Update with cleaned value
-            self.phone_number = phone_digits
+            try:
+                self.phone_number = normalize_phone(self.phone_number)
+            except ValidationError as e:
+                raise ValidationError({'phone_number': e.messages})
 
 
 
@@ -61,6 +64,8 @@ class Department(models.Model):
     name = models.CharField(max_length=100, unique=True)
     code = models.CharField(max_length=10, unique=True)
     
+    objects = CampusManager()
+    
     class Meta:
         ordering = ['name']
     
@@ -68,7 +73,16 @@ class Department(models.Model):
         return f"{self.name} ({self.code})"
 
 class Student(models.Model):
-    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    LEVEL_CHOICES = (
+        ('100', '100 Level'),
+        ('200', '200 Level'),
+        ('300', '300 Level'),
+        ('400', '400 Level'),
+        ('500', '500 Level'),
+    )
+
+    # No constraint: users are in the shared database, students in their campus database
+    user = models.OneToOneField(User, on_delete=models.CASCADE, db_constraint=False, primary_key=True)
     matric_no = models.CharField(
         max_length=10,
         unique=True,
@@ -79,16 +93,15 @@ class Student(models.Model):
         help_text="Matric number must be exactly 10 characters (e.g., U25CYS2001)"
     )
     department = models.ForeignKey(Department, on_delete=models.CASCADE)
-    level = models.CharField(max_length=50, choices=(
-        ('100', '100 Level'),
-        ('200', '200 Level'),
-        ('300', '300 Level'),
-        ('400', '400 Level'),
-        ('500', '500 Level'),
-    ))
+    level = models.CharField(max_length=50, choices=LEVEL_CHOICES)
+    
+    objects = CampusManager()
     
     class Meta:
         ordering = ['department__name', 'level']
+        indexes = [
+            models.Index(Collate('matric_no', 'NOCASE'), name='student_matric_nocase_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.matric_no}"
@@ -97,44 +110,62 @@ class Student(models.Model):
         """Validate matric number format based on department"""
         super().clean()
         
-        if not self.matric_no or len(self.matric_no) != 10:
-            raise ValidationError({
-                'matric_no': 'Matric number must be exactly 10 characters.'
-            })
-        
-        # Convert to uppercase for consistency
-        self.matric_no = self.matric_no.upper()
-        
-        # Validate matric number format: U25CYS2001
-        # Format: U + Year (2 digits) + Department Code (3 letters) + Number (4 digits)
-        if not self.matric_no.startswith('U'):
-            raise ValidationError({
-                'matric_no': 'Matric number must start with "U".'
-            })
-        
-        if not self.matric_no[1:3].isdigit():
-            raise ValidationError({
-                'matric_no': 'Characters 2-3 must be year digits.'
-            })
-        
-        department_code = self.matric_no[3:6]
-        if not department_code.isalpha() or not department_code.isupper():
-            raise ValidationError({
-                'matric_no': 'Characters 4-6 must be uppercase department code letters.'
-            })
-        
-        if not self.matric_no[6:].isdigit():
-            raise ValidationError({
-                'matric_no': 'Characters 7-10 must be numeric.'
-            })
-        
-        # Validate department code matches selected department
-        if self.department and department_code != self.department.code:
-            raise ValidationError({
-                'matric_no': f'Matric number department code "{department_code}" does not match selected department "{self.department.name}" (code: {self.department.code}).'
-            })
+        try:
+            # Format: U + Year (2 digits) + Department Code (3 letters) + Number (4 digits)
+            self.matric_no = normalize_matric_no(self.matric_no)
+            
+            # Validate department code matches selected department
+            if self.department_id:
+                from .refdata import department  # refdata imports this module
+
+                check_matric_department(self.matric_no, department(self.department_id) or self.department)
+        except ValidationError as e:
+            raise ValidationError({'matric_no': e.messages})
+
 
 
+class Location(models.Model):
+    """A named place on campus; free-text item locations are resolved to these."""
+    name = models.CharField(max_length=100, unique=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    # Set from the coordinates on save; prefix ranges find nearby places
+    geohash = models.CharField(max_length=12, db_index=True, editable=False)
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    def save(self, *args, **kwargs):
+        from .gazetteer import encode_geohash  # gazetteer imports this module
+
+        self.geohash = encode_geohash(self.latitude, self.longitude)
+        super().save(*args, **kwargs)
+
+class LocationAlias(models.Model):
+    """Another spelling of a Location, e.g. "cyber lab 2" for "Lab 2".
+
+    Matched on the alias key (lower case, letters and digits only), so
+    "Lab 2", "lab2" and "LAB-2" are the same alias.
+    """
+    location = models.ForeignKey(Location, on_delete=models.CASCADE, related_name='aliases')
+    alias = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True, editable=False)
+    
+    class Meta:
+        verbose_name_plural = 'location aliases'
+        ordering = ['alias']
+    
+    def __str__(self):
+        return f"{self.alias} -> {self.location_id}"
+    
+    def save(self, *args, **kwargs):
+        from .gazetteer import alias_key
+
+        self.key = alias_key(self.alias)
+        super().save(*args, **kwargs)
 
 class Item(models.Model):
     STATUS_CHOICES = (
@@ -158,20 +189,259 @@ class Item(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES)
     location_found = models.CharField(max_length=200, blank=True)
     location_lost = models.CharField(max_length=200, blank=True)
+    # Gazetteer matches for the two text fields, set on save (see gazetteer.py)
+    lost_place = models.ForeignKey(Location, on_delete=models.SET_NULL, db_constraint=False, null=True, blank=True, related_name='+')
+    found_place = models.ForeignKey(Location, on_delete=models.SET_NULL, db_constraint=False, null=True, blank=True, related_name='+')
     date_reported = models.DateTimeField(auto_now_add=True)
     date_occurred = models.DateTimeField()
     image = models.ImageField(upload_to='items/', blank=True, null=True)
-    reported_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reported_items')
+    # Users and places carry no constraint: items can live in a campus database (campus.py)
+    reported_by = models.ForeignKey(User, on_delete=models.CASCADE, db_constraint=False, related_name='reported_items')
     
     # If item is found and claimed
-    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='claimed_items')
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, db_constraint=False, null=True, blank=True, related_name='claimed_items')
     date_claimed = models.DateTimeField(null=True, blank=True)
     
     is_verified = models.BooleanField(default=False)
-    verified_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='verified_items')
+    verified_by = models.ForeignKey(User, on_delete=models.SET_NULL, db_constraint=False, null=True, blank=True, related_name='verified_items')
+    
+    objects = CampusManager()
+    
+    class Meta:
+        ordering = ['-date_reported']
+        indexes = [
+            models.Index(fields=['date_reported'], name='item_date_reported_idx'),
+            models.Index(Collate('title', 'NOCASE'), name='item_title_nocase_idx'),
+            # "My reports" keyset pages; status and claimer ride along so the per-user counts never touch the table
+            models.Index(fields=['reported_by', 'date_reported', 'id', 'status', 'claimed_by'], name='item_reporter_recent_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} - {self.get_status_display()}"
+
+class ItemArchive(models.Model):
+    """Cold copy of an Item moved out of the live table by `archive_items`.
+
+    Keeps the original id and column names, so the item filters and API
+    serializers work on it unchanged. User references carry no database
+    constraint, so the table can live in a separate archive database.
+    """
+    id = models.IntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    category = models.CharField(max_length=20, choices=Item.CATEGORY_CHOICES)
+    status = models.CharField(max_length=10, choices=Item.STATUS_CHOICES)
+    location_found = models.CharField(max_length=200, blank=True)
+    location_lost = models.CharField(max_length=200, blank=True)
+    lost_place = models.ForeignKey(Location, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+')
+    found_place = models.ForeignKey(Location, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+')
+    date_reported = models.DateTimeField()
+    date_occurred = models.DateTimeField()
+    image = models.ImageField(upload_to='items/', blank=True, null=True)
+    reported_by = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    claimed_by = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+')
+    date_claimed = models.DateTimeField(null=True, blank=True)
+    is_verified = models.BooleanField(default=False)
+    verified_by = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+')
+    archived_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
         ordering = ['-date_reported']
+        indexes = [
+            models.Index(fields=['date_reported', 'id'], name='archive_date_reported_idx'),
+            models.Index(Collate('title', 'NOCASE'), name='archive_title_nocase_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.title} - {self.get_status_display()} (archived)"
+
+class ItemAudit(models.Model):
+    """One row per item changed by a bulk admin action or command."""
+    ACTION_CHOICES = (
+        ('verify', 'Verified'),
+        ('return', 'Marked returned'),
+        ('reassign', 'Claimer reassigned'),
+    )
+    
+    # No constraint: audit rows outlive archived items (ItemArchive keeps the id)
+    item = models.ForeignKey(Item, on_delete=models.DO_NOTHING, db_constraint=False, related_name='audits')
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, db_constraint=False, null=True, blank=True, related_name='item_audits')
+    old_value = models.CharField(max_length=200, blank=True)
+    new_value = models.CharField(max_length=200, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.item_id} {self.get_action_display()}"
+
+class ItemEvent(models.Model):
+    """Append-only log of item status transitions (written in batches by events.py)."""
+    STATUS_CHOICES = Item.STATUS_CHOICES + (
+        ('claimed', 'Claimed'),
+    )
+    VERBS = {
+        'lost': 'reported lost',
+        'found': 'marked as found',
+        'claimed': 'claimed',
+        'returned': 'marked as returned',
+    }
+    
+    # No constraint: events outlive archived items; (item, created_at) serves per-item timelines
+    item = models.ForeignKey(Item, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='events')
+    actor = models.ForeignKey(User, on_delete=models.SET_NULL, db_constraint=False, null=True, blank=True, related_name='item_events')
+    from_status = models.CharField(max_length=10, blank=True, choices=STATUS_CHOICES)
+    to_status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['item', 'created_at'], name='item_event_timeline_idx'),
+            models.Index(fields=['created_at'], name='item_event_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.item_id}: {self.from_status or '-'} -> {self.to_status}"
+    
+    @property
+    def verb(self):
+        if not self.from_status and self.to_status == 'found':
+            return 'reported found'
+        return self.VERBS.get(self.to_status, self.to_status)
+
+class Notification(models.Model):
+    """Outbox row: written with the status change, delivered by `send_notifications`."""
+    KIND_CHOICES = (
+        ('item_found', 'Your lost item was found'),
+        ('item_claimed', 'Your found item was claimed'),
+        ('item_match', 'A found item may be yours'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    item = models.ForeignKey(Item, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+')
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # Next delivery attempt; while 'sending' it is the end of the worker's lease
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['available_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='notification_due_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.title} - {self.get_status_display()}"
\ No newline at end of file
+        return f"{self.get_kind_display()} -> {self.recipient_id} ({self.status})"
+
+class Task(models.Model):
+    """Background job in the database queue (see tasks.py, `run_worker`)."""
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    # Campus the task was queued from (campus.py); it runs with that campus active
+    campus = models.CharField(max_length=20, blank=True)
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    # While running: when the lease expires and another worker may take the task over
+    leased_until = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_at'], name='task_due_idx'),
+            models.Index(fields=['status', 'leased_until'], name='task_lease_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+class DailyItemStat(models.Model):
+    """Rollup: item events per day, category, reporter department and location.
+
+    Maintained incrementally by rollups.py and rebuilt by `rebuild_rollups`.
+    """
+    METRIC_CHOICES = (
+        ('reported', 'Reported'),
+        ('found', 'Found'),
+        ('claimed', 'Claimed'),
+        ('returned', 'Returned'),
+    )
+    
+    day = models.DateField()
+    metric = models.CharField(max_length=10, choices=METRIC_CHOICES)
+    category = models.CharField(max_length=20)
+    department = models.CharField(max_length=10, blank=True)
+    location = models.CharField(max_length=100, blank=True)
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'metric', 'category', 'department', 'location'], name='daily_item_stat_key'),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.metric} {self.category}: {self.count}"
+
+class DailyClaimTime(models.Model):
+    """Rollup: claims per day and category, bucketed by hours from date_occurred to date_claimed."""
+    day = models.DateField()
+    category = models.CharField(max_length=20)
+    bucket = models.PositiveIntegerField(help_text="Upper bound of the bucket in hours")
+    count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'category', 'bucket'], name='daily_claim_time_key'),
+        ]
+    
+    def __str__(self):
+        return f"{self.day} {self.category} <={self.bucket}h: {self.count}"
+
+class ChangeMarker(models.Model):
+    """Per-table change counter, bumped on every write.
+
+    Lets list pages build HTTP validators (ETag / Last-Modified) from a
+    single primary-key lookup instead of scanning the table.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.BigIntegerField(default=0)
+    changed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+    @classmethod
+    def bump(cls, name):
+        updated = cls.objects.filter(name=name).update(
+            version=models.F('version') + 1,
+            changed_at=timezone.now(),
+        )
+        if not updated:
+            cls.objects.get_or_create(name=name, defaults={'version': 1})
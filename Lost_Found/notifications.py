@@ -0,0 +1,228 @@
+# Lost_Found/notifications.py
+"""
+Transactional outbox for owner/finder notifications.
+
+Views call notify_item_found() / notify_item_claimed() inside the same
+transaction as the item update, so a notification exists exactly when the
+status change was committed. The `match_item` task adds
+notify_possible_match() rows for new reports. The `send_notifications`
+worker drains the outbox in batches:
+
+    1. lease a batch of due rows (status -> 'sending', available_at -> lease end)
+    2. coalesce each recipient's rows into one digest email
+    3. send every digest over one open email connection
+    4. mark rows sent, or schedule a retry with exponential backoff
+
+A worker that dies mid-batch leaves rows 'sending'; they become due again
+when their lease expires, and reclaiming an expired lease counts as a failed
+attempt so a row that keeps killing workers is eventually given up on.
+"""
+import logging
+import textwrap
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Case, F, PositiveSmallIntegerField, Q, When
+from django.utils import timezone
+
+from . import metrics
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+LEASE_SECONDS = 300
+SITE_NAME = 'AFIT Lost & Found'
+EXPIRED_LEASE = 'Delivery lease expired before the worker finished.'
+
+
+# ================= ENQUEUE ==================
+
+def _display_name(user):
+    return user.get_full_name() or user.username
+
+
+def enqueue(recipient, kind, subject, body, item=None):
+    return Notification.objects.create(
+        recipient=recipient,
+        kind=kind,
+        item=item,
+        subject=subject,
+        body=body,
+    )
+
+
+def notify_item_found(item, finder, location):
+    """Tell the owner of a lost item that `finder` found it."""
+    return enqueue(
+        item.reported_by, 'item_found',
+        subject=f'Your lost item "{item.title}" was found',
+        body=(
+            f'{_display_name(finder)} marked your lost item "{item.title}" as found'
+            f'{f" at {location}" if location else ""}.\n'
+            f'Contact: {finder.email}'
+        ),
+        item=item,
+    )
+
+
+def notify_item_claimed(item, claimer):
+    """Tell the finder of an item that `claimer` claimed it."""
+    return enqueue(
+        item.reported_by, 'item_claimed',
+        subject=f'"{item.title}" was claimed',
+        body=(
+            f'{_display_name(claimer)} claimed the item "{item.title}" you found.\n'
+            f'Contact: {claimer.email}'
+            f'{f", {claimer.phone_number}" if claimer.phone_number else ""}'
+        ),
+        item=item,
+    )
+
+
+def notify_possible_match(lost, found):
+    """Tell the owner of `lost` that the newly matched `found` item may be theirs."""
+    location = found.location_found
+    return enqueue(
+        lost.reported_by, 'item_match',
+        subject=f'A found item may be your "{lost.title}"',
+        body=(
+            f'"{found.title}" was reported found{f" at {location}" if location else ""}.\n'
+            f'It may be the item you reported lost, "{lost.title}".'
+        ),
+        item=lost,
+    )
+
+
+# ================= DELIVERY ==================
+
+def retry_delay(attempts):
+    """Backoff before attempt number `attempts + 1`."""
+    base = settings.NOTIFICATION_RETRY_BASE_SECONDS
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), settings.NOTIFICATION_RETRY_MAX_SECONDS))
+
+
+def lease_batch(size, now=None):
+    """Claim up to `size` due notifications for this worker; returns them with recipients loaded."""
+    now = now or timezone.now()
+    lease_until = now + timedelta(seconds=LEASE_SECONDS)
+    due = Q(status='pending') | Q(status='sending')
+    expired = Q(status='sending', available_at__lte=now)
+    with transaction.atomic():
+        # An expired lease means a worker died holding the row: that was an
+        # attempt, and the last one allowed ends the row
+        Notification.objects.filter(
+            expired, attempts__gte=settings.NOTIFICATION_MAX_ATTEMPTS - 1,
+        ).update(status='failed', attempts=F('attempts') + 1, last_error=EXPIRED_LEASE)
+        ids = list(
+            Notification.objects.filter(due, available_at__lte=now)
+            .order_by('available_at').values_list('pk', flat=True)[:size]
+        )
+        if not ids:
+            return []
+        # Only rows still due are taken, so two workers never lease the same row
+        Notification.objects.filter(due, pk__in=ids, available_at__lte=now).update(
+            status='sending', available_at=lease_until,
+            attempts=Case(
+                When(status='sending', then=F('attempts') + 1), default=F('attempts'),
+                output_field=PositiveSmallIntegerField(),
+            ),
+        )
+    # The lease end identifies this worker's rows
+    return list(
+        Notification.objects.filter(pk__in=ids, status='sending', available_at=lease_until)
+        .select_related('recipient').order_by('recipient_id', 'created_at')
+    )
+
+
+def build_digests(notifications):
+    """Group notifications by recipient: [(recipient, [notification, ...]), ...]."""
+    digests = {}
+    for notification in notifications:
+        digests.setdefault(notification.recipient_id, (notification.recipient, []))[1].append(notification)
+    return list(digests.values())
+
+
+def digest_message(recipient, notifications, connection):
+    if len(notifications) == 1:
+        subject = notifications[0].subject
+        body = notifications[0].body
+    else:
+        subject = f'{len(notifications)} updates on your {SITE_NAME} items'
+        body = '\n\n'.join(f'- {n.subject}\n' + textwrap.indent(n.body, '  ') for n in notifications)
+    greeting = f'Hello {recipient.first_name or recipient.username},\n\n'
+    return EmailMessage(
+        subject=f'[{SITE_NAME}] {subject}',
+        body=greeting + body + f'\n\n-- {SITE_NAME}',
+        to=[recipient.email],
+        connection=connection,
+    )
+
+
+def _mark_failed(notifications, error, now):
+    """Schedule retries, or give up after NOTIFICATION_MAX_ATTEMPTS."""
+    max_attempts = settings.NOTIFICATION_MAX_ATTEMPTS
+    for notification in notifications:
+        attempts = notification.attempts + 1
+        final = attempts >= max_attempts
+        Notification.objects.filter(pk=notification.pk).update(
+            status='failed' if final else 'pending',
+            attempts=attempts,
+            available_at=now if final else now + retry_delay(attempts),
+            last_error=error[:1000],
+        )
+        metrics.NOTIFICATIONS.inc(kind=notification.kind, result='failed' if final else 'retry')
+
+
+def _mark_sent(notifications):
+    # Per digest, so a later failure in the batch cannot cause a re-send
+    Notification.objects.filter(pk__in=[n.pk for n in notifications]).update(
+        status='sent', sent_at=timezone.now(), attempts=F('attempts') + 1, last_error='',
+    )
+    for notification in notifications:
+        metrics.NOTIFICATIONS.inc(kind=notification.kind, result='sent')
+
+
+def deliver_batch(connection, size=None):
+    """Lease and deliver one batch; returns (notifications sent, emails sent, failed)."""
+    size = size or settings.NOTIFICATION_BATCH_SIZE
+    started = time.perf_counter()
+    batch = lease_batch(size)
+    if not batch:
+        return 0, 0, 0
+
+    sent = emails = failed = 0
+    now = timezone.now()
+    try:
+        for recipient, notifications in build_digests(batch):
+            if not recipient.email:
+                _mark_failed(notifications, 'Recipient has no email address.', now)
+                failed += len(notifications)
+                continue
+            try:
+                connection.send_messages([digest_message(recipient, notifications, connection)])
+            except Exception as e:
+                logger.warning("Notification delivery failed", extra={'user_id': recipient.pk, 'error': str(e)})
+                _mark_failed(notifications, f'{type(e).__name__}: {e}', now)
+                failed += len(notifications)
+                # Reset a possibly broken SMTP session before the next digest;
+                # if it cannot reopen, the rest of the batch waits for its lease
+                connection.close()
+                connection.open()
+                continue
+            _mark_sent(notifications)
+            emails += 1
+            sent += len(notifications)
+    finally:
+        metrics.NOTIFICATION_EMAILS.inc(emails)
+        metrics.NOTIFICATION_BATCH_SECONDS.observe(time.perf_counter() - started)
+    return sent, emails, failed
+
+
+def open_connection():
+    """One email connection kept open across batches (SMTP keeps its session)."""
+    connection = get_connection(fail_silently=False)
+    connection.open()
+    return connection
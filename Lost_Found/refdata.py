@@ -0,0 +1,156 @@
+# Lost_Found/refdata.py
+"""
+Process-local cache of reference data: departments and static choice lists.
+
+Departments change a few times a year but are read on every registration
+form render and validation. Each process keeps them in memory as an ordered
+tuple plus id -> department and code -> department maps, one set per campus
+database (campus.py).
+
+Saving or deleting a Department bumps the `department` ChangeMarker. Every
+process compares the version it loaded against the marker at most once per
+REFDATA_CHECK_SECONDS and reloads when the version has moved. An edit in
+DepartmentAdmin is therefore visible at once in the process that made it,
+and in every other worker within that window. VersionedCache implements
+this for any marker; the location gazetteer (gazetteer.py) uses it too.
+
+The cached Department instances are shared between requests and threads.
+Treat them as read-only.
+"""
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from . import campus, metrics
+from .models import ChangeMarker, Department, Item, Student
+
+logger = logging.getLogger(__name__)
+
+DEPARTMENT_MARKER = 'department'
+
+# Static choice lists, defined once on the models
+CATEGORY_CHOICES = Item.CATEGORY_CHOICES
+STATUS_CHOICES = Item.STATUS_CHOICES
+LEVEL_CHOICES = Student.LEVEL_CHOICES
+
+_Departments = namedtuple('_Departments', 'version ordered by_id by_code')
+
+
+# ================= VERSIONED CACHE ==================
+
+class VersionedCache:
+    """A per-process snapshot reloaded when its ChangeMarker moves.
+
+    `load` returns the snapshot; it must have a `version` attribute taken
+    from the marker *before* the rows were read, so an edit committed in
+    between only causes one extra reload.
+    """
+
+    def __init__(self, marker, load, name):
+        self.marker = marker
+        self.load = load
+        self.name = name
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.checked_at = 0.0
+
+    def version(self):
+        return ChangeMarker.objects.filter(name=self.marker).values_list('version', flat=True).first() or 0
+
+    def get(self):
+        snapshot = self.snapshot
+        if snapshot is not None and time.monotonic() - self.checked_at < settings.REFDATA_CHECK_SECONDS:
+            metrics.record_cache(self.name, hit=True)
+            return snapshot
+        with self.lock:
+            now = time.monotonic()
+            if self.snapshot is None or (now - self.checked_at >= settings.REFDATA_CHECK_SECONDS
+                                         and self.version() != self.snapshot.version):
+                self.snapshot = self.load(self.version())
+                metrics.record_cache(self.name, hit=False)
+            else:
+                metrics.record_cache(self.name, hit=True)
+            self.checked_at = now
+            return self.snapshot
+
+    def invalidate(self):
+        """Drop this process's copy; the next lookup reloads it."""
+        with self.lock:
+            self.snapshot = None
+
+    def changed(self):
+        """Bump the version stamp so every worker reloads (call from save/delete signals)."""
+        ChangeMarker.bump(self.marker)
+        transaction.on_commit(self.invalidate)
+
+    def warm(self):
+        """Load ahead of the first request; skipped if the tables do not exist yet."""
+        try:
+            self.get()
+        except DatabaseError as e:
+            logger.warning("Reference data not preloaded", extra={'cache': self.name, 'error': str(e)})
+
+
+def _load_departments(version):
+    ordered = tuple(Department.objects.order_by('name'))
+    return _Departments(
+        version,
+        ordered,
+        {department.pk: department for department in ordered},
+        {department.code.upper(): department for department in ordered},
+    )
+
+
+# One snapshot per campus database (campus.py); all share the `department` marker
+_departments = {}
+
+
+def _cache():
+    db = campus.alias()
+    cache = _departments.get(db)
+    if cache is None:
+        cache = _departments.setdefault(db, VersionedCache(DEPARTMENT_MARKER, _load_departments, 'refdata'))
+    return cache
+
+
+def _current():
+    return _cache().get()
+
+
+def invalidate():
+    for cache in list(_departments.values()):
+        cache.invalidate()
+
+
+def department_changed():
+    ChangeMarker.bump(DEPARTMENT_MARKER)
+    transaction.on_commit(invalidate)
+
+
+def warm():
+    for code in campus.campuses():
+        with campus.using_campus(code):
+            _cache().warm()
+
+
+# ================= LOOKUPS ==================
+
+def departments():
+    """All departments ordered by name."""
+    return _current().ordered
+
+
+def department(pk):
+    return _current().by_id.get(pk)
+
+
+def department_by_code(code):
+    return _current().by_code.get((code or '').upper())
+
+
+def departments_by_code():
+    return _current().by_code
@@ -0,0 +1,322 @@
+# Lost_Found/rollups.py
+"""
+Daily analytics rollups for the admin dashboard.
+
+DailyItemStat counts four events per day, category, reporter department and
+location:
+
+    reported   the item was created
+    found      the item became "found" (reported found, or a lost item marked found)
+    claimed    claimed_by was set
+    returned   the item became "returned"
+
+DailyClaimTime counts claims per day and category, bucketed by the hours
+between date_occurred and date_claimed, so the median time-to-claim can be
+read from the bucket counts.
+
+Single-item writes update the rollups from the Item post_save signal (the
+previous status/claimer are read by pk on pre_save, only for saves that can
+change them). Bulk paths that skip signals call record_history() or
+record_transition() directly. rebuild() recomputes a date range from the Item
+and ItemArchive tables: the `rebuild_rollups` command for backfills.
+Archiving keeps an item's history, since the rebuild reads archived rows too.
+
+Reports are filed under where the item was lost (or found, for found
+reports); the other events under where it was found when that is known.
+Item has no "found at" or "returned at" timestamp, so rebuilt history dates
+found on date_reported and returned on date_claimed (or date_reported).
+"""
+from collections import Counter
+from datetime import timedelta
+from itertools import islice
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import F, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+from .models import DailyClaimTime, DailyItemStat, Item, ItemArchive, Student
+
+# Upper bounds in hours; claims slower than the last bound go to CLAIM_TIME_OVERFLOW
+CLAIM_TIME_BUCKETS = (1, 3, 6, 12, 24, 48, 72, 168, 336, 720, 2160, 8760)
+CLAIM_TIME_OVERFLOW = 100000
+
+METRICS = [value for value, _ in DailyItemStat.METRIC_CHOICES]
+LOCATION_LENGTH = DailyItemStat._meta.get_field('location').max_length
+
+HISTORY_COLUMNS = (
+    'category', 'status', 'location_lost', 'location_found', 'date_reported',
+    'date_occurred', 'date_claimed', 'claimed_by_id', 'reporter_department',
+)
+
+
+# ================= KEYS ==================
+
+def _day(value):
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def normalize_location(value):
+    return ' '.join((value or '').split()).lower()[:LOCATION_LENGTH]
+
+
+def item_location(status, location_lost, location_found):
+    """Where the item was found if known, else where it was lost."""
+    if status in ('found', 'returned') and location_found:
+        return normalize_location(location_found)
+    return normalize_location(location_lost)
+
+
+def report_location(location_lost, location_found):
+    """Location a report is filed under; stays the same when a lost item is later found."""
+    return normalize_location(location_lost or location_found)
+
+
+def claim_bucket(date_occurred, date_claimed):
+    hours = max((date_claimed - date_occurred).total_seconds(), 0) / 3600
+    for bound in CLAIM_TIME_BUCKETS:
+        if hours <= bound:
+            return bound
+    return CLAIM_TIME_OVERFLOW
+
+
+def _with_reporter_department(queryset):
+    # A subquery on Student rather than a join through User: students sit in
+    # the items' (campus) database, users may not (campus.py)
+    department = Student.objects.filter(user_id=OuterRef('reported_by_id')).values('department__code')[:1]
+    return queryset.annotate(reporter_department=Subquery(department))
+
+
+def _archived_history(chunk_size):
+    """HISTORY_COLUMNS rows of archived items.
+
+    The archive may be a database of its own, so the reporters' departments
+    are looked up per chunk instead of with a subquery.
+    """
+    columns = HISTORY_COLUMNS[:-1] + ('reported_by_id',)
+    rows = ItemArchive.objects.order_by().values_list(*columns).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        departments = dict(
+            Student.objects.filter(user_id__in={row[-1] for row in chunk}).values_list('user_id', 'department__code')
+        )
+        for row in chunk:
+            yield row[:-1] + (departments.get(row[-1]),)
+
+
+def _department_code(user_id):
+    return Student.objects.filter(user_id=user_id).values_list('department__code', flat=True).first() or ''
+
+
+# ================= WRITING ==================
+
+def _increment(model, key, amount):
+    updated = model.objects.filter(**key).update(count=F('count') + amount)
+    if updated:
+        return
+    try:
+        with transaction.atomic(using=router.db_for_write(model)):
+            model.objects.create(count=amount, **key)
+    except IntegrityError:
+        # Created concurrently by another request
+        model.objects.filter(**key).update(count=F('count') + amount)
+
+
+def apply_counts(stats, claim_times=()):
+    """Add Counter({(day, metric, category, department, location): n}) and
+    Counter({(day, category, bucket): n}) to the rollup tables."""
+    for (day, metric, category, department, location), amount in stats.items():
+        _increment(DailyItemStat, {
+            'day': day, 'metric': metric, 'category': category,
+            'department': department, 'location': location,
+        }, amount)
+    for (day, category, bucket), amount in dict(claim_times).items():
+        _increment(DailyClaimTime, {'day': day, 'category': category, 'bucket': bucket}, amount)
+
+
+def _history_events(row, stats, claim_times):
+    """Count the events an item's current state implies (backfill / bulk inserts)."""
+    (category, status, location_lost, location_found, date_reported,
+     date_occurred, date_claimed, claimed_by_id, department) = row
+    department = department or ''
+    location = item_location(status, location_lost, location_found)
+
+    stats[(_day(date_reported), 'reported', category, department, report_location(location_lost, location_found))] += 1
+    if status == 'found' or (status == 'returned' and location_found):
+        stats[(_day(date_reported), 'found', category, department, location)] += 1
+    if claimed_by_id and date_claimed:
+        stats[(_day(date_claimed), 'claimed', category, department, location)] += 1
+        claim_times[(_day(date_claimed), category, claim_bucket(date_occurred, date_claimed))] += 1
+    if status == 'returned':
+        stats[(_day(date_claimed or date_reported), 'returned', category, department, location)] += 1
+
+
+def record_history(queryset):
+    """Count events for newly inserted items (bulk_create skips post_save)."""
+    stats, claim_times = Counter(), Counter()
+    for row in _with_reporter_department(queryset.order_by()).values_list(*HISTORY_COLUMNS).iterator():
+        _history_events(row, stats, claim_times)
+    apply_counts(stats, claim_times)
+
+
+def record_transition(queryset, metric, when=None):
+    """Count one `metric` event for each item of `queryset` (bulk updates)."""
+    when = when or timezone.now()
+    day = _day(when)
+    stats, claim_times = Counter(), Counter()
+    columns = ('category', 'status', 'location_lost', 'location_found', 'date_occurred', 'reporter_department')
+    for category, status, location_lost, location_found, date_occurred, department in (
+            _with_reporter_department(queryset.order_by()).values_list(*columns).iterator()):
+        stats[(day, metric, category, department or '', item_location(status, location_lost, location_found))] += 1
+        if metric == 'claimed':
+            claim_times[(day, category, claim_bucket(date_occurred, when))] += 1
+    apply_counts(stats, claim_times)
+
+
+def remember_state(instance, using=None, update_fields=None):
+    """Read the stored status and claimer before a save (pre_save).
+
+    Skipped for new items and for saves whose update_fields leave both
+    alone; transitions of those saves are not counted.
+    """
+    instance._rollup_state = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and not {'status', 'claimed_by', 'claimed_by_id'} & set(update_fields):
+        return
+    instance._rollup_state = (
+        Item.objects.using(using).filter(pk=instance.pk).values_list('status', 'claimed_by_id').first()
+    )
+
+
+def record_item_change(instance, created):
+    """Count the events a single save produced (post_save)."""
+    previous = (None, None) if created else getattr(instance, '_rollup_state', None)
+    if previous is None:
+        return
+    previous_status, previous_claimer = previous
+
+    events = []
+    if created:
+        events.append(('reported', instance.date_reported))
+    if instance.status == 'found' and previous_status != 'found' and (created or previous_status == 'lost'):
+        events.append(('found', timezone.now()))
+    if instance.claimed_by_id and not previous_claimer:
+        events.append(('claimed', instance.date_claimed or timezone.now()))
+    if instance.status == 'returned' and previous_status != 'returned':
+        events.append(('returned', instance.date_claimed or timezone.now()))
+    if not events:
+        return
+
+    department = _department_code(instance.reported_by_id)
+    location = item_location(instance.status, instance.location_lost, instance.location_found)
+    stats, claim_times = Counter(), Counter()
+    for metric, when in events:
+        where = report_location(instance.location_lost, instance.location_found) if metric == 'reported' else location
+        stats[(_day(when), metric, instance.category, department, where)] += 1
+        if metric == 'claimed':
+            claim_times[(_day(when), instance.category, claim_bucket(instance.date_occurred, when))] += 1
+    apply_counts(stats, claim_times)
+
+
+def rebuild(since=None, until=None, chunk_size=2000):
+    """Recompute the rollups for days in [since, until] (all days if omitted)."""
+    # Events on a day can come from items reported earlier, so every item is
+    # read, archived ones included
+    stats, claim_times = Counter(), Counter()
+    items = _with_reporter_department(Item.objects.order_by())
+    for row in items.values_list(*HISTORY_COLUMNS).iterator(chunk_size=chunk_size):
+        _history_events(row, stats, claim_times)
+    for row in _archived_history(chunk_size):
+        _history_events(row, stats, claim_times)
+
+    def in_range(day):
+        return (since is None or day >= since) and (until is None or day <= until)
+
+    stat_rows = [
+        DailyItemStat(day=day, metric=metric, category=category, department=department,
+                      location=location, count=count)
+        for (day, metric, category, department, location), count in stats.items()
+        if in_range(day)
+    ]
+    claim_rows = [
+        DailyClaimTime(day=day, category=category, bucket=bucket, count=count)
+        for (day, category, bucket), count in claim_times.items()
+        if in_range(day)
+    ]
+
+    day_filter = {}
+    if since:
+        day_filter['day__gte'] = since
+    if until:
+        day_filter['day__lte'] = until
+    with transaction.atomic(using=router.db_for_write(DailyItemStat)):
+        DailyItemStat.objects.filter(**day_filter).delete()
+        DailyClaimTime.objects.filter(**day_filter).delete()
+        DailyItemStat.objects.bulk_create(stat_rows, batch_size=chunk_size)
+        DailyClaimTime.objects.bulk_create(claim_rows, batch_size=chunk_size)
+    return sum(row.count for row in stat_rows)
+
+
+# ================= READING ==================
+
+def median_claim_hours(bucket_counts):
+    """Median hours-to-claim from {bucket upper bound: count}, interpolated within the bucket."""
+    total = sum(bucket_counts.values())
+    if not total:
+        return None
+    half = total / 2
+    seen = 0
+    lower = 0
+    for bound in CLAIM_TIME_BUCKETS + (CLAIM_TIME_OVERFLOW,):
+        count = bucket_counts.get(bound, 0)
+        if count and seen + count >= half:
+            if bound == CLAIM_TIME_OVERFLOW:
+                return lower
+            return lower + (bound - lower) * (half - seen) / count
+        seen += count
+        lower = bound
+    return lower
+
+
+def dashboard_summary(days=30, today=None):
+    """Everything the admin dashboard shows for the last `days` days, read from the rollups."""
+    today = today or timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    stats = DailyItemStat.objects.filter(day__gte=start, day__lte=today)
+
+    def grouped(*fields):
+        return stats.order_by().values(*fields).annotate(n=Sum('count'))
+
+    totals = dict.fromkeys(METRICS, 0)
+    daily = {start + timedelta(days=n): dict.fromkeys(METRICS, 0) for n in range(days)}
+    for row in grouped('day', 'metric'):
+        totals[row['metric']] += row['n']
+        daily[row['day']][row['metric']] = row['n']
+
+    by_category = {}
+    for row in grouped('category', 'metric'):
+        by_category.setdefault(row['category'], dict.fromkeys(METRICS, 0))[row['metric']] = row['n']
+
+    by_department = {}
+    for row in grouped('department', 'metric'):
+        by_department.setdefault(row['department'] or 'Unknown', dict.fromkeys(METRICS, 0))[row['metric']] = row['n']
+
+    top_locations = [
+        (row['location'], row['n'])
+        for row in grouped('location').filter(metric='reported').exclude(location='').order_by('-n')[:10]
+    ]
+
+    buckets = dict(
+        DailyClaimTime.objects.filter(day__gte=start, day__lte=today).order_by()
+        .values_list('bucket').annotate(n=Sum('count'))
+    )
+    return {
+        'start': start,
+        'end': today,
+        'totals': totals,
+        'daily': daily,
+        'by_category': by_category,
+        'by_department': by_department,
+        'top_locations': top_locations,
+        'claim_time_buckets': buckets,
+        'median_claim_hours': median_claim_hours(buckets),
+    }
@@ -0,0 +1,79 @@
+# Lost_Found/routers.py
+"""
+Database routers. Enabled through DATABASE_ROUTERS in settings.
+"""
+from django.conf import settings
+
+from . import campus
+
+
+class ArchiveRouter:
+    """Keep ItemArchive in the active campus's archive database (settings.ARCHIVE_DATABASES).
+
+    Each campus has its own archive: item ids are only unique within a campus.
+    """
+
+    def _is_archive(self, model):
+        return model._meta.app_label == 'Lost_Found' and model._meta.model_name == 'itemarchive'
+
+    def db_for_read(self, model, **hints):
+        if self._is_archive(model):
+            return campus.archive_alias()
+        # Users referenced from an archived row live in the default database,
+        # not in the database the row was loaded from
+        instance = hints.get('instance')
+        if instance is not None and self._is_archive(type(instance)):
+            return 'default'
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Archived rows point at users in the default database (no constraint)
+        if self._is_archive(type(obj1)) or self._is_archive(type(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.ARCHIVE_DATABASES.values():
+            return app_label == 'Lost_Found' and model_name == 'itemarchive'
+        if app_label == 'Lost_Found' and model_name == 'itemarchive':
+            return False
+        return None
+
+
+class CampusRouter:
+    """Campus tables (campus.CAMPUS_MODELS) in the active campus database, everything else in 'default'.
+
+    Listed after ArchiveRouter, which takes ItemArchive when archive
+    databases are configured.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not campus.is_campus_model(model):
+            return campus.SHARED_DB
+        instance = hints.get('instance')
+        if instance is not None:
+            # Related rows of a campus row live next to it
+            if campus.is_campus_model(instance.__class__) and instance._state.db:
+                return instance._state.db
+            # A user's student record is on the user's campus
+            if model._meta.model_name == 'student' and getattr(instance, 'campus', '') in campus.campuses():
+                return campus.alias(instance.campus)
+        return campus.alias()
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        first, second = campus.is_campus_model(obj1.__class__), campus.is_campus_model(obj2.__class__)
+        if first and second:
+            return obj1._state.db == obj2._state.db
+        if first or second:
+            # Campus rows point at shared users and locations (no constraint)
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == campus.SHARED_DB or db not in campus.campuses().values():
+            return None
+        return app_label == campus.APP_LABEL and model_name in campus.CAMPUS_MODELS
@@ -0,0 +1,81 @@
+# Lost_Found/signals.py
+from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import availability, campus, gazetteer, metrics, refdata, rollups
+from .conditional import ITEM_MARKER
+from .models import ChangeMarker, Department, Item, Location, LocationAlias, Student, User
+
+
+@receiver(user_logged_in)
+def count_login_success(sender, request, user, **kwargs):
+    metrics.LOGINS.inc(result='success')
+
+
+@receiver(user_login_failed)
+def count_login_failure(sender, credentials, request=None, **kwargs):
+    metrics.LOGINS.inc(result='failure')
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def bump_item_version(sender, **kwargs):
+    ChangeMarker.bump(ITEM_MARKER)
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def bump_department_version(sender, **kwargs):
+    refdata.department_changed()
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=LocationAlias)
+@receiver(post_delete, sender=LocationAlias)
+def bump_location_version(sender, **kwargs):
+    gazetteer.location_changed()
+    # The found-item page lists the places, so its validators must change too
+    ChangeMarker.bump(ITEM_MARKER)
+
+
+@receiver(pre_save, sender=Item)
+def normalize_item_locations(sender, instance, raw=False, **kwargs):
+    if not raw:
+        gazetteer.normalize_item(instance)
+
+
+@receiver(post_save, sender=User)
+def forget_user_availability(sender, instance, created, **kwargs):
+    if created:
+        availability.forget('username', instance.username)
+        availability.forget('email', instance.email)
+
+
+@receiver(post_delete, sender=User)
+def delete_campus_user_rows(sender, instance, using, **kwargs):
+    # Only once the user is really gone; the campus databases cannot roll back with it
+    user_id = instance.pk
+    transaction.on_commit(lambda: campus.delete_user_rows(user_id), using=using)
+
+
+@receiver(post_save, sender=Student)
+def forget_student_availability(sender, instance, created, **kwargs):
+    if created:
+        availability.forget('matric_no', instance.matric_no)
+
+
+@receiver(pre_save, sender=Item)
+def remember_item_state(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    if not raw:
+        rollups.remember_state(instance, using, update_fields)
+
+
+@receiver(post_save, sender=Item)
+def update_item_rollups(sender, instance, created, raw=False, using=None, **kwargs):
+    if not raw:
+        # The rollups sit next to the item, which may be on another campus than the active one
+        with campus.using_campus(campus.code_for_alias(using)):
+            rollups.record_item_change(instance, created)
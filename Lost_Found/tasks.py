@@ -0,0 +1,242 @@
+# Lost_Found/tasks.py
+"""
+Background task queue on the application database (no external broker).
+
+    @task(priority=5)
+    def deliver_notifications(): ...
+
+    deliver_notifications.delay()            # or enqueue('deliver_notifications')
+
+`run_worker` leases due tasks with a single UPDATE ... RETURNING statement
+(status -> running, leased_until -> now + visibility timeout), so concurrent
+workers never take the same task. A task whose worker dies is taken over
+once its lease expires. Failed tasks are retried with exponential backoff
+until max_attempts, highest priority first, then oldest run_at. A task runs
+with the campus it was queued from active (campus.py).
+"""
+import json
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from . import archive, campus, detail, media, metrics, notifications, rollups
+from .conditional import ITEM_MARKER
+from .models import ChangeMarker, Item, Task
+
+logger = logging.getLogger(__name__)
+
+# name -> (function, default priority, default max_attempts)
+REGISTRY = {}
+
+
+class UnknownTask(Exception):
+    pass
+
+
+# ================= REGISTRATION / ENQUEUE ==================
+
+def task(name=None, priority=0, max_attempts=3):
+    """Register a function as a task; adds .delay(**kwargs) to enqueue it."""
+    def decorator(func):
+        task_name = name or func.__name__
+        REGISTRY[task_name] = (func, priority, max_attempts)
+        func.task_name = task_name
+        func.delay = lambda **payload: enqueue(task_name, payload)
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, priority=None, max_attempts=None, run_at=None, unique=False):
+    """Queue a task; with unique=True nothing is added if one with that name is already waiting."""
+    if name not in REGISTRY:
+        raise UnknownTask(name)
+    if unique and Task.objects.filter(name=name, campus=campus.active(), status='queued').exists():
+        return None
+    _, default_priority, default_attempts = REGISTRY[name]
+    return Task.objects.create(
+        name=name,
+        payload=payload or {},
+        campus=campus.active(),
+        priority=default_priority if priority is None else priority,
+        max_attempts=default_attempts if max_attempts is None else max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def enqueue_on_commit(name, payload=None, **kwargs):
+    """Queue a task once the current transaction commits (immediately outside one)."""
+    transaction.on_commit(lambda: enqueue(name, payload, **kwargs))
+
+
+# ================= LEASING ==================
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _lease_sql(table, skip_locked):
+    lock = ' FOR UPDATE SKIP LOCKED' if skip_locked else ''
+    return (
+        f'UPDATE {table} SET status = %s, leased_until = %s, worker = %s, attempts = attempts + 1 '
+        f'WHERE id IN ('
+        f'SELECT id FROM {table} '
+        f"WHERE (status = 'queued' AND run_at <= %s) OR (status = 'running' AND leased_until <= %s) "
+        f'ORDER BY priority DESC, run_at LIMIT %s{lock}'
+        f') RETURNING id, name, payload, campus, attempts, max_attempts'
+    )
+
+
+def lease(limit, worker=None, timeout=None, now=None):
+    """Atomically take up to `limit` due tasks; returns a list of dicts."""
+    now = now or timezone.now()
+    timeout = timeout or settings.TASK_VISIBILITY_TIMEOUT
+    worker = worker or worker_id()
+    leased_until = now + timedelta(seconds=timeout)
+    table = connection.ops.quote_name(Task._meta.db_table)
+    adapt = connection.ops.adapt_datetimefield_value
+    params = ['running', adapt(leased_until), worker, adapt(now), adapt(now), limit]
+
+    if connection.vendor in ('sqlite', 'postgresql') and connection.features.can_return_columns_from_insert:
+        # SQLite >= 3.35 and PostgreSQL support UPDATE ... RETURNING
+        sql = _lease_sql(table, skip_locked=connection.features.has_select_for_update_skip_locked)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+    else:
+        rows = _lease_fallback(limit, worker, leased_until, now)
+
+    return [
+        {
+            'id': pk,
+            'name': name,
+            'payload': json.loads(payload) if isinstance(payload, str) else payload,
+            'campus': task_campus,
+            'attempts': attempts,
+            'max_attempts': max_attempts,
+        }
+        for pk, name, payload, task_campus, attempts, max_attempts in rows
+    ]
+
+
+def _lease_fallback(limit, worker, leased_until, now):
+    """Select-then-update for databases without RETURNING; the lease marks our rows."""
+    due = Q(status='queued', run_at__lte=now) | Q(status='running', leased_until__lte=now)
+    with transaction.atomic():
+        ids = list(Task.objects.filter(due).order_by('-priority', 'run_at').values_list('pk', flat=True)[:limit])
+        Task.objects.filter(due, pk__in=ids).update(
+            status='running', leased_until=leased_until, worker=worker, attempts=F('attempts') + 1,
+        )
+    return Task.objects.filter(pk__in=ids, worker=worker, leased_until=leased_until).values_list(
+        'id', 'name', 'payload', 'campus', 'attempts', 'max_attempts')
+
+
+# ================= EXECUTION ==================
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(settings.TASK_RETRY_BASE_SECONDS * 2 ** (attempts - 1), 3600))
+
+
+def execute(leased):
+    """Run one leased task and record the outcome; returns True on success."""
+    name = leased['name']
+    started = time.perf_counter()
+    try:
+        if name not in REGISTRY:
+            raise UnknownTask(name)
+        # Run against the campus the task was queued from
+        with campus.using_campus(leased['campus'] or None):
+            REGISTRY[name][0](**leased['payload'])
+    except Exception:
+        error = traceback.format_exc(limit=5)
+        final = leased['attempts'] >= leased['max_attempts']
+        Task.objects.filter(pk=leased['id']).update(
+            status='failed' if final else 'queued',
+            run_at=timezone.now() + retry_delay(leased['attempts']),
+            leased_until=None,
+            finished_at=timezone.now() if final else None,
+            last_error=error[-4000:],
+        )
+        logger.warning("Task failed", extra={'task': name, 'task_id': leased['id'], 'final': final})
+        metrics.TASKS.inc(name=name, result='failed' if final else 'retry')
+        metrics.TASK_SECONDS.observe(time.perf_counter() - started, name=name)
+        return False
+
+    Task.objects.filter(pk=leased['id']).update(
+        status='done', leased_until=None, finished_at=timezone.now(), last_error='',
+    )
+    metrics.TASKS.inc(name=name, result='done')
+    metrics.TASK_SECONDS.observe(time.perf_counter() - started, name=name)
+    return True
+
+
+# ================= TASKS ==================
+
+@task(priority=5, max_attempts=5)
+def deliver_notifications():
+    """Drain due notifications (queued after claims / finds)."""
+    mail = notifications.open_connection()
+    try:
+        while notifications.deliver_batch(mail) != (0, 0, 0):
+            pass
+    finally:
+        mail.close()
+
+
+@task(priority=2)
+def process_item_image(item_id):
+    """Replace a new item's photo with an upright copy of at most ITEM_IMAGE_MAX_SIDE pixels."""
+    item = Item.objects.filter(pk=item_id).only('id', 'image').first()
+    if item is None or not item.image:
+        return
+    old_name = item.image.name
+    new_name = media.process_image(item.image, settings.ITEM_IMAGE_MAX_SIDE)
+    if new_name is None or new_name == old_name:
+        return
+    # Unless the photo was replaced meanwhile
+    if Item.objects.filter(pk=item_id, image=old_name).update(image=new_name):
+        ChangeMarker.bump(ITEM_MARKER)
+    # Content-addressed names can be shared by several items
+    if not Item.objects.filter(image=old_name).exists():
+        item.image.storage.delete(old_name)
+
+
+@task(priority=1)
+def match_item(item_id):
+    """Tell owners of lost items about a newly reported item that may be theirs."""
+    item = Item.objects.filter(pk=item_id).first()
+    if item is None:
+        return
+    matches = detail.related_items(item)
+    if item.status == 'lost':
+        pairs = [(item, found) for found in matches]
+    else:
+        owners = campus.select_people(Item.objects.filter(pk__in=[lost.pk for lost in matches]), 'reported_by')
+        pairs = [(lost, item) for lost in owners]
+    for lost, found in pairs:
+        notifications.notify_possible_match(lost, found)
+    if pairs:
+        enqueue('deliver_notifications', unique=True)
+
+
+@task(priority=-5)
+def rebuild_rollups(since=None, until=None):
+    rollups.rebuild(parse_date(since) if since else None, parse_date(until) if until else None)
+
+
+@task(priority=-10)
+def archive_items():
+    archive.archive_items()
+
+
+@task(priority=-20, max_attempts=1)
+def noop(**payload):
+    """Does nothing; used by `bench_tasks`."""
@@ -1,3 +1,1986 @@
-from django.test import TestCase
+import csv
+import gzip
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import subprocess
+import shutil
+import tempfile
+import time
+from collections import Counter
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from . import (
+    archive, autocomplete, availability, bulk, campus, detail, events, exports, facets, gazetteer, imports, media, metrics,
+    middleware, notifications, refdata, rollups, tasks, warmup,
+)
+from .admin import EstimatedCountPaginator, estimated_row_count
+from .conditional import item_page_conditional
+from .filters import (
+    DATE_BUCKETS, PAGE_SIZE, REPORT_STATUSES, after_cursor, cursor_page, decode_cursor, encode_cursor, filter_items,
+    list_filters, make_cursor, report_counts, reported_items,
+)
+from .forms import DepartmentChoiceField
+from .logs import mask
+from .middleware import CompressionMiddleware, ItemEventMiddleware, choose_encoding
+from .models import (
+    ChangeMarker, DailyClaimTime, DailyItemStat, Department, Item, ItemArchive, ItemAudit, ItemEvent, Location,
+    LocationAlias, Notification, Student, Task, User,
+)
+from .routers import ArchiveRouter, CampusRouter
+
+
+def make_user(username='alice', **fields):
+    return User.objects.create_user(username=username, email=f'{username}@afit.edu.ng', password='pw12345!x', **fields)
+
+
+def make_items(user, count, status='lost', **fields):
+    """`count` items reported by `user`; returns them in list order (newest first)."""
+    defaults = {'description': 'black phone', 'category': 'electronics', 'location_lost': 'Lab 2'}
+    items = [
+        Item.objects.create(
+            status=status, date_occurred=timezone.now(), reported_by=user,
+            **{'title': f'Phone {n}', **defaults, **fields},
+        )
+        for n in range(count)
+    ]
+    return sorted(items, key=lambda item: (item.date_reported, item.pk), reverse=True)
+
+
+# ================= LOGGING ==================
+
+class MaskTests(TestCase):
+    def test_reference_is_stable_and_ignores_case(self):
+        self.assertEqual(mask(' Alice '), mask('alice'))
+        self.assertNotEqual(mask('alice'), mask('bob'))
+        self.assertEqual(len(mask('alice')), 12)
+        self.assertEqual(mask(''), '-')
+        self.assertEqual(mask(None), '-')
+
+    def test_reference_depends_on_the_key(self):
+        plain = hashlib.sha256(b'alice').hexdigest()[:12]
+        first = mask('alice')
+        with self.settings(LOG_MASK_KEY='another key'):
+            second = mask('alice')
+
+        self.assertNotIn(plain, (first, second))
+        self.assertNotEqual(first, second)
+
+
+# ================= METRICS ==================
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        self.registry = metrics.Registry()
+        self.requests = self.registry.counter('app_requests_total', 'Requests.', ('route', 'status'))
+        self.workers = self.registry.gauge('app_workers', 'Workers.')
+        self.latency = self.registry.histogram('app_seconds', 'Latency.', ('route',), buckets=(0.1, 1.0))
+
+    def test_text_exposition_format(self):
+        self.requests.inc(route='home', status=200)
+        self.requests.inc(2, route='say "hi"\n', status=500)
+        self.workers.set(3)
+        for value in (0.05, 0.1, 0.5, 7.0):
+            self.latency.observe(value, route='home')
+
+        self.assertEqual(self.registry.render().splitlines(), [
+            '# HELP app_requests_total Requests.',
+            '# TYPE app_requests_total counter',
+            'app_requests_total{route="home",status="200"} 1',
+            'app_requests_total{route="say \\"hi\\"\\n",status="500"} 2',
+            '# HELP app_workers Workers.',
+            '# TYPE app_workers gauge',
+            'app_workers 3',
+            '# HELP app_seconds Latency.',
+            '# TYPE app_seconds histogram',
+            'app_seconds_bucket{route="home",le="0.1"} 2',
+            'app_seconds_bucket{route="home",le="1.0"} 3',
+            'app_seconds_bucket{route="home",le="+Inf"} 4',
+            'app_seconds_sum{route="home"} 7.65',
+            'app_seconds_count{route="home"} 4',
+        ])
+
+    def test_snapshots_of_other_processes_are_merged(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        other = {
+            'app_requests_total': [[['home', '200'], 4]],
+            'app_seconds': [[['home'], [1, 0, 1, 2.5]]],
+            'gone_metric': [[[], 9]],
+        }
+        with open(os.path.join(directory, '1.json'), 'w') as fh:
+            json.dump(other, fh)
+        with open(os.path.join(directory, '2.json'), 'w') as fh:
+            fh.write('{truncated')
+        self.requests.inc(route='home', status=200)
+        self.latency.observe(0.5, route='home')
+
+        with self.settings(METRICS_DIR=directory, METRICS_FLUSH_INTERVAL=60):
+            collected = self.registry.collect()
+            self.registry.flush()
+            self.requests.inc(route='home', status=200)
+            # Throttled: the file still has the first value
+            self.registry.flush()
+            with open(os.path.join(directory, f'{os.getpid()}.json')) as fh:
+                self.assertEqual(json.load(fh)['app_requests_total'], [[['home', '200'], 1]])
+            self.registry.flush(force=True)
+            with open(os.path.join(directory, f'{os.getpid()}.json')) as fh:
+                self.assertEqual(json.load(fh)['app_requests_total'], [[['home', '200'], 2]])
+
+        self.assertEqual(collected['app_requests_total'], {('home', '200'): 5})
+        self.assertEqual(collected['app_seconds'], {('home',): [1, 1, 1, 3.0]})
+        self.assertNotIn('gone_metric', collected)
+
+    def get_status(self, **headers):
+        return self.client.get(reverse('metrics'), **headers).status_code
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_endpoint_needs_token_or_staff(self):
+        with self.assertLogs('django.request', 'WARNING') as logs:
+            self.assertEqual(self.get_status(), 403)
+            self.assertEqual(self.get_status(HTTP_AUTHORIZATION='Bearer wrong'), 403)
+            self.client.force_login(make_user('alice'))
+            self.assertEqual(self.get_status(), 403)
+        self.assertEqual(len(logs.records), 3)
+
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer s3cret')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertIn('# TYPE lostfound_logins_total counter', response.content.decode())
+
+        self.client.force_login(make_user('root', is_staff=True))
+        self.assertEqual(self.get_status(), 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_empty_token_is_never_accepted(self):
+        with self.assertLogs('django.request', 'WARNING'):
+            self.assertEqual(self.get_status(HTTP_AUTHORIZATION='Bearer '), 403)
+
+# ================= CONDITIONAL GET ==================
+
+class ItemPageConditionalTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.renders = 0
+        ChangeMarker.bump('item')
+
+        @item_page_conditional
+        def page(request):
+            self.renders += 1
+            return HttpResponse('items')
+
+        self.page = page
+
+    def get(self, user=None, csrf='token-a', **headers):
+        request = self.factory.get('/', **headers)
+        request.user = user or AnonymousUser()
+        request.COOKIES['csrftoken'] = csrf
+        request._messages = CookieStorage(request)
+        return request
+
+    def test_matching_etag_answers_304_without_rendering(self):
+        response = self.page(self.get())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.renders, 1)
+
+        response = self.page(self.get(HTTP_IF_NONE_MATCH=response['ETag']))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.renders, 1)
+
+    def test_etag_depends_on_marker_user_and_csrf(self):
+        alice, bob = make_user('alice'), make_user('bob')
+        etag = self.page(self.get(alice))['ETag']
+
+        self.assertEqual(self.page(self.get(alice))['ETag'], etag)
+        self.assertNotEqual(self.page(self.get(bob))['ETag'], etag)
+        self.assertNotEqual(self.page(self.get(alice, csrf='token-b'))['ETag'], etag)
+        ChangeMarker.bump('item')
+        response = self.page(self.get(alice, HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_pending_messages_skip_validators(self):
+        etag = self.page(self.get())['ETag']
+        request = self.get(HTTP_IF_NONE_MATCH=etag)
+        messages.success(request, 'Saved.')
+
+        response = self.page(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Vary'))
+        # Only counted, so the page still shows them
+        self.assertEqual(len(request._messages), 1)
+
+    def test_response_is_private_and_varies_on_cookie(self):
+        response = self.page(self.get())
+
+        self.assertIn('Cookie', response['Vary'])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertTrue(response.has_header('Last-Modified'))
+
+
+# ================= RESPONSE COMPRESSION ==================
+
+@override_settings(COMPRESSION_MIN_SIZE=200)
+class CompressionTests(TestCase):
+    BODY = b'<li>Blue umbrella, library</li>' * 40
+
+    def compress(self, response, accept='gzip'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_choose_encoding_honours_q_values(self):
+        with mock.patch.object(middleware, 'brotli', object()):
+            self.assertEqual(choose_encoding('gzip, deflate, br'), 'br')
+            self.assertEqual(choose_encoding('br;q=0.5, gzip'), 'gzip')
+            self.assertEqual(choose_encoding('br;q=0, gzip;q=0'), None)
+            self.assertEqual(choose_encoding('*;q=0.2, br;q=0.1'), 'gzip')
+            self.assertEqual(choose_encoding('identity'), None)
+            self.assertEqual(choose_encoding('gzip;q=high'), None)
+        with mock.patch.object(middleware, 'brotli', None):
+            self.assertEqual(choose_encoding('br'), None)
+            self.assertEqual(choose_encoding('br, *'), 'gzip')
+
+    def test_gzip_round_trip_and_weak_etag(self):
+        response = HttpResponse(self.BODY)
+        response['ETag'] = '"abc"'
+
+        response = self.compress(response)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.BODY)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_weak_etag_is_kept(self):
+        response = HttpResponse(self.BODY)
+        response['ETag'] = 'W/"abc"'
+
+        self.assertEqual(self.compress(response)['ETag'], 'W/"abc"')
+
+    def test_pass_through(self):
+        small = HttpResponse(b'short')
+        no_transform = HttpResponse(self.BODY)
+        no_transform['Cache-Control'] = 'no-transform'
+        image = HttpResponse(self.BODY, content_type='image/png')
+        encoded = HttpResponse(self.BODY)
+        encoded['Content-Encoding'] = 'identity'
+
+        for response in (small, no_transform, image, encoded):
+            body = response.content
+            response = self.compress(response)
+            self.assertEqual(response.content, body)
+            self.assertNotEqual(response.get('Content-Encoding'), 'gzip')
+            self.assertFalse(response.has_header('Vary'))
+
+    def test_unaccepted_encoding_still_varies(self):
+        response = self.compress(HttpResponse(self.BODY), accept='identity')
+
+        self.assertEqual(response.content, self.BODY)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_streaming_response_is_compressed(self):
+        chunks = [b'id,title\n'] + [b'%d,Blue umbrella\n' % i for i in range(50)]
+        response = StreamingHttpResponse(iter(chunks), content_type='text/csv')
+        response['Content-Length'] = '1'
+
+        response = self.compress(response)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), b''.join(chunks))
+
+    @skipUnless(middleware.brotli, 'brotli is not installed')
+    def test_brotli_round_trip(self):
+        response = self.compress(HttpResponse(self.BODY), accept='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(middleware.brotli.decompress(response.content), self.BODY)
+
+        chunks = [self.BODY[:100], self.BODY[100:]]
+        response = self.compress(StreamingHttpResponse(iter(chunks)), accept='br')
+        self.assertEqual(middleware.brotli.decompress(b''.join(response.streaming_content)), self.BODY)
+
+
+# ================= TASK QUEUE ==================
+
+class LeaseTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+
+    def queue(self, name='noop', **fields):
+        fields.setdefault('run_at', self.now - timedelta(seconds=1))
+        return Task.objects.create(name=name, **fields)
+
+    def test_leases_due_tasks_by_priority_then_age(self):
+        low = self.queue(priority=0, run_at=self.now - timedelta(minutes=2))
+        high = self.queue(priority=5, run_at=self.now - timedelta(minutes=1))
+        older = self.queue(priority=0, run_at=self.now - timedelta(minutes=3))
+
+        leased = tasks.lease(2, worker='w1', timeout=60, now=self.now)
+
+        self.assertEqual({task['id'] for task in leased}, {high.pk, older.pk})
+        for task in Task.objects.filter(pk__in=[high.pk, older.pk]):
+            self.assertEqual(task.status, 'running')
+            self.assertEqual(task.worker, 'w1')
+            self.assertEqual(task.attempts, 1)
+            self.assertEqual(task.leased_until, self.now + timedelta(seconds=60))
+        self.assertEqual(Task.objects.get(pk=low.pk).status, 'queued')
+
+    def test_returns_payload_and_campus(self):
+        self.queue(payload={'bench': 'x'}, campus='kaduna', max_attempts=4)
+
+        [leased] = tasks.lease(1, worker='w1', now=self.now)
+
+        self.assertEqual(leased['payload'], {'bench': 'x'})
+        self.assertEqual(leased['campus'], 'kaduna')
+        self.assertEqual((leased['attempts'], leased['max_attempts']), (1, 4))
+
+    def test_leased_and_future_tasks_are_not_taken_again(self):
+        self.queue()
+        self.queue(run_at=self.now + timedelta(minutes=5))
+
+        self.assertEqual(len(tasks.lease(10, worker='w1', timeout=60, now=self.now)), 1)
+        self.assertEqual(tasks.lease(10, worker='w2', timeout=60, now=self.now), [])
+
+    def test_expired_lease_is_taken_over(self):
+        task = self.queue()
+        tasks.lease(1, worker='w1', timeout=60, now=self.now)
+
+        [leased] = tasks.lease(1, worker='w2', timeout=60, now=self.now + timedelta(seconds=61))
+
+        self.assertEqual(leased['id'], task.pk)
+        self.assertEqual(leased['attempts'], 2)
+        self.assertEqual(Task.objects.get(pk=task.pk).worker, 'w2')
+
+    def test_fallback_matches_returning_statement(self):
+        task = self.queue()
+
+        rows = list(tasks._lease_fallback(5, 'w1', self.now + timedelta(seconds=60), self.now))
+
+        self.assertEqual([row[0] for row in rows], [task.pk])
+        self.assertEqual(Task.objects.get(pk=task.pk).status, 'running')
+
+    def test_failed_task_is_requeued_until_max_attempts(self):
+        self.queue(name='missing-task', max_attempts=2)
+        leased = tasks.lease(1, worker='w1', now=self.now)[0]
+
+        with self.assertLogs('Lost_Found.tasks', 'WARNING'):
+            self.assertFalse(tasks.execute(leased))
+        task = Task.objects.get(pk=leased['id'])
+        self.assertEqual(task.status, 'queued')
+        self.assertIsNone(task.leased_until)
+
+        leased = tasks.lease(1, worker='w1', now=task.run_at)[0]
+        with self.assertLogs('Lost_Found.tasks', 'WARNING'):
+            self.assertFalse(tasks.execute(leased))
+        self.assertEqual(Task.objects.get(pk=leased['id']).status, 'failed')
+
+
+@override_settings(ITEM_IMAGE_MAX_SIDE=100)
+class ItemJobTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        settings_override = override_settings(MEDIA_ROOT=root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+
+    def photo_item(self, size, orientation=None):
+        buffer = io.BytesIO()
+        exif = Image.Exif()
+        if orientation:
+            exif[media.EXIF_ORIENTATION] = orientation
+        Image.new('RGB', size, 'red').save(buffer, format='JPEG', exif=exif)
+        [item] = make_items(self.alice, 1)
+        item.image.save('photo.jpg', ContentFile(buffer.getvalue()))
+        return Item.objects.get(pk=item.pk)
+
+    def test_large_photo_is_downscaled(self):
+        item = self.photo_item((400, 200))
+        old_name = item.image.name
+        version = ChangeMarker.objects.get(name='item').version
+
+        tasks.process_item_image(item_id=item.pk)
+
+        item.refresh_from_db()
+        self.assertNotEqual(item.image.name, old_name)
+        self.assertRegex(item.image.name, r'^items/photo\.[0-9a-f]{12}\.jpg$')
+        with item.image.open('rb') as fh:
+            self.assertEqual(Image.open(fh).size, (100, 50))
+        self.assertFalse(item.image.storage.exists(old_name))
+        self.assertEqual(ChangeMarker.objects.get(name='item').version, version + 1)
+
+    def test_rotated_photo_is_stored_upright(self):
+        item = self.photo_item((80, 40), orientation=6)
+
+        tasks.process_item_image(item_id=item.pk)
+
+        item.refresh_from_db()
+        with item.image.open('rb') as fh:
+            image = Image.open(fh)
+            self.assertEqual((image.size, image.getexif().get(media.EXIF_ORIENTATION, 1)), ((40, 80), 1))
+
+    def test_small_upright_photo_is_left_alone(self):
+        item = self.photo_item((80, 40))
+        name = item.image.name
+
+        tasks.process_item_image(item_id=item.pk)
+
+        item.refresh_from_db()
+        self.assertEqual(item.image.name, name)
+        tasks.process_item_image(item_id=item.pk + 100)
+
+    def test_found_report_notifies_owners_of_matching_lost_items(self):
+        [lost] = make_items(self.alice, 1)
+        [found] = make_items(self.bob, 1, status='found', location_found='Library')
+        make_items(self.bob, 1, category='books')
+
+        tasks.match_item(item_id=found.pk)
+
+        notification = Notification.objects.get()
+        self.assertEqual((notification.recipient, notification.kind, notification.item_id), (self.alice, 'item_match', lost.pk))
+        self.assertIn('at Library', notification.body)
+        self.assertEqual(list(Task.objects.values_list('name', flat=True)), ['deliver_notifications'])
+
+    def test_lost_report_notifies_its_owner_of_found_matches(self):
+        found = make_items(self.bob, 2, status='found')
+        [lost] = make_items(self.alice, 1)
+
+        tasks.match_item(item_id=lost.pk)
+
+        self.assertEqual(
+            sorted(Notification.objects.values_list('recipient', 'item')),
+            [(self.alice.pk, lost.pk)] * len(found),
+        )
+
+    def test_no_match_sends_nothing(self):
+        [lost] = make_items(self.alice, 1)
+
+        tasks.match_item(item_id=lost.pk)
+
+        self.assertFalse(Notification.objects.exists())
+        self.assertFalse(Task.objects.exists())
+
+
+# ================= ADMIN ==================
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        self.items = make_items(make_user(), 30)
+        self.ids = sorted(item.pk for item in self.items)
+        patcher = mock.patch.object(EstimatedCountPaginator, 'exact_below', 5)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def paginator(self):
+        return EstimatedCountPaginator(Item.objects.order_by('pk'), 10)
+
+    def test_counts_exactly_without_statistics(self):
+        self.assertIsNone(estimated_row_count(Item))
+        Item.objects.filter(pk__in=self.ids[:5]).delete()
+
+        self.assertEqual(self.paginator().count, 25)
+
+    def test_reads_row_count_from_statistics(self):
+        archive.analyze(Item)
+
+        self.assertEqual(estimated_row_count(Item), 30)
+        self.assertEqual(self.paginator().count, 30)
+
+    def test_stale_estimate_never_shows_an_empty_last_page(self):
+        archive.analyze(Item)
+        Item.objects.filter(pk__in=self.ids[15:]).delete()
+
+        paginator = self.paginator()
+        self.assertEqual(paginator.num_pages, 3)
+        page = paginator.page(3)
+
+        self.assertEqual((page.number, len(page.object_list)), (2, 5))
+        self.assertEqual((paginator.count, paginator.num_pages), (15, 2))
+
+    def test_short_page_ends_the_page_range(self):
+        archive.analyze(Item)
+        Item.objects.filter(pk__in=self.ids[25:]).delete()
+
+        paginator = self.paginator()
+        page = paginator.page(3)
+
+        self.assertEqual(len(page.object_list), 5)
+        self.assertFalse(page.has_next())
+        self.assertEqual(paginator.count, 25)
+
+
+class AdminSearchTests(TestCase):
+    def setUp(self):
+        self.client.force_login(make_user('root', is_staff=True, is_superuser=True))
+        self.alice = make_user('alice')
+        self.item = Item.objects.create(
+            title='Blue backpack', description='has a laptop inside', category='accessories', status='lost',
+            location_lost='Lab 2', date_occurred=timezone.now(), reported_by=self.alice,
+        )
+        make_items(make_user('bob'), 2)
+
+    def search(self, term, model='item'):
+        response = self.client.get(reverse(f'admin:Lost_Found_{model}_changelist'), {'q': term})
+        return {obj.pk for obj in response.context['cl'].result_list}
+
+    def test_default_search_uses_indexed_lookups(self):
+        self.assertEqual(self.search('blue'), {self.item.pk})
+        self.assertEqual(self.search('ALICE'), {self.item.pk})
+        self.assertEqual(self.search('backpack'), set())
+        self.assertEqual(self.search('ali'), set())
+
+    def test_prefixed_search_matches_substrings(self):
+        self.assertEqual(self.search('~backpack'), {self.item.pk})
+        self.assertEqual(self.search('~ laptop'), {self.item.pk})
+        self.assertEqual(self.search('~lic'), {self.item.pk})
+        self.assertEqual(self.search('~lice', model='user'), {self.alice.pk})
+
+    def test_changelist_has_date_hierarchy_and_help(self):
+        response = self.client.get(reverse('admin:Lost_Found_item_changelist'))
+
+        self.assertEqual(response.context['cl'].date_hierarchy, 'date_reported')
+        self.assertContains(response, 'Start with ~ to match anywhere')
+
+
+# ================= FILTERS ==================
+
+class NearFilterTests(TestCase):
+    def setUp(self):
+        self.items = make_items(make_user(), 2)
+
+    def near(self, value, **filters):
+        return {item.pk for item in filter_items('lost', {'near': value, **filters})}
+
+    def test_unknown_place_matches_location_text(self):
+        self.assertEqual(self.near('lab'), {item.pk for item in self.items})
+        self.assertEqual(self.near('Library'), set())
+
+    def test_non_ascii_digits_are_not_place_ids(self):
+        for value in ('²', '٣', '1²'):
+            self.assertEqual(self.near(value, radius='²'), set(), value)
+
+    def test_place_id_matches_items_at_that_place(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            place = Location.objects.create(name='Library', latitude=10.6, longitude=7.4)
+        Item.objects.filter(pk=self.items[0].pk).update(lost_place=place)
+
+        self.assertEqual(self.near(str(place.pk)), {self.items[0].pk})
+
+
+# ================= CURSORS ==================
+
+class CursorTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+
+    def test_round_trip(self):
+        stamp = timezone.now().replace(microsecond=123456)
+
+        self.assertEqual(decode_cursor(make_cursor(stamp, 42)), (stamp, 42))
+
+    def test_invalid_tokens_decode_to_none(self):
+        for token in ('', 'not-base64!', make_cursor(timezone.now(), 1)[:-4], 'bm9waXBl'):
+            self.assertIsNone(decode_cursor(token), token)
+
+    def test_pages_cover_every_item_once_with_equal_timestamps(self):
+        expected = make_items(self.user, 7)
+        # Ties on date_reported are broken by id
+        Item.objects.filter(pk__in=[item.pk for item in expected[2:5]]).update(date_reported=expected[2].date_reported)
+        expected = sorted(Item.objects.all(), key=lambda item: (item.date_reported, item.pk), reverse=True)
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = cursor_page(filter_items('lost', {}), cursor, size=3)
+            seen += page
+            if cursor is None:
+                break
+            self.assertEqual(cursor, encode_cursor(page[-1]))
+        self.assertEqual([item.pk for item in seen], [item.pk for item in expected])
+
+    def test_results_fragment_follows_next_cursor(self):
+        make_items(self.user, PAGE_SIZE + 5)
+        self.client.force_login(self.user)
+        url = reverse('lost-item-results')
+
+        first = self.client.get(url)
+        second = self.client.get(url, {'cursor': first['X-Next-Cursor']})
+
+        self.assertEqual(first['X-Total-Count'], str(PAGE_SIZE + 5))
+        self.assertTrue(first['X-Next-Cursor'])
+        self.assertNotIn('X-Total-Count', second)
+        self.assertEqual(second['X-Next-Cursor'], '')
+
+
+# ================= MEDIA ==================
+
+class ByteRangeTests(TestCase):
+    def test_ranges(self):
+        cases = {
+            'bytes=0-99': (0, 99),
+            'bytes=100-': (100, 999),
+            'bytes=-100': (900, 999),
+            'bytes=-5000': (0, 999),
+            'bytes=990-5000': (990, 999),
+            'bytes = 10 - 20': (10, 20),
+        }
+        for header, expected in cases.items():
+            self.assertEqual(media._byte_range(header, 1000), expected, header)
+
+    def test_unsatisfiable(self):
+        for header in ('bytes=1000-', 'bytes=50-10', 'bytes=-0', 'bytes=-'):
+            self.assertIs(media._byte_range(header, 1000), False, header)
+
+    def test_whole_file_for_other_forms(self):
+        for header in ('bytes=0-1,5-9', 'items=0-9', 'garbage'):
+            self.assertIsNone(media._byte_range(header, 1000), header)
+
+
+class MediaServeTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        os.mkdir(os.path.join(self.root, 'items'))
+        self.body = bytes(range(256)) * 4
+        with open(os.path.join(self.root, 'items', 'photo.jpg'), 'wb') as fh:
+            fh.write(self.body)
+        settings_override = override_settings(MEDIA_ROOT=self.root, MEDIA_SERVE_DIRS=('items',))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.factory = RequestFactory()
+
+    def get(self, **headers):
+        response = media.serve(self.factory.get('/media/items/photo.jpg', **headers), 'items/photo.jpg')
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        if response.streaming:
+            response.close()
+        return response, body
+
+    def test_full_response(self):
+        response, body = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.body)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Length'], str(len(self.body)))
+
+    def test_range(self):
+        response, body = self.get(HTTP_RANGE='bytes=10-19')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.body[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.body)}')
+        self.assertEqual(response['Content-Length'], '10')
+
+    def test_unsatisfiable_range(self):
+        response, _ = self.get(HTTP_RANGE=f'bytes={len(self.body)}-')
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.body)}')
+
+    def test_if_range_with_current_etag_sends_the_range(self):
+        etag = self.get()[0]['ETag']
+
+        response, body = self.get(HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE=etag)
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.body[:4])
+
+    def test_if_range_with_stale_etag_sends_the_whole_file(self):
+        response, body = self.get(HTTP_RANGE='bytes=0-3', HTTP_IF_RANGE='"stale"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.body)
+
+    def test_if_none_match(self):
+        etag = self.get()[0]['ETag']
+
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag)[0].status_code, 304)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=f'W/{etag}, "other"')[0].status_code, 304)
+
+    def test_paths_outside_the_upload_dirs(self):
+        for path in ('items/../db.sqlite3', 'other/photo.jpg', 'items/'):
+            with self.assertRaises(Http404):
+                media.serve(self.factory.get('/media/' + path), path)
+
+
+# ================= EXPORTS ==================
+
+class CsvExportTests(TestCase):
+    def test_every_text_cell_is_sanitized(self):
+        user = make_user()
+        User.objects.filter(pk=user.pk).update(username='=HYPERLINK("http://x")', email='-x@afit.edu.ng')
+        make_items(user, 1, location_found='+cmd')
+
+        rows = list(csv.reader(''.join(exports.export_chunks(Item.objects.all(), exports.ITEM_COLUMNS, 'csv')).splitlines()))
+        row = dict(zip(rows[0], rows[1]))
+
+        self.assertEqual(row['reported_by'], "'=HYPERLINK(\"http://x\")")
+        self.assertEqual(row['reporter_email'], "'-x@afit.edu.ng")
+        self.assertEqual(row['location_found'], "'+cmd")
+        self.assertEqual(row['title'], 'Phone 0')
+        self.assertEqual(row['is_verified'], 'False')
+
+
+# ================= IMPORTS ==================
+
+class ImportTests(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.department = Department.objects.create(name='Cyber Security', code='CYS')
+        existing = make_user('alice')
+        User.objects.filter(pk=existing.pk).update(email='Alice@afit.edu.ng')
+        Student.objects.create(user=existing, matric_no='U25CYS2001', department=self.department, level='100')
+
+    def run_import(self, kind, rows):
+        path = os.path.join(self.dir, f'{kind}.csv')
+        with open(path, 'w', newline='') as fh:
+            writer = csv.DictWriter(fh, fieldnames=sorted({key for row in rows for key in row}))
+            writer.writeheader()
+            writer.writerows(rows)
+        report = imports.run_import(kind, path, workers=1)
+        with open(f'{path}.errors.csv', newline='') as fh:
+            errors = {(int(row['row']), row['field']) for row in csv.DictReader(fh)}
+        return report, errors
+
+    def student(self, n, **fields):
+        row = {
+            'username': f'student{n}', 'email': f'student{n}@afit.edu.ng', 'matric_no': f'U25CYS30{n:02d}',
+            'department': 'CYS', 'level': '100', 'password': 'pw12345!x',
+        }
+        row.update(fields)
+        return row
+
+    def test_invalid_student_rows_are_reported(self):
+        report, errors = self.run_import('students', [
+            self.student(1),
+            self.student(2, email='not-an-email'),
+            self.student(3, department='XYZ'),
+            self.student(4, level='900'),
+            self.student(5, matric_no='U25ABC3005'),
+            self.student(6, username=''),
+        ])
+
+        self.assertEqual((report.imported, report.failed), (1, 5))
+        self.assertEqual(errors, {(2, 'email'), (3, 'department'), (4, 'level'), (5, 'matric_no'), (6, 'username')})
+        self.assertTrue(Student.objects.filter(matric_no='U25CYS3001', user__username='student1').exists())
+
+    def test_existing_and_repeated_values_are_rejected_in_any_case(self):
+        report, errors = self.run_import('students', [
+            self.student(1, email='ALICE@afit.edu.ng'),
+            self.student(2, username='ALICE'),
+            self.student(3, matric_no='u25cys2001'),
+            self.student(4),
+            self.student(5, email='Student4@afit.edu.ng'),
+        ])
+
+        self.assertEqual((report.imported, report.failed), (1, 4))
+        self.assertEqual(errors, {(1, 'email'), (2, 'username'), (3, 'matric_no'), (5, 'email')})
+
+    def test_repeats_within_a_file_are_rejected_in_any_case(self):
+        report, errors = self.run_import('students', [
+            self.student(1, username='Student1'),
+            self.student(2, username='STUDENT1'),
+            self.student(3, email='student1@AFIT.edu.ng'),
+            self.student(4, matric_no='u25cys3001'),
+            # NOCASE only folds ASCII, so these are different usernames
+            self.student(5, username='Émile'),
+            self.student(6, username='émile'),
+        ])
+
+        self.assertEqual((report.imported, report.failed), (3, 3))
+        self.assertEqual(errors, {(2, 'username'), (3, 'email'), (4, 'matric_no')})
+        self.assertEqual(imports.nocase_key('ÉMILE Ab'), 'Émile ab')
+
+    def test_rejected_rows_are_not_hashed(self):
+        with mock.patch.object(imports, '_hash_password', wraps=imports._hash_password) as hash_password:
+            report, _ = self.run_import('students', [
+                self.student(1, email='alice@afit.edu.ng'),
+                self.student(2),
+                self.student(3, username='student2'),
+            ])
+
+        self.assertEqual(report.imported, 1)
+        self.assertEqual(hash_password.call_count, 1)
+        self.assertTrue(User.objects.get(username='student2').check_password('pw12345!x'))
+
+    def test_items_need_known_users(self):
+        row = {'title': 'Wallet', 'category': 'accessories', 'status': 'lost', 'date_occurred': '2026-01-05'}
+        report, errors = self.run_import('items', [
+            dict(row, reported_by='alice'),
+            dict(row, reported_by='U25CYS2001', claimed_by='nobody'),
+            dict(row, reported_by='ghost'),
+            dict(row, reported_by='alice', category='weapons'),
+        ])
+
+        self.assertEqual((report.imported, report.failed), (1, 3))
+        self.assertEqual(errors, {(2, 'claimed_by'), (3, 'reported_by'), (4, 'category')})
+
+    def test_item_users_are_matched_in_any_case(self):
+        bob = make_user('Bob')
+        row = {'title': 'Wallet', 'category': 'accessories', 'status': 'found', 'date_occurred': '2026-01-05'}
+        report, errors = self.run_import('items', [
+            dict(row, reported_by='ALICE', claimed_by='bob'),
+            dict(row, reported_by='alice@AFIT.edu.ng', claimed_by='BOB@afit.edu.ng'),
+            dict(row, reported_by='u25cys2001'),
+        ])
+
+        self.assertEqual((report.imported, errors), (3, set()))
+        alice = User.objects.get(username='alice')
+        self.assertEqual(list(Item.objects.order_by('pk').values_list('reported_by', 'claimed_by')),
+                         [(alice.pk, bob.pk), (alice.pk, bob.pk), (alice.pk, None)])
+
+
+# ================= ARCHIVE ==================
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.items = make_items(self.user, 4)
+        self.ids = sorted(item.pk for item in self.items)
+
+    def archived_copy(self, item, **fields):
+        values = {name: getattr(item, name) for name in archive.ARCHIVED_FIELDS}
+        values.update(fields)
+        return ItemArchive.objects.create(**values)
+
+    def test_moves_rows_with_their_columns(self):
+        moved = archive.archive_chunk(self.ids[:2])
+
+        self.assertEqual(moved, 2)
+        self.assertEqual(set(Item.objects.values_list('pk', flat=True)), set(self.ids[2:]))
+        copy = ItemArchive.objects.get(pk=self.ids[0])
+        original = next(item for item in self.items if item.pk == self.ids[0])
+        self.assertEqual((copy.title, copy.date_reported, copy.reported_by_id),
+                         (original.title, original.date_reported, original.reported_by_id))
+
+    def test_row_copied_by_an_interrupted_run_is_deleted(self):
+        item = next(item for item in self.items if item.pk == self.ids[0])
+        self.archived_copy(item)
+
+        self.assertEqual(archive.archive_chunk([item.pk]), 1)
+        self.assertFalse(Item.objects.filter(pk=item.pk).exists())
+        self.assertEqual(ItemArchive.objects.filter(pk=item.pk).count(), 1)
+
+    def test_item_whose_id_is_taken_stays_live(self):
+        item = next(item for item in self.items if item.pk == self.ids[0])
+        self.archived_copy(item, title='Another item', date_reported=item.date_reported - timedelta(days=3))
+
+        with self.assertLogs('Lost_Found.archive', 'WARNING'):
+            moved = archive.archive_items(Item.objects.all())
+
+        self.assertEqual(moved, 3)
+        self.assertEqual(list(Item.objects.values_list('pk', flat=True)), [item.pk])
+        self.assertEqual(ItemArchive.objects.get(pk=item.pk).title, 'Another item')
+
+    def test_archivable_and_limit(self):
+        old = timezone.now() - timedelta(days=400)
+        Item.objects.filter(pk__in=self.ids[:3]).update(date_reported=old)
+
+        self.assertEqual(archive.archive_items(chunk_size=1, limit=2), 2)
+        self.assertEqual(archive.archivable().count(), 1)
+
+    def test_delete_sends_no_signals_and_bumps_marker_once(self):
+        Item.objects.filter(pk__in=self.ids[:3]).update(date_reported=timezone.now() - timedelta(days=400))
+        before = ChangeMarker.objects.filter(name='item').values_list('version', flat=True).first() or 0
+        deleted = []
+        receiver = lambda sender, instance, **kwargs: deleted.append(instance.pk)
+        post_delete.connect(receiver, sender=Item)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Item)
+
+        self.assertEqual(archive.archive_items(chunk_size=1), 3)
+
+        self.assertEqual(deleted, [])
+        self.assertEqual(ChangeMarker.objects.get(name='item').version, before + 1)
+        self.assertEqual(set(Item.objects.values_list('pk', flat=True)), set(self.ids[3:]))
+
+    def test_rollup_rebuild_keeps_archived_history(self):
+        rollups.rebuild()
+        before = sorted(DailyItemStat.objects.values_list('day', 'metric', 'category', 'location', 'count'))
+
+        archive.archive_chunk(self.ids[:3])
+        rollups.rebuild()
+
+        self.assertEqual(sorted(DailyItemStat.objects.values_list('day', 'metric', 'category', 'location', 'count')), before)
+
+
+# ================= CAMPUSES ==================
+
+@override_settings(
+    DEFAULT_CAMPUS='main',
+    CAMPUSES={'main': 'default', 'kaduna': 'campus_kaduna'},
+    ARCHIVE_DATABASES={'main': 'archive', 'kaduna': 'archive_kaduna'},
+)
+class CampusRoutingTests(TestCase):
+    def setUp(self):
+        self.router = CampusRouter()
+
+    def test_shared_models_stay_in_default(self):
+        with campus.using_campus('kaduna'):
+            for model in (User, Location, Notification, Task):
+                self.assertEqual(self.router.db_for_read(model), 'default', model)
+                self.assertEqual(self.router.db_for_write(model), 'default', model)
+
+    def test_campus_models_follow_the_active_campus(self):
+        self.assertEqual(self.router.db_for_read(Item), 'default')
+        with campus.using_campus('kaduna'):
+            for model in (Item, Student, Department, DailyItemStat):
+                self.assertEqual(self.router.db_for_write(model), 'campus_kaduna', model)
+        self.assertEqual(self.router.db_for_read(Student), 'default')
+
+    def test_related_rows_stay_next_to_their_instance(self):
+        item = Item(pk=1)
+        item._state.db = 'campus_kaduna'
+
+        self.assertEqual(self.router.db_for_read(Department, instance=item), 'campus_kaduna')
+        self.assertEqual(self.router.db_for_read(User, instance=item), 'default')
+
+    def test_student_of_a_user_is_on_the_users_campus(self):
+        self.assertEqual(self.router.db_for_read(Student, instance=User(campus='kaduna')), 'campus_kaduna')
+        self.assertEqual(self.router.db_for_read(Student, instance=User(campus='')), 'default')
+        self.assertEqual(self.router.db_for_read(Student, instance=User(campus='gone')), 'default')
+
+    def test_relations(self):
+        main_item, kaduna_item, kaduna_student = Item(), Item(), Student()
+        main_item._state.db = 'default'
+        kaduna_item._state.db = kaduna_student._state.db = 'campus_kaduna'
+
+        self.assertFalse(self.router.allow_relation(main_item, kaduna_item))
+        self.assertTrue(self.router.allow_relation(kaduna_item, kaduna_student))
+        self.assertTrue(self.router.allow_relation(kaduna_item, User()))
+        self.assertIsNone(self.router.allow_relation(User(), Location()))
+
+    def test_campus_databases_only_get_campus_tables(self):
+        self.assertTrue(self.router.allow_migrate('campus_kaduna', 'Lost_Found', model_name='item'))
+        self.assertFalse(self.router.allow_migrate('campus_kaduna', 'Lost_Found', model_name='task'))
+        self.assertFalse(self.router.allow_migrate('campus_kaduna', 'auth', model_name='permission'))
+        self.assertIsNone(self.router.allow_migrate('default', 'Lost_Found', model_name='item'))
+
+    def test_each_campus_has_its_own_archive(self):
+        router = ArchiveRouter()
+
+        self.assertEqual(router.db_for_write(ItemArchive), 'archive')
+        with campus.using_campus('kaduna'):
+            self.assertEqual(router.db_for_write(ItemArchive), 'archive_kaduna')
+            self.assertIsNone(router.db_for_write(Item))
+        self.assertTrue(router.allow_migrate('archive_kaduna', 'Lost_Found', model_name='itemarchive'))
+        self.assertFalse(router.allow_migrate('archive_kaduna', 'Lost_Found', model_name='item'))
+        self.assertFalse(router.allow_migrate('campus_kaduna', 'Lost_Found', model_name='itemarchive'))
+
+    def test_unknown_campus(self):
+        with self.assertRaises(campus.UnknownCampus):
+            campus.activate('nowhere')
+        with self.assertRaises(campus.UnknownCampus):
+            campus.alias('nowhere')
+
+    def test_fan_out_runs_each_campus_with_it_active(self):
+        self.assertEqual(campus.fan_out(campus.active), {'main': 'main', 'kaduna': 'kaduna'})
+        self.assertEqual(campus.fan_out(campus.alias, codes=['kaduna']), {'kaduna': 'campus_kaduna'})
+
+    def test_merge_recent_interleaves_by_date_then_id(self):
+        now = timezone.now()
+        results = {
+            'main': [{'id': 9, 'date_reported': now}, {'id': 3, 'date_reported': now - timedelta(days=2)}],
+            'kaduna': [{'id': 4, 'date_reported': now}, {'id': 8, 'date_reported': now - timedelta(days=1)}],
+        }
+
+        merged = campus.merge_recent(results, 3)
+
+        self.assertEqual([(code, row['id']) for code, row in merged], [('main', 9), ('kaduna', 4), ('kaduna', 8)])
+
+
+# ================= NOTIFICATIONS ==================
+
+class FailingConnection:
+    """Email connection whose sends to `fail_for` raise; `open_error` breaks reconnecting."""
+
+    def __init__(self, fail_for=(), open_error=None):
+        self.fail_for = set(fail_for)
+        self.open_error = open_error
+        self.sent = []
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.fail_for:
+                raise OSError('connection reset')
+            self.sent.append(message)
+        return len(messages)
+
+    def close(self):
+        pass
+
+    def open(self):
+        if self.open_error:
+            raise self.open_error
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    NOTIFICATION_MAX_ATTEMPTS=3, NOTIFICATION_RETRY_BASE_SECONDS=60, NOTIFICATION_RETRY_MAX_SECONDS=100,
+)
+class NotificationTests(TestCase):
+    def setUp(self):
+        self.alice = make_user('alice', first_name='Alice')
+        self.bob = make_user('bob')
+        self.item, self.other = make_items(self.alice, 2)
+
+    def test_status_change_writes_outbox_row(self):
+        notifications.notify_item_found(self.item, self.bob, 'Library')
+
+        row = Notification.objects.get()
+        self.assertEqual((row.recipient, row.kind, row.status), (self.alice, 'item_found', 'pending'))
+        self.assertIn('at Library', row.body)
+        self.assertIn(self.bob.email, row.body)
+
+    def test_rows_for_one_recipient_become_one_digest(self):
+        notifications.notify_item_found(self.item, self.bob, '')
+        notifications.notify_item_claimed(self.other, self.bob)
+        notifications.enqueue(self.bob, 'item_found', 'Yours too', 'body')
+
+        self.assertEqual(notifications.deliver_batch(mail.get_connection()), (3, 2, 0))
+
+        by_recipient = {message.to[0]: message for message in mail.outbox}
+        digest = by_recipient[self.alice.email]
+        self.assertEqual(digest.subject, '[AFIT Lost & Found] 2 updates on your AFIT Lost & Found items')
+        self.assertIn('Hello Alice', digest.body)
+        self.assertEqual(by_recipient[self.bob.email].subject, '[AFIT Lost & Found] Yours too')
+        for row in Notification.objects.all():
+            self.assertEqual((row.status, row.attempts), ('sent', 1))
+            self.assertIsNotNone(row.sent_at)
+        self.assertEqual(notifications.deliver_batch(mail.get_connection()), (0, 0, 0))
+
+    def test_failed_send_backs_off_then_gives_up(self):
+        row = notifications.enqueue(self.alice, 'item_found', 'Found', 'body')
+        connection = FailingConnection(fail_for=[self.alice.email])
+
+        with self.assertLogs('Lost_Found.notifications', 'WARNING'):
+            self.assertEqual(notifications.deliver_batch(connection), (0, 0, 1))
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ('pending', 1))
+        self.assertIn('OSError: connection reset', row.last_error)
+        self.assertGreater(row.available_at, timezone.now() + timedelta(seconds=50))
+
+        self.assertEqual(notifications.retry_delay(1), timedelta(seconds=60))
+        self.assertEqual(notifications.retry_delay(2), timedelta(seconds=100))
+
+        for attempts in (2, 3):
+            Notification.objects.filter(pk=row.pk).update(available_at=timezone.now())
+            with self.assertLogs('Lost_Found.notifications', 'WARNING'):
+                notifications.deliver_batch(connection)
+            row.refresh_from_db()
+            self.assertEqual(row.attempts, attempts)
+        self.assertEqual(row.status, 'failed')
+        self.assertEqual(connection.sent, [])
+
+    def test_recipient_without_email_fails(self):
+        User.objects.filter(pk=self.alice.pk).update(email='')
+        notifications.enqueue(self.alice, 'item_found', 'Found', 'body')
+
+        self.assertEqual(notifications.deliver_batch(mail.get_connection()), (0, 0, 1))
+        self.assertEqual(Notification.objects.get().last_error, 'Recipient has no email address.')
+
+    def test_delivered_digests_stay_sent_when_reconnect_fails(self):
+        delivered = notifications.enqueue(self.alice, 'item_found', 'Found', 'body')
+        failing = notifications.enqueue(self.bob, 'item_found', 'Found', 'body')
+        connection = FailingConnection(fail_for=[self.bob.email], open_error=OSError('refused'))
+
+        with self.assertLogs('Lost_Found.notifications', 'WARNING'), self.assertRaises(OSError):
+            notifications.deliver_batch(connection)
+
+        self.assertEqual(len(connection.sent), 1)
+        self.assertEqual(Notification.objects.get(pk=delivered.pk).status, 'sent')
+        self.assertEqual(Notification.objects.get(pk=failing.pk).status, 'pending')
+
+    def test_expired_lease_counts_an_attempt(self):
+        row = notifications.enqueue(self.alice, 'item_found', 'Found', 'body')
+        now = timezone.now()
+        notifications.lease_batch(10, now=now)
+        later = now + timedelta(seconds=notifications.LEASE_SECONDS + 1)
+
+        self.assertEqual(notifications.lease_batch(10, now=now + timedelta(seconds=1)), [])
+        [reclaimed] = notifications.lease_batch(10, now=later)
+        self.assertEqual(reclaimed.attempts, 1)
+
+        # A row whose lease expires on its last attempt is given up on
+        Notification.objects.filter(pk=row.pk).update(attempts=2)
+        self.assertEqual(notifications.lease_batch(10, now=later + timedelta(seconds=notifications.LEASE_SECONDS + 1)), [])
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts, row.last_error), ('failed', 3, notifications.EXPIRED_LEASE))
+
+
+# ================= ITEM DETAIL ==================
+
+class DetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        self.item, self.other = make_items(self.alice, 2)
+
+    def page(self):
+        with mock.patch.object(detail, 'render_body', wraps=detail.render_body) as body, \
+                mock.patch.object(detail, 'render_related', wraps=detail.render_related) as related:
+            page = detail.cached_page(self.item.pk)
+        return page, body.call_count, related.call_count
+
+    def test_second_request_is_served_from_cache(self):
+        page, bodies, related = self.page()
+        self.assertEqual((bodies, related), (1, 1))
+        self.assertEqual(page['item']['title'], self.item.title)
+        self.assertIn(self.item.title, page['html'])
+
+        cached, bodies, related = self.page()
+        self.assertEqual((bodies, related), (0, 0))
+        self.assertEqual(cached, page)
+
+    def test_other_item_write_only_refreshes_related(self):
+        self.page()
+        [match] = make_items(self.bob, 1, status='found')
+
+        page, bodies, related = self.page()
+        self.assertEqual((bodies, related), (0, 1))
+        self.assertIn(reverse('item-detail', args=[match.pk]), page['html'])
+
+    def test_own_write_refreshes_body(self):
+        self.page()
+        self.item.status = 'found'
+        self.item.claimed_by = self.bob
+        self.item.save()
+
+        page, bodies, related = self.page()
+        self.assertEqual((bodies, related), (1, 1))
+        self.assertEqual(page['item']['claimed_by_id'], self.bob.pk)
+
+        # Queryset updates skip the signals but still change the stamp
+        Item.objects.filter(pk=self.item.pk).update(title='Renamed')
+        page, bodies, related = self.page()
+        self.assertEqual((bodies, related), (1, 0))
+        self.assertEqual(page['item']['title'], 'Renamed')
+
+    def test_missing_item(self):
+        with self.assertRaises(Item.DoesNotExist):
+            detail.cached_page(self.item.pk + 100)
+
+
+# ================= ITEM EVENTS ==================
+
+class ItemEventTests(TestCase):
+    def setUp(self):
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        self.carol = make_user('carol')
+        self.request = RequestFactory().get('/')
+        self.request.user = self.bob
+
+    def test_buffered_events_are_written_in_one_insert(self):
+        item, other = make_items(self.alice, 2)
+        events.start_buffer(self.request)
+        events.log_event(self.request, item, 'found', 'lost')
+        events.log_event(self.request, other, 'claimed', 'found')
+        self.assertFalse(ItemEvent.objects.exists())
+
+        with self.assertNumQueries(1):
+            self.assertEqual(events.flush_buffer(self.request), 2)
+        self.assertEqual(set(ItemEvent.objects.values_list('item_id', 'actor_id', 'to_status')),
+                         {(item.pk, self.bob.pk, 'found'), (other.pk, self.bob.pk, 'claimed')})
+        self.assertEqual(events.flush_buffer(self.request), 0)
+
+    def test_without_buffer_event_is_written_at_once(self):
+        [item] = make_items(self.alice, 1)
+        events.log_event(None, item, 'lost', actor=self.alice)
+
+        self.assertEqual(ItemEvent.objects.get().actor, self.alice)
+
+    def test_middleware_flushes_when_the_view_raises(self):
+        [item] = make_items(self.alice, 1)
+
+        def view(request):
+            events.log_event(request, item, 'found', 'lost')
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            ItemEventMiddleware(view)(self.request)
+        self.assertEqual(ItemEvent.objects.get().to_status, 'found')
+
+    def test_feed_has_own_actions_and_events_on_own_reports(self):
+        mine, archived = make_items(self.alice, 2)
+        [bobs] = make_items(self.bob, 1)
+        [unrelated] = make_items(self.carol, 1)
+        start = timezone.now() - timedelta(hours=1)
+        for minutes, item, actor, status in [
+            (1, mine, self.alice, 'lost'),
+            (2, archived, self.alice, 'lost'),
+            (3, bobs, self.alice, 'found'),
+            (4, mine, self.bob, 'found'),
+            (5, unrelated, self.carol, 'found'),
+        ]:
+            ItemEvent.objects.create(item_id=item.pk, actor=actor, to_status=status,
+                                     created_at=start + timedelta(minutes=minutes))
+        archive.archive_chunk([archived.pk])
+
+        feed = events.activity_feed(self.alice)
+
+        self.assertEqual([(event.item_id, event.to_status) for event in feed], [
+            (mine.pk, 'found'), (bobs.pk, 'found'), (archived.pk, 'lost'), (mine.pk, 'lost'),
+        ])
+        self.assertEqual([event.item_title for event in feed], [mine.title, bobs.title, archived.title, mine.title])
+        self.assertEqual(feed[0].actor, self.bob)
+        self.assertEqual(len(events.activity_feed(self.alice, limit=2)), 2)
+        self.assertEqual(events.activity_feed(make_user('dave')), [])
+
+
+# ================= BULK ACTIONS ==================
+
+class BulkActionTests(TestCase):
+    def setUp(self):
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        self.staff = make_user('root', is_staff=True, is_superuser=True)
+        self.items = make_items(self.alice, 5, status='found')
+        self.ids = sorted(item.pk for item in self.items)
+
+    def marker(self):
+        return ChangeMarker.objects.filter(name='item').values_list('version', flat=True).first() or 0
+
+    def stat(self, metric):
+        return sum(DailyItemStat.objects.filter(metric=metric).values_list('count', flat=True))
+
+    def test_verify_over_several_chunks(self):
+        Item.objects.filter(pk=self.ids[0]).update(is_verified=True)
+        before = self.marker()
+
+        updated, skipped = bulk.verify_items(Item.objects.all(), self.staff, chunk_size=2)
+
+        self.assertEqual((updated, skipped), (4, 1))
+        self.assertEqual(self.marker(), before + 1)
+        self.assertFalse(Item.objects.filter(is_verified=False).exists())
+        self.assertEqual(set(Item.objects.exclude(pk=self.ids[0]).values_list('verified_by', flat=True)), {self.staff.pk})
+        self.assertEqual(
+            sorted(ItemAudit.objects.values_list('item_id', 'action', 'actor', 'old_value', 'new_value')),
+            [(pk, 'verify', self.staff.pk, 'False', 'True') for pk in self.ids[1:]],
+        )
+
+    def test_returns_update_rollups_and_history(self):
+        Item.objects.filter(pk=self.ids[0]).update(status='returned')
+        Item.objects.filter(pk=self.ids[1]).update(status='lost')
+        claimed_at = timezone.now() - timedelta(days=2)
+        Item.objects.filter(pk=self.ids[2]).update(date_claimed=claimed_at)
+        before = self.marker()
+
+        updated, skipped = bulk.mark_returned(Item.objects.filter(pk__in=self.ids), self.staff, chunk_size=2)
+
+        self.assertEqual((updated, skipped), (4, 1))
+        self.assertEqual(self.marker(), before + 1)
+        self.assertEqual(set(Item.objects.values_list('status', flat=True)), {'returned'})
+        self.assertFalse(Item.objects.exclude(pk=self.ids[0]).filter(date_claimed__isnull=True).exists())
+        self.assertEqual(Item.objects.get(pk=self.ids[2]).date_claimed, claimed_at)
+        self.assertEqual(
+            sorted(ItemEvent.objects.values_list('item_id', 'actor', 'from_status', 'to_status')),
+            [(self.ids[1], self.staff.pk, 'lost', 'returned')]
+            + [(pk, self.staff.pk, 'found', 'returned') for pk in self.ids[2:]],
+        )
+        self.assertEqual(ItemAudit.objects.filter(action='return').count(), 4)
+        self.assertEqual(self.stat('returned'), 4)
+
+    def test_nothing_eligible_leaves_marker_alone(self):
+        Item.objects.update(status='returned')
+        before = self.marker()
+
+        self.assertEqual(bulk.mark_returned(Item.objects.all(), self.staff, chunk_size=2), (0, 5))
+        self.assertEqual(self.marker(), before)
+        self.assertFalse(ItemAudit.objects.exists())
+
+    def test_reassign_counts_first_claims_only(self):
+        Item.objects.filter(pk=self.ids[0]).update(claimed_by=self.staff)
+        Item.objects.filter(pk=self.ids[1]).update(status='lost')
+        claimed_before = self.stat('claimed')
+
+        updated, skipped = bulk.reassign_claimer(Item.objects.all(), self.bob, self.staff, chunk_size=2)
+
+        self.assertEqual((updated, skipped), (4, 1))
+        self.assertEqual(self.stat('claimed') - claimed_before, 3)
+        self.assertEqual(ItemAudit.objects.get(item_id=self.ids[0]).old_value, str(self.staff.pk))
+        with self.assertRaises(bulk.BulkActionError):
+            bulk.reassign_claimer(Item.objects.all(), None, self.staff)
+
+    def test_admin_actions(self):
+        self.client.force_login(self.staff)
+        url = reverse('admin:Lost_Found_item_changelist')
+
+        response = self.client.post(url, {'action': 'mark_returned', '_selected_action': self.ids[:3]}, follow=True)
+        self.assertContains(response, '3 item(s) marked returned; 0 skipped')
+        self.assertEqual(Item.objects.filter(status='returned').count(), 3)
+
+        response = self.client.post(url, {'action': 'reassign_claimer', '_selected_action': self.ids, 'claimer': 'bob'}, follow=True)
+        self.assertContains(response, '5 item(s) reassigned to bob')
+
+        response = self.client.post(url, {'action': 'reassign_claimer', '_selected_action': self.ids, 'claimer': 'nobody'}, follow=True)
+        self.assertContains(response, 'Enter the username of an existing user')
+
+
+# ================= ROLLUPS ==================
+
+class RollupTests(TestCase):
+    def setUp(self):
+        department = Department.objects.create(name='Cyber Security', code='CYS')
+        self.alice = make_user('alice')
+        Student.objects.create(user=self.alice, matric_no='U25CYS2001', department=department, level='100')
+        self.bob = make_user('bob')
+
+    def counts(self):
+        return {
+            (metric, department, location): count
+            for metric, department, location, count in
+            DailyItemStat.objects.values_list('metric', 'department', 'location', 'count')
+        }
+
+    def snapshot(self):
+        return (
+            sorted(DailyItemStat.objects.values_list('day', 'metric', 'category', 'department', 'location', 'count')),
+            sorted(DailyClaimTime.objects.values_list('day', 'category', 'bucket', 'count')),
+        )
+
+    def walk_through_states(self):
+        [item] = make_items(self.alice, 1)
+        item.status = 'found'
+        item.location_found = 'Cyber  Lab'
+        item.save()
+        item.claimed_by = self.bob
+        item.date_claimed = item.date_occurred + timedelta(hours=2)
+        item.save()
+        item.status = 'returned'
+        item.save()
+        return item
+
+    def test_each_transition_is_counted_once(self):
+        [item] = make_items(self.alice, 1)
+        self.assertEqual(self.counts(), {('reported', 'CYS', 'lab 2'): 1})
+
+        item.status = 'found'
+        item.location_found = 'Cyber  Lab'
+        item.save()
+        item.save()
+        self.assertEqual(self.counts()[('found', 'CYS', 'cyber lab')], 1)
+
+        item.claimed_by = self.bob
+        item.date_claimed = item.date_occurred + timedelta(hours=2)
+        item.save()
+        self.assertEqual(self.counts()[('claimed', 'CYS', 'cyber lab')], 1)
+        self.assertEqual(list(DailyClaimTime.objects.values_list('bucket', 'count')), [(3, 1)])
+
+        item.status = 'returned'
+        item.save()
+        item.save()
+        self.assertEqual(self.counts(), {
+            ('reported', 'CYS', 'lab 2'): 1,
+            ('found', 'CYS', 'cyber lab'): 1,
+            ('claimed', 'CYS', 'cyber lab'): 1,
+            ('returned', 'CYS', 'cyber lab'): 1,
+        })
+
+    def test_update_fields_without_status_skip_the_state_read(self):
+        [item] = make_items(self.alice, 1)
+        item.title = 'Renamed'
+
+        with CaptureQueriesContext(connection) as queries:
+            item.save(update_fields=['title'])
+
+        self.assertIsNone(item._rollup_state)
+        self.assertFalse([q for q in queries if q['sql'].startswith('SELECT') and '"Lost_Found_item"' in q['sql']])
+
+        item.status = 'found'
+        item.save(update_fields=['status'])
+        self.assertEqual(self.counts()[('found', 'CYS', 'lab 2')], 1)
+
+    def test_rebuild_matches_incremental_counts(self):
+        self.walk_through_states()
+        make_items(self.alice, 2)
+        make_items(self.bob, 1, status='found', location_found='Library')
+        incremental = self.snapshot()
+
+        rollups.rebuild()
+
+        self.assertEqual(self.snapshot(), incremental)
+
+    def test_claim_buckets_and_median(self):
+        start = timezone.now()
+        self.assertEqual(rollups.claim_bucket(start, start - timedelta(hours=1)), 1)
+        self.assertEqual(rollups.claim_bucket(start, start + timedelta(hours=1)), 1)
+        self.assertEqual(rollups.claim_bucket(start, start + timedelta(hours=1, seconds=1)), 3)
+        self.assertEqual(rollups.claim_bucket(start, start + timedelta(hours=8761)), rollups.CLAIM_TIME_OVERFLOW)
+
+        self.assertIsNone(rollups.median_claim_hours({}))
+        self.assertEqual(rollups.median_claim_hours({1: 2}), 0.5)
+        self.assertEqual(rollups.median_claim_hours({1: 1, 3: 1}), 1)
+        self.assertAlmostEqual(rollups.median_claim_hours({1: 1, 3: 3}), 1 + 2 * 1 / 3)
+        self.assertEqual(rollups.median_claim_hours({8760: 1}), 5460)
+        self.assertEqual(rollups.median_claim_hours({1: 1, rollups.CLAIM_TIME_OVERFLOW: 3}), 8760)
+
+    def test_history_events(self):
+        now = timezone.now()
+
+        def events(status, location_found='', date_claimed=None, claimed_by_id=None, department='CYS'):
+            stats, claim_times = Counter(), Counter()
+            rollups._history_events(
+                ('books', status, 'Lab 2', location_found, now, now - timedelta(hours=5),
+                 date_claimed, claimed_by_id, department),
+                stats, claim_times,
+            )
+            return {(metric, department, location) for _, metric, _, department, location in stats}, claim_times
+
+        self.assertEqual(events('lost', department=None)[0], {('reported', '', 'lab 2')})
+        self.assertEqual(events('found', 'Library')[0], {('reported', 'CYS', 'lab 2'), ('found', 'CYS', 'library')})
+        # Returned without a found location was never found; claimed needs a date
+        self.assertEqual(events('returned', claimed_by_id=1)[0], {('reported', 'CYS', 'lab 2'), ('returned', 'CYS', 'lab 2')})
+        stats, claim_times = events('returned', 'Library', date_claimed=now, claimed_by_id=1)
+        self.assertIn(('claimed', 'CYS', 'library'), stats)
+        self.assertEqual(list(claim_times.items()), [((timezone.localdate(now), 'books', 6), 1)])
+
+
+class UserDeletionTests(TestCase):
+    def setUp(self):
+        department = Department.objects.create(name='Cyber Security', code='CYS')
+        self.alice = make_user('alice')
+        self.bob = make_user('bob')
+        Student.objects.create(user=self.bob, matric_no='U25CYS2002', department=department, level='200')
+        self.claimed, = make_items(self.alice, 1, status='found', claimed_by=self.bob, verified_by=self.bob)
+        self.reported = make_items(self.bob, 2)
+        ItemEvent.objects.create(item_id=self.claimed.pk, actor=self.bob, to_status='claimed')
+
+    def assert_bob_removed(self):
+        self.assertEqual(list(Item.objects.values_list('pk', 'claimed_by', 'verified_by')), [(self.claimed.pk, None, None)])
+        self.assertFalse(Student.objects.filter(user_id=self.bob.pk).exists())
+        self.assertIsNone(ItemEvent.objects.get().actor_id)
+
+    def test_single_campus_cascades_through_the_orm(self):
+        with mock.patch.object(campus, 'fan_out') as fan_out, self.captureOnCommitCallbacks(execute=True):
+            self.bob.delete()
+
+        self.assert_bob_removed()
+        fan_out.assert_not_called()
+
+    @override_settings(CAMPUSES={'main': 'default', 'kaduna': 'campus_kaduna'})
+    def test_other_campuses_are_cleaned_after_commit(self):
+        with mock.patch.object(campus, 'fan_out') as fan_out:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.bob.delete()
+                fan_out.assert_not_called()
+
+        fan_out.assert_called_once_with(mock.ANY, codes=['kaduna'])
+
+    def test_campus_rows_follow_the_on_delete_rules(self):
+        # The rows of a campus database whose users live elsewhere
+        campus._delete_user_rows_here(self.bob.pk)
+
+        self.assert_bob_removed()
+
+
+# ================= REFERENCE DATA ==================
+
+class RefdataTests(TestCase):
+    def setUp(self):
+        refdata.invalidate()
+        self.addCleanup(refdata.invalidate)
+        self.cys = Department.objects.create(name='Cyber Security', code='CYS')
+
+    def create_department(self, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Department.objects.create(**fields)
+
+    def test_edit_is_visible_at_once_in_this_process(self):
+        self.assertEqual(refdata.departments(), (self.cys,))
+        with self.assertNumQueries(0):
+            refdata.department_by_code('cys')
+
+        eee = self.create_department(name='Electrical Engineering', code='EEE')
+        self.assertEqual(refdata.departments(), (self.cys, eee))
+        self.assertEqual(refdata.department_by_code('eee'), eee)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            eee.delete()
+        self.assertIsNone(refdata.department(eee.pk))
+
+    def test_other_workers_reload_when_the_version_moves(self):
+        # Another process: its own snapshot, only told through the marker
+        worker = refdata.VersionedCache(refdata.DEPARTMENT_MARKER, refdata._load_departments, 'refdata')
+        clock = [1000.0]
+        with mock.patch('Lost_Found.refdata.time.monotonic', lambda: clock[0]):
+            self.assertEqual(worker.get().ordered, (self.cys,))
+            eee = self.create_department(name='Electrical Engineering', code='EEE')
+
+            with self.assertNumQueries(0):
+                self.assertEqual(worker.get().ordered, (self.cys,))
+
+            clock[0] += settings.REFDATA_CHECK_SECONDS
+            self.assertEqual(worker.get().ordered, (self.cys, eee))
+
+            clock[0] += settings.REFDATA_CHECK_SECONDS
+            with self.assertNumQueries(1):
+                worker.get()
+
+    @override_settings(DEFAULT_CAMPUS='main', CAMPUSES={'main': 'default', 'kaduna': 'campus_kaduna'})
+    def test_choice_field_uses_the_active_campus(self):
+        kaduna = Department(pk=self.cys.pk, name='Computer Science', code='CSC')
+        snapshot = refdata._Departments(1, (kaduna,), {kaduna.pk: kaduna}, {'CSC': kaduna})
+        cache = refdata.VersionedCache(refdata.DEPARTMENT_MARKER, refdata._load_departments, 'refdata')
+        cache.snapshot, cache.checked_at = snapshot, time.monotonic()
+        field = DepartmentChoiceField(queryset=Department.objects.all())
+
+        with mock.patch.dict(refdata._departments, {'campus_kaduna': cache}):
+            self.assertEqual(field.clean(str(self.cys.pk)).code, 'CYS')
+            with campus.using_campus('kaduna'):
+                self.assertEqual(field.clean(str(self.cys.pk)).code, 'CSC')
+                self.assertEqual([label for _, label in field.choices][1:], [str(kaduna)])
+                with self.assertRaises(ValidationError):
+                    field.clean(str(self.cys.pk + 1))
+
+
+# ================= ACCOUNT AVAILABILITY ==================
+
+class AvailabilityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = make_user('alice')
+        self.department = Department.objects.create(name='Cyber Security', code='CYS')
+
+    def test_normalize(self):
+        self.assertEqual(availability.normalize('username', '  bob '), 'bob')
+        self.assertEqual(availability.normalize('matric_no', ' u25cys2001 '), 'U25CYS2001')
+        for field, value in [('username', 'bad name!'), ('email', 'nope'), ('username', '  '), ('matric_no', 'U25')]:
+            with self.assertRaises(ValidationError, msg=(field, value)):
+                availability.normalize(field, value)
+
+    def test_taken_values_match_case_insensitively(self):
+        self.assertEqual(availability.check('username', 'ALICE'), (False, availability.TAKEN_MESSAGES['username']))
+        self.assertEqual(availability.check('username', 'bad name!')[0], False)
+
+    def test_available_answer_is_cached(self):
+        self.assertEqual(availability.check('username', 'carol'), (True, ''))
+        with self.assertNumQueries(0):
+            self.assertEqual(availability.check('username', 'Carol'), (True, ''))
+
+    def test_new_user_and_student_drop_cached_answers(self):
+        self.assertTrue(availability.check('username', 'carol')[0])
+        self.assertTrue(availability.check('matric_no', 'U25CYS2002')[0])
+
+        carol = make_user('carol')
+        Student.objects.create(user=carol, matric_no='U25CYS2002', department=self.department, level='100')
+
+        self.assertFalse(availability.check('username', 'carol')[0])
+        self.assertFalse(availability.check('matric_no', 'u25cys2002')[0])
+
+    def test_email_only_checks_the_format_by_default(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(availability.check('email', self.alice.email), (True, availability.EMAIL_FORMAT_MESSAGE))
+        self.assertFalse(availability.check('email', 'not-an-email')[0])
+        with self.settings(AVAILABILITY_CONFIRM_EMAILS=True):
+            self.assertFalse(availability.check('email', self.alice.email.upper())[0])
+            self.assertTrue(availability.check('email', 'carol@afit.edu.ng')[0])
+            make_user('carol')
+            self.assertFalse(availability.check('email', 'carol@afit.edu.ng')[0])
+
+    @override_settings(AVAILABILITY_RATE_LIMIT=2)
+    def test_endpoint_is_rate_limited_per_ip(self):
+        url = reverse('api-account-availability', args=['username'])
+        # One rate window throughout
+        patcher = mock.patch.object(availability.time, 'time', return_value=1200.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for _ in range(2):
+            self.assertEqual(self.client.get(url, {'value': 'bob'}).json()['available'], True)
+        with self.assertLogs('django.request', 'WARNING'):
+            response = self.client.get(url, {'value': 'bob'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+        self.assertEqual(self.client.get(url, {'value': 'bob'}, REMOTE_ADDR='10.0.0.2').status_code, 200)
+        availability.time.time.return_value = 1260.0
+        self.assertEqual(self.client.get(url, {'value': 'bob'}).status_code, 200)
+        with self.assertLogs('django.request', 'WARNING'):
+            self.assertEqual(self.client.get(reverse('api-account-availability', args=['phone'])).status_code, 404)
+
+
+# ================= AUTOCOMPLETE ==================
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        autocomplete._indexes.clear()
+        self.addCleanup(autocomplete._indexes.clear)
+
+    def test_prefix_range_is_ranked_by_count(self):
+        index = autocomplete.SuggestionIndex()
+        index.add('title', 'lanyard')
+        index.add('title', 'laptop', 3)
+        index.add('title', 'lamp', 2)
+        index.add('title', 'lb')
+        index.add('category', 'Electronics', 5, value='electronics')
+
+        self.assertEqual([s['text'] for s in index.suggest('la')], ['laptop', 'lamp', 'lanyard'])
+        self.assertEqual(index.suggest('LAP '), [{'text': 'laptop', 'kind': 'title', 'count': 3}])
+        self.assertEqual([s['text'] for s in index.suggest('la', limit=2)], ['laptop', 'lamp'])
+        self.assertEqual(index.suggest('el'), [{'text': 'Electronics', 'kind': 'category', 'count': 5, 'value': 'electronics'}])
+        self.assertEqual(index.suggest('lax'), [])
+        self.assertEqual(index.suggest(''), [])
+
+    def test_locations_match_on_every_word(self):
+        index = autocomplete.SuggestionIndex()
+        index.add('location', 'library lane')
+        index.add('location', 'main library hall', 2)
+
+        self.assertEqual([s['text'] for s in index.suggest('hall')], ['main library hall'])
+        # Both places appear once although each has several keys under "l"
+        self.assertEqual([s['text'] for s in index.suggest('l')], ['main library hall', 'library lane'])
+        self.assertEqual(index.suggest('ain'), [])
+
+    @override_settings(AUTOCOMPLETE_REFRESH_BATCH=1)
+    def test_refresh_adds_new_items_in_batches(self):
+        user = make_user()
+        make_items(user, 1, title='Laptop bag', location_lost='Hostel')
+        index = autocomplete.build()
+        Item.objects.create(title='Lanyard', description='d', category='others', status='lost',
+                            date_occurred=timezone.now(), reported_by=user)
+        Item.objects.create(title='Lamp', description='d', category='others', status='lost',
+                            date_occurred=timezone.now(), reported_by=user, location_lost='Main Library')
+
+        autocomplete.refresh(index)
+        self.assertEqual(sorted(s['text'] for s in index.suggest('la')), ['lanyard', 'laptop'])
+        autocomplete.refresh(index)
+        self.assertEqual(sorted(s['text'] for s in index.suggest('la')), ['lamp', 'lanyard', 'laptop'])
+        self.assertEqual(index.suggest('lib')[0]['text'], 'main library')
+        self.assertEqual(index.max_id, Item.objects.latest('id').pk)
+        # The last batch was full, so one more look finds nothing and catches up
+        autocomplete.refresh(index)
+        with self.assertNumQueries(1):
+            autocomplete.refresh(index)
+
+    def test_suggest_endpoint(self):
+        make_items(make_user(), 2, title='Laptop')
+        self.client.force_login(make_user('bob'))
+        url = reverse('api-item-suggest')
+
+        response = self.client.get(url, {'q': 'lap'})
+
+        self.assertEqual(response.json()['suggestions'], [{'text': 'laptop', 'kind': 'title', 'count': 2}])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn(f'max-age={settings.AUTOCOMPLETE_MAX_AGE}', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        self.assertEqual(self.client.get(url, {'q': 'l'}).json()['suggestions'], [])
+
+
+# ================= GAZETTEER ==================
+
+def offset(latitude, longitude, north_m, east_m):
+    """Coordinates `north_m` / `east_m` metres away on the haversine sphere."""
+    metres_per_degree = math.radians(gazetteer.EARTH_RADIUS_M)
+    return (
+        latitude + north_m / metres_per_degree,
+        longitude + east_m / (metres_per_degree * math.cos(math.radians(latitude))),
+    )
+
+
+class GazetteerTests(TestCase):
+    ORIGIN = (10.6, 7.4)
+
+    def setUp(self):
+        gazetteer.invalidate()
+        self.addCleanup(gazetteer.invalidate)
+
+    def create_location(self, name, latitude, longitude, aliases=()):
+        with self.captureOnCommitCallbacks(execute=True):
+            location = Location.objects.create(name=name, latitude=latitude, longitude=longitude)
+            for alias in aliases:
+                LocationAlias.objects.create(location=location, alias=alias)
+        return location
+
+    def test_resolve_by_name_and_alias(self):
+        lab = self.create_location('Lab 2', *self.ORIGIN, aliases=['Cyber lab 2', 'Library'])
+        library = self.create_location('Library', *self.ORIGIN)
+
+        for text in ('lab 2', 'LAB-2', 'lab2', 'cyber  lab 2'):
+            self.assertEqual(gazetteer.resolve(text).id, lab.pk, text)
+        # A place's own name wins over another place's alias
+        self.assertEqual(gazetteer.resolve('library').id, library.pk)
+        self.assertIsNone(gazetteer.resolve('hostel'))
+        self.assertIsNone(gazetteer.resolve('--'))
+
+        item = make_items(make_user(), 1, location_lost='cyber-lab-2', location_found='Hostel')[0]
+        self.assertEqual((item.lost_place_id, item.location_lost), (lab.pk, 'Lab 2'))
+        self.assertEqual((item.found_place_id, item.location_found), (None, 'Hostel'))
+
+    def test_covering_cells_contain_every_point_in_the_radius(self):
+        rng = random.Random(44)
+        for latitude, longitude in (self.ORIGIN, (59.9, 10.7), (-33.9, 151.2)):
+            for radius in (20, 300, 5000):
+                cells = gazetteer.covering_cells(latitude, longitude, radius)
+                self.assertLessEqual(len(cells), 9)
+                for _ in range(200):
+                    distance, bearing = radius * math.sqrt(rng.random()) * 0.999, rng.uniform(0, 2 * math.pi)
+                    point = offset(latitude, longitude, distance * math.cos(bearing), distance * math.sin(bearing))
+                    geohash = gazetteer.encode_geohash(*point)
+                    self.assertTrue(any(geohash.startswith(cell) for cell in cells), (latitude, radius, point))
+
+    def test_nearby_place_ids_applies_the_exact_radius(self):
+        origin = self.create_location('Library', *self.ORIGIN)
+        inside = [
+            self.create_location('North', *offset(*self.ORIGIN, 290, 0)),
+            self.create_location('South west', *offset(*self.ORIGIN, -200, -200)),
+        ]
+        # In the covering cells (the corners of the box) but farther than 300 m
+        self.create_location('Corner', *offset(*self.ORIGIN, 250, 250))
+        self.create_location('East', *offset(*self.ORIGIN, 0, 320))
+
+        nearby = gazetteer.nearby_place_ids(gazetteer.place(origin.pk), 300)
+
+        self.assertEqual(sorted(nearby), sorted([origin.pk] + [place.pk for place in inside]))
+
+    def test_normalize_existing_in_chunks(self):
+        items = make_items(make_user(), 5, location_lost='lab2')
+        Item.objects.filter(pk=items[0].pk).update(location_lost='Hostel')
+        lab = self.create_location('Lab 2', *self.ORIGIN)
+        version = ChangeMarker.objects.get(name='item').version
+        progress = []
+
+        unmatched = Counter()
+        self.assertEqual(gazetteer.normalize_existing(chunk_size=2, dry_run=True, unmatched=unmatched), (5, 4))
+        self.assertEqual(unmatched, Counter({'Hostel': 1}))
+        self.assertFalse(Item.objects.filter(lost_place=lab).exists())
+        self.assertFalse(Task.objects.exists())
+
+        result = gazetteer.normalize_existing(chunk_size=2, on_chunk=lambda *args: progress.append(args))
+
+        self.assertEqual(result, (5, 4))
+        self.assertEqual(progress, [(2, 2), (4, 4), (5, 4)])
+        self.assertEqual(Item.objects.filter(lost_place=lab, location_lost='Lab 2').count(), 4)
+        self.assertEqual(ChangeMarker.objects.get(name='item').version, version + 1)
+        self.assertEqual(list(Task.objects.values_list('name', flat=True)), ['rebuild_rollups'])
+        self.assertEqual(gazetteer.normalize_existing(chunk_size=2), (5, 0))
+
+
+# ================= FACETS ==================
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.other = make_user('bob')
+        make_items(self.user, PAGE_SIZE + 3, status='found', title='Black phone')
+        make_items(self.user, 2, status='found', title='Blue umbrella', category='others', claimed_by=self.other)
+        make_items(self.user, 3, status='lost', title='Black wallet', category='accessories')
+        old = make_items(self.user, 4, status='found', title='Black book', category='books', claimed_by=self.other)
+        Item.objects.filter(pk__in=[item.pk for item in old[:3]]).update(date_occurred=timezone.now() - timedelta(days=3))
+        Item.objects.filter(pk=old[3].pk).update(date_occurred=timezone.now() - timedelta(days=30))
+
+    def assert_matches_counts(self, status, search=''):
+        counts = facets.compute(status, {'search': search})
+
+        def count(**filters):
+            return filter_items(status, {'search': search, **filters}).count()
+
+        self.assertEqual(counts['total'], count())
+        for value, _ in Item.CATEGORY_CHOICES:
+            self.assertEqual(counts['category'][value], count(category=value), value)
+        for name in DATE_BUCKETS:
+            self.assertEqual(counts['date'][name], count(date=name), name)
+        if status == 'found':
+            for value in ('claimed', 'unclaimed'):
+                self.assertEqual(counts['claim'][value], count(claim=value), value)
+
+    def test_compute_matches_per_value_counts(self):
+        for status in ('lost', 'found'):
+            for search in ('', 'black', 'umbrella', 'nothing'):
+                with self.subTest(status=status, search=search):
+                    self.assert_matches_counts(status, search)
+
+    def test_cached_until_items_change(self):
+        filters = {'search': 'black'}
+        total = facets.facet_counts('found', filters)['total']
+        with self.assertNumQueries(1):
+            # Only the version lookup
+            self.assertEqual(facets.facet_counts('found', filters)['total'], total)
+
+        make_items(self.user, 1, status='found', title='Black phone')
+        self.assertEqual(facets.facet_counts('found', filters)['total'], total + 1)
+
+    def test_search_text_is_not_folded_into_another_cache_entry(self):
+        for search in ('black phone', 'black  phone', 'BLACK PHONE'):
+            expected = filter_items('found', {'search': search}).count()
+            self.assertEqual(facets.facet_counts('found', {'search': search})['total'], expected, search)
+        self.assertEqual(facets.facet_counts('found', {'search': 'black  phone'})['total'], 0)
+
+    def test_list_pages_use_the_facet_total_as_the_list_size(self):
+        self.client.force_login(self.user)
+        for name, status in (('lost-item', 'lost'), ('found-item', 'found')):
+            for params in ({}, {'search': 'black'}, {'category': 'books'}, {'search': 'black', 'date': 'week'},
+                           {'claim': 'unclaimed'}):
+                with self.subTest(name=name, params=params):
+                    response = self.client.get(reverse(name), params)
+                    expected = filter_items(status, list_filters(params)).count()
+                    self.assertEqual(response.context['total_items'], expected)
+                    page = response.context[f'{status}_items']
+                    self.assertEqual(page.paginator.count, expected)
+                    self.assertEqual(page.paginator.num_pages, max(1, math.ceil(expected / PAGE_SIZE)))
+
+
+# ================= MY REPORTS ==================
+
+class MyReportsTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.other = make_user('bob')
+        make_items(self.user, PAGE_SIZE + 2)
+        make_items(self.user, 3, status='found')
+        make_items(self.user, 2, status='found', claimed_by=self.other)
+        make_items(self.user, 1, status='returned', claimed_by=self.other)
+        make_items(self.other, 4)
+        # Ties on date_reported are broken by id
+        Item.objects.filter(reported_by=self.user, status='found').update(date_reported=timezone.now())
+
+    def expected(self, **filters):
+        items = Item.objects.filter(reported_by=self.user, **filters)
+        return [item.pk for item in sorted(items, key=lambda item: (item.date_reported, item.pk), reverse=True)]
+
+    def walk(self, status=''):
+        self.client.force_login(self.user)
+        seen, cursor = [], None
+        while True:
+            params = {'status': status, **({'cursor': cursor} if cursor else {})}
+            response = self.client.get(reverse('my-report'), params)
+            self.assertEqual(response.context['is_first_page'], not cursor)
+            seen += [item.pk for item in response.context['items']]
+            cursor = response.context['next_cursor']
+            if cursor is None:
+                return seen
+
+    def test_pages_cover_every_report_once(self):
+        self.assertEqual(self.walk(), self.expected())
+
+    def test_status_filter(self):
+        self.assertEqual(self.walk('lost'), self.expected(status='lost'))
+        self.assertEqual(self.walk('found'), self.expected(status='found'))
+        self.assertEqual(self.walk('claimed'), self.expected(claimed_by__isnull=False))
+        # Unknown values show everything
+        self.assertEqual(self.walk('bogus'), self.expected())
+
+    def test_counts(self):
+        self.assertEqual(report_counts(self.user), {
+            'total': PAGE_SIZE + 8, 'lost': PAGE_SIZE + 2, 'found': 5, 'returned': 1, 'claimed': 3,
+        })
+        with self.assertNumQueries(1):
+            report_counts(self.other)
+
+    def test_query_plan_walks_the_reporter_index(self):
+        cursor = encode_cursor(Item.objects.filter(reported_by=self.user).order_by('-date_reported', '-id')[3])
+        for status in ('',) + REPORT_STATUSES:
+            for page_cursor in (None, cursor):
+                with self.subTest(status=status, cursor=page_cursor):
+                    plan = after_cursor(reported_items(self.user, status), page_cursor)[:PAGE_SIZE + 1].explain()
+                    self.assertIn('item_reporter_recent_idx', plan)
+                    self.assertNotIn('TEMP B-TREE', plan)
+
+
+# ================= STARTUP ==================
+
+class WarmupTests(TestCase):
+    def setUp(self):
+        self.reset_caches()
+        self.addCleanup(self.reset_caches)
+
+    def reset_caches(self):
+        refdata.invalidate()
+        gazetteer.invalidate()
+        autocomplete._indexes.clear()
+
+    def test_run_on_a_migrated_database(self):
+        department = Department.objects.create(name='Cyber Security', code='CYS')
+        make_items(make_user(), 1, title='Laptop')
+
+        timings = warmup.run()
+
+        self.assertEqual(list(timings), ['connections', 'routes', 'templates', 'caches'])
+        self.assertEqual(warmup.last_run, timings)
+        self.assertGreater(warmup.compile_templates(), 0)
+        with self.assertNumQueries(0):
+            self.assertEqual(refdata.departments(), (department,))
+            self.assertEqual(gazetteer.places(), [])
+            self.assertEqual(autocomplete.suggest('lap')[0]['text'], 'laptop')
+
+    def test_run_before_migrate(self):
+        models = (ChangeMarker, Department, Item, Location, LocationAlias)
+        # Rolled back with the test transaction
+        with connection.cursor() as cursor:
+            for model in models:
+                cursor.execute(f'ALTER TABLE "{model._meta.db_table}" RENAME TO "{model._meta.db_table}_hidden"')
+
+        with self.assertLogs('Lost_Found', 'WARNING') as logs:
+            timings = warmup.run()
+
+        self.assertEqual(set(timings), {'connections', 'routes', 'templates', 'caches'})
+        self.assertEqual(
+            sorted(record.getMessage() for record in logs.records),
+            ['Autocomplete index not preloaded', 'Reference data not preloaded', 'Reference data not preloaded'],
+        )
+        self.assertIsNone(gazetteer._gazetteer.snapshot)
+
+
+def completed(returncode=0, import_us=(300000, 200000), stderr=''):
+    lines = ['import time: self [us] | cumulative | imported package']
+    lines += [f'import time: {us:>9} | {us:>10} | pkg{n}.sub' for n, us in enumerate(import_us)]
+    # The WSGI module's own time is not counted
+    lines.append('import time:   9000000 |    9000000 | Cyber_GST_project.wsgi')
+    stdout = json.dumps({'ready_ms': 650.0, 'warmup_ms': {'connections': 1.0, 'caches': 5.0}})
+    return subprocess.CompletedProcess([], returncode, stdout=stdout + '\n', stderr='\n'.join(lines) + stderr)
+
+
+@override_settings(WSGI_APPLICATION='Cyber_GST_project.wsgi.application')
+class BenchStartupTests(TestCase):
+    def bench(self, results, **options):
+        out = io.StringIO()
+        with mock.patch('Lost_Found.management.commands.bench_startup.subprocess.run', side_effect=results) as run:
+            call_command('bench_startup', stdout=out, **options)
+        self.assertEqual(run.call_count, len(results))
+        return out.getvalue()
+
+    def test_within_budget(self):
+        output = self.bench([completed(), completed(import_us=(100000,)), completed(import_us=(900000,))], budget_ms=600)
+
+        self.assertIn('median: imports 500 ms', output)
+        self.assertIn('pkg0', output)
+        self.assertIn('within the 600 ms budget', output)
+
+    def test_over_budget_fails(self):
+        with self.assertRaisesMessage(CommandError, 'Import time 500 ms is over the 400 ms budget'):
+            self.bench([completed()], runs=1, budget_ms=400)
+
+    def test_failing_child_fails(self):
+        with self.assertRaisesMessage(CommandError, 'ImproperlyConfigured'):
+            self.bench([completed(returncode=1, stderr='\nImproperlyConfigured: boom')], runs=1)
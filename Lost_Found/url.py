@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     path('', views.index, name='index'),  # Add this line
@@ -12,9 +12,13 @@ urlpatterns = [
 # ============= Student Urls =========
 
     path('std-board/', views.student_dashboard, name='std-board'),
+    path('my-report/', views.my_reports, name='my-report'),
     path('lost-item/', views.lost_item, name='lost-item'),
+    path('lost-item/results/', views.lost_item_results, name='lost-item-results'),
     path('found-item/', views.found_item, name='found-item'),
+    path('found-item/results/', views.found_item_results, name='found-item-results'),
     path('report-item/', views.report_item, name='report-item'),
+    path('item/<int:item_id>/', views.item_detail, name='item-detail'),
    
 
     path('claim-item/<int:item_id>/', views.claim_item, name='claim_item'),
@@ -24,7 +28,18 @@ urlpatterns = [
  
 
     
+# ============= API Urls =========
+
+    path('api/v1/items/', api.item_list, name='api-item-list'),
+    path('api/v1/items/search/', api.item_search, name='api-item-search'),
+    path('api/v1/items/stats/', api.item_stats, name='api-item-stats'),
+    path('api/v1/items/suggest/', api.item_suggest, name='api-item-suggest'),
+    path('api/v1/items/<int:item_id>/', api.item_detail, name='api-item-detail'),
+    path('api/v1/accounts/available/<str:field>/', api.account_availability, name='api-account-availability'),
+
+
 # ============= Admin Urls  =========
 
     path('admin-dashboard/', views.admin_dashboard, name='admin_dashboard'),
+    path('metrics', views.metrics_view, name='metrics'),
 ]
\ No newline at end of file
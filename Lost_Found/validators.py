@@ -0,0 +1,66 @@
+# Lost_Found/validators.py
+"""
+Matric number and phone number rules shared by the registration form, the
+model clean() methods and the bulk importer.
+"""
+from django.core.exceptions import ValidationError
+
+
+def normalize_phone(phone_number):
+    """Return the 11-digit phone number, or raise ValidationError."""
+    # Remove any non-digit characters
+    phone_digits = ''.join(filter(str.isdigit, phone_number))
+
+    # Validate exactly 11 digits
+    if len(phone_digits) != 11:
+        raise ValidationError('Phone number must be exactly 11 digits.')
+
+    # Validate starts with 0
+    if not phone_digits.startswith('0'):
+        raise ValidationError('Phone number must start with 0.')
+
+    return phone_digits
+
+
+def normalize_matric_no(matric_no):
+    """Return the upper-cased matric number, or raise ValidationError.
+
+    Format: U + Year (2 digits) + Department Code (3 letters) + Number (4 digits),
+    e.g. U25CYS2001.
+    """
+    matric_no = (matric_no or '').strip().upper()
+
+    if not matric_no:
+        raise ValidationError('Matric number is required.')
+
+    # Validate length exactly 10
+    if len(matric_no) != 10:
+        raise ValidationError('Matric number must be exactly 10 characters.')
+
+    # Validate format: U25CYS2001
+    if not matric_no.startswith('U'):
+        raise ValidationError('Matric number must start with "U".')
+
+    # Validate year digits
+    if not matric_no[1:3].isdigit():
+        raise ValidationError('Characters 2-3 must be year digits (e.g., 25 for 2025).')
+
+    # Validate department code (3 uppercase letters)
+    department_code = matric_no[3:6]
+    if not department_code.isalpha() or not department_code.isupper():
+        raise ValidationError('Characters 4-6 must be uppercase department code letters (e.g., CYS for Cyber Security).')
+
+    # Validate serial number (4 digits)
+    if not matric_no[6:].isdigit():
+        raise ValidationError('Characters 7-10 must be numeric.')
+
+    return matric_no
+
+
+def check_matric_department(matric_no, department):
+    """Raise ValidationError if the matric number's code is not the department's."""
+    department_code = matric_no[3:6]
+    if department.code.upper() != department_code:
+        raise ValidationError(
+            f'Matric number department code "{department_code}" does not match selected department "{department.name}" (code: {department.code}).'
+        )
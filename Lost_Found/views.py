@@ -2,18 +2,36 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login, authenticate, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
 from django.core.paginator import Paginator
 from django.utils import timezone
-from datetime import timedelta
+from django.utils.safestring import mark_safe
+import logging
 
 from .forms import *
+from .conditional import item_page_conditional
+from .detail import PEOPLE, cached_page, load_item
+from .facets import category_chips, facet_counts
+from .filters import (
+    PAGE_SIZE, REPORT_STATUSES, cursor_page, encode_cursor, filter_items, list_filters, report_counts,
+    reported_items,
+)
+from .events import activity_feed, log_event
+from .logs import mask
+from .notifications import notify_item_claimed, notify_item_found
+from .tasks import enqueue_on_commit
+from . import campus, gazetteer, metrics, refdata, rollups
 from .models import Item, Student, User
 
+logger = logging.getLogger(__name__)
+
 
 # ================= HOME & AUTH ==================
 import random
 
+@item_page_conditional
 def index(request):
  
     all_items = list(Item.objects.all())
@@ -54,24 +72,24 @@ def register_page(request):
         form = StudentRegistrationForm(request.POST)
         if form.is_valid():
             try:
-                # Create user
-                user = User.objects.create_user(
-                    username=form.cleaned_data['username'],
-                    email=form.cleaned_data['email'],
-                    password=form.cleaned_data['password1'],
-                    first_name=form.cleaned_data['first_name'],
-                    last_name=form.cleaned_data['last_name'],
-                    phone_number=form.cleaned_data['phone_number'],
-                    user_type='student'
-                )
-                
-                # Create student profile
-                Student.objects.create(
-                    user=user,
-                    matric_no=form.cleaned_data['matric_no'],
-                    department=form.cleaned_data['department'],
-                    level=form.cleaned_data['level']
-                )
+                # User and Student together, so a failure never leaves a half-registered account
+                with campus.atomic():
+                    user = User.objects.create_user(
+                        username=form.cleaned_data['username'],
+                        email=form.cleaned_data['email'],
+                        password=form.cleaned_data['password1'],
+                        first_name=form.cleaned_data['first_name'],
+                        last_name=form.cleaned_data['last_name'],
+                        phone_number=form.cleaned_data['phone_number'],
+                        user_type='student',
+                        campus=campus.active(),
+                    )
+                    Student.objects.create(
+                        user=user,
+                        matric_no=form.cleaned_data['matric_no'],
+                        department=form.cleaned_data['department'],
+                        level=form.cleaned_data['level']
+                    )
                 
                 messages.success(request, 'Registration successful! You can now login.')
                 return redirect('my_login')
@@ -93,11 +111,9 @@ def my_login(request):
             return render(request, "Lost_Found/homePages/my-login.html")
         user = authenticate(request, username=username, password=password)
         
-        print(f"👤 DEBUG: Authentication result: {user}")
-        
         if user:
             login(request, user)
-            print(f"✅ DEBUG: Login successful for: {user.username}")
+            logger.debug('login success', extra={'user_id': user.pk})
             messages.success(request, f'Welcome back, {user.get_full_name() or user.username}!')
             
             if not user.is_verified:
@@ -109,7 +125,7 @@ def my_login(request):
             else:  
                 return redirect('std-board')
         else:
-            print("❌ DEBUG: Authentication failed")
+            logger.debug('login failed', extra={'login_ref': mask(username)})
         
         messages.error(request, 'Invalid matric number/email or password.')
     
@@ -119,90 +135,90 @@ def my_login(request):
 
 
  # ================= STUDENT DASHBOARD ==================
+# Newest reports shown on the dashboard; the rest are on "my reports"
+DASHBOARD_REPORTS = 6
 
 
 def student_dashboard(request):
-    user_items = Item.objects.filter(reported_by=request.user)
-    myReports = user_items.count()
-    lost_count = user_items.filter(status='lost').count()
-    found_count = user_items.filter(status='found').count()
-    claimed_count = user_items.filter(status='claimed').count()
-    items = user_items.order_by('-date_reported')
-    category_choices = []
-    try:
-        if hasattr(Item, 'CATEGORY_CHOICES'):
-            category_choices = Item.CATEGORY_CHOICES
-        elif hasattr(Item, 'CATEGORIES'):
-            category_choices = Item.CATEGORIES
-        elif hasattr(Item, 'category'):  
-            category_field = Item._meta.get_field('category')
-            if hasattr(category_field, 'choices') and category_field.choices:
-                category_choices = category_field.choices
-    except:
-        category_choices = [
-            ('electronics', 'Electronics'),
-            ('documents', 'Documents'),
-            ('clothing', 'Clothing'),
-            ('accessories', 'Accessories'),
-            ('books', 'Books'),
-            ('other', 'Other'),
-        ]
+    counts = report_counts(request.user)
+    items, more_reports = cursor_page(reported_items(request.user), size=DASHBOARD_REPORTS)
     
     context = {
-        'myReports': myReports,
-        'lost_count': lost_count,
-        'found_count': found_count,
-        'claimed_count': claimed_count,
+        'myReports': counts['total'],
+        'lost_count': counts['lost'],
+        'found_count': counts['found'],
+        'claimed_count': counts['claimed'],
         'items': items,
-        'categories': category_choices,
+        'more_reports': more_reports is not None,
+        'categories': refdata.CATEGORY_CHOICES,
+        'activity': activity_feed(request.user),
     }
     
     return render(request, "Lost_Found/studentPage/std-board.html", context)
 
 
-# ================= LOST ITEMS ==================
+# ================= MY REPORTS ==================
 @login_required
-def lost_item(request):
-    lost_items = Item.objects.filter(status='lost').order_by('-date_reported')
-
-    # Search
-    search_query = request.GET.get('search', '')
-    if search_query:
-        lost_items = lost_items.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(location_lost__icontains=search_query) |
-            Q(category__icontains=search_query)
-        )
+@item_page_conditional
+def my_reports(request):
+    status = request.GET.get('status', '')
+    if status not in REPORT_STATUSES:
+        status = ''
+    cursor = request.GET.get('cursor')
+    items, next_cursor = cursor_page(reported_items(request.user, status), cursor)
+    counts = report_counts(request.user)
 
-    # Category filter
-    category_filter = request.GET.get('category', '')
-    if category_filter:
-        lost_items = lost_items.filter(category=category_filter)
+    context = {
+        'myReports': counts['total'],
+        'lost_count': counts['lost'],
+        'found_count': counts['found'],
+        'claimed_count': counts['claimed'],
+        'items': items,
+        'categories': refdata.CATEGORY_CHOICES,
+        'statuses': REPORT_STATUSES,
+        'selected_status': status,
+        'is_first_page': not cursor,
+        'next_cursor': next_cursor,
+    }
+
+    return render(request, 'Lost_Found/studentPage/my-report.html', context)
 
-    # Date filter
-    date_filter = request.GET.get('date', '')
-    if date_filter == 'today':
-        lost_items = lost_items.filter(date_occurred__gte=timezone.now() - timedelta(days=1))
-    elif date_filter == 'week':
-        lost_items = lost_items.filter(date_occurred__gte=timezone.now() - timedelta(days=7))
+
+# ================= LOST ITEMS ==================
+@login_required
+@item_page_conditional
+def lost_item(request):
+    filters = list_filters(request.GET)
+    lost_items = _result_cards('lost', filters)
+    facets = facet_counts('lost', filters, request)
 
     # Pagination
-    paginator = Paginator(lost_items, 10)
+    paginator = Paginator(lost_items, PAGE_SIZE)
+    if not (filters['category'] or filters['date'] or filters['claim']):
+        # No chip selected: the facet total is the list size, skip the COUNT query
+        paginator.count = facets['total']
     page_obj = paginator.get_page(request.GET.get('page'))
 
     context = {
         'lost_items': page_obj,
-        'categories': Item.CATEGORY_CHOICES,
-        'search_query': search_query,
-        'selected_category': category_filter,
-        'selected_date': date_filter,
-        'total_items': lost_items.count(),
+        'categories': category_chips(facets),
+        'facets': facets,
+        'search_query': filters['search'],
+        'selected_category': filters['category'],
+        'selected_date': filters['date'],
+        'total_items': paginator.count,
+        'next_cursor': encode_cursor(page_obj[len(page_obj) - 1]) if page_obj.has_next() else None,
     }
 
     return render(request, 'Lost_Found/studentPage/lost-item.html', context)
 
 
+@login_required
+@item_page_conditional
+def lost_item_results(request):
+    return _item_results(request, 'lost', 'Lost_Found/studentPage/partials/lost-item-list.html')
+
+
 # ================= REPORT ITEM ==================
 @login_required
 def report_item(request):
@@ -214,6 +230,12 @@ def report_item(request):
             item = form.save(commit=False)
             item.reported_by = request.user
             item.save()
+            log_event(request, item, item.status)
+            metrics.ITEMS_REPORTED.inc(status=item.status)
+            enqueue_on_commit('match_item', {'item_id': item.pk})
+            if item.image:
+                metrics.UPLOAD_BYTES.inc(item.image.size)
+                enqueue_on_commit('process_item_image', {'item_id': item.pk})
             messages.success(request, f'Item "{item.title}" has been reported successfully!')
             return redirect('std-board')
     
@@ -222,61 +244,80 @@ def report_item(request):
 
 # ================= FOUND ITEMS ==================
 @login_required
+@item_page_conditional
 def found_item(request):
-    found_items = Item.objects.filter(status='found').order_by('-date_reported')
-
-    search_query = request.GET.get('search', '')
-    if search_query:
-        found_items = found_items.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(location_found__icontains=search_query) |
-            Q(category__icontains=search_query)
-        )
-
-    # Category filter
-    category_filter = request.GET.get('category', '')
-    if category_filter:
-        found_items = found_items.filter(category=category_filter)
-
-    # Claim filter
-    claim_filter = request.GET.get('claim', '')
-    if claim_filter == 'unclaimed':
-        found_items = found_items.filter(claimed_by__isnull=True)
-    elif claim_filter == 'claimed':
-        found_items = found_items.filter(claimed_by__isnull=False)
-
-    # Date filter
-    date_filter = request.GET.get('date', '')
-    if date_filter == 'today':
-        found_items = found_items.filter(date_occurred__gte=timezone.now() - timedelta(days=1))
-    elif date_filter == 'week':
-        found_items = found_items.filter(date_occurred__gte=timezone.now() - timedelta(days=7))
+    filters = list_filters(request.GET)
+    found_items = _result_cards('found', filters)
+    facets = facet_counts('found', filters, request)
 
     # Pagination
-    paginator = Paginator(found_items, 10)
+    paginator = Paginator(found_items, PAGE_SIZE)
+    if not (filters['category'] or filters['date'] or filters['claim']):
+        # No chip selected: the facet total is the list size, skip the COUNT query
+        paginator.count = facets['total']
     page_obj = paginator.get_page(request.GET.get('page'))
 
     context = {
         'found_items': page_obj,
-        'categories': Item.CATEGORY_CHOICES,
-        'search_query': search_query,
-        'selected_category': category_filter,
-        'selected_date': date_filter,
-        'selected_claim': claim_filter,
-        'total_items': found_items.count(),
+        'categories': category_chips(facets),
+        'facets': facets,
+        'search_query': filters['search'],
+        'selected_category': filters['category'],
+        'selected_date': filters['date'],
+        'selected_claim': filters['claim'],
+        'selected_near': filters['near'],
+        'places': gazetteer.places(),
+        'total_items': paginator.count,
+        'next_cursor': encode_cursor(page_obj[len(page_obj) - 1]) if page_obj.has_next() else None,
     }
     
     return render(request, 'Lost_Found/studentPage/found-item.html', context)
 
 
+@login_required
+@item_page_conditional
+def found_item_results(request):
+    return _item_results(request, 'found', 'Lost_Found/studentPage/partials/found-item-list.html')
+
+
+def _result_cards(status, filters):
+    """filter_items() with the reporter and claimer the cards show loaded alongside."""
+    return campus.select_people(filter_items(status, filters), *PEOPLE)
+
+
+def _item_results(request, status, template_name):
+    """Render just the result cards for a filter change or the next scroll page.
+
+    The next-page cursor goes in X-Next-Cursor; the first page of a filter
+    change also reports the total in X-Total-Count.
+    """
+    filters = list_filters(request.GET)
+    items = _result_cards(status, filters)
+    cursor = request.GET.get('cursor', '')
+    page_items, next_cursor = cursor_page(items, cursor)
+
+    context = {
+        'items': page_items,
+        'continuation': bool(cursor),
+        'search_query': filters['search'],
+        'selected_category': filters['category'],
+        'selected_date': filters['date'],
+        'selected_claim': filters['claim'],
+    }
+    response = render(request, template_name, context)
+    response['X-Next-Cursor'] = next_cursor or ''
+    if not cursor:
+        response['X-Total-Count'] = str(items.count())
+    return response
+
+
 
 # ================= CLAIM ITEM ==================
 @login_required
 def claim_item(request, item_id):
 
     try:
-        item = Item.objects.get(id=item_id)
+        item = load_item(item_id)
         if item.status != 'found':
             messages.error(request, 'Only found items can be claimed.')
             return redirect('found-item')
@@ -291,7 +332,12 @@ def claim_item(request, item_id):
         
         item.claimed_by = request.user
         item.date_claimed = timezone.now()
-        item.save()
+        with campus.atomic():
+            item.save()
+            notify_item_claimed(item, request.user)
+            enqueue_on_commit('deliver_notifications', unique=True)
+        log_event(request, item, 'claimed', from_status=item.status)
+        metrics.ITEMS_CLAIMED.inc()
         
         messages.success(
             request, 
@@ -313,7 +359,7 @@ def claim_item(request, item_id):
 @login_required
 def claim_confirmation(request, item_id):
     try:
-        item = Item.objects.get(id=item_id)
+        item = load_item(item_id)
         if item.status != 'found':
             messages.error(request, 'Only found items can be claimed.')
             return redirect('found-item')
@@ -335,12 +381,35 @@ def claim_confirmation(request, item_id):
 
 
 
+# ================= ITEM DETAIL ==================
+@login_required
+@item_page_conditional
+def item_detail(request, item_id):
+    try:
+        page = cached_page(item_id, request)
+    except Item.DoesNotExist:
+        messages.error(request, 'Item not found.')
+        return redirect('found-item')
+
+    item = page['item']
+    is_owner = item['reported_by_id'] == request.user.pk
+    context = {
+        'item': item,
+        'body': mark_safe(page['html']),
+        'is_owner': is_owner,
+        'can_claim': item['status'] == 'found' and not item['claimed_by_id'] and not is_owner,
+        'can_mark_found': item['status'] == 'lost' and not is_owner,
+        'user_has_claimed': item['claimed_by_id'] == request.user.pk,
+    }
+    return render(request, 'Lost_Found/studentPage/item-detail.html', context)
+
+
 # ================= MARK ITEM AS FOUND ==================
 @login_required
 def mark_as_found(request, item_id):
    
     try:
-        item = Item.objects.get(id=item_id)
+        item = load_item(item_id)
         if item.status != 'lost':
             messages.error(request, 'Only lost items can be marked as found.')
             return redirect('lost-item')
@@ -350,7 +419,12 @@ def mark_as_found(request, item_id):
             return redirect('lost-item')
         item.status = 'found'
         item.location_found = request.POST.get('found_location', 'Not specified')
-        item.save()
+        with campus.atomic():
+            item.save()
+            notify_item_found(item, request.user, item.location_found)
+            enqueue_on_commit('deliver_notifications', unique=True)
+        log_event(request, item, 'found', from_status='lost')
+        metrics.ITEMS_MARKED_FOUND.inc()
         
 
         messages.success(
@@ -374,7 +448,7 @@ def mark_as_found(request, item_id):
 @login_required
 def found_confirmation(request, item_id):
     try:
-        item = Item.objects.get(id=item_id)
+        item = load_item(item_id)
         
         # Check if item is lost
         if item.status != 'lost':
@@ -396,7 +470,12 @@ def found_confirmation(request, item_id):
             # Update item
             item.status = 'found'
             item.location_found = found_location
-            item.save()
+            with campus.atomic():
+                item.save()
+                notify_item_found(item, request.user, found_location)
+                enqueue_on_commit('deliver_notifications', unique=True)
+            log_event(request, item, 'found', from_status='lost')
+            metrics.ITEMS_MARKED_FOUND.inc()
             
             messages.success(
                 request, 
@@ -417,7 +496,69 @@ def found_confirmation(request, item_id):
         return redirect('lost-item')
 
 # ================= ADMIN DASHBOARD ==================
+DASHBOARD_RANGES = (7, 30, 90, 365)
+
+def _bar_rows(rows, metric_keys):
+    """Attach a bar width (% of the largest value) to each (label, counts) row."""
+    peak = max((counts[key] for _, counts in rows for key in metric_keys), default=0) or 1
+    return [
+        {'label': label, 'counts': counts,
+         'bars': [(key, counts[key], round(100 * counts[key] / peak)) for key in metric_keys]}
+        for label, counts in rows
+    ]
+
 def admin_dashboard(request):
     if not request.user.is_authenticated or request.user.user_type != 'admin':
         return redirect('my_login')
-    return render(request, "Lost_Found/admin_dashboard.html")
+    
+    try:
+        days = int(request.GET.get('days', 30))
+    except ValueError:
+        days = 30
+    if days not in DASHBOARD_RANGES:
+        days = 30
+    
+    summary = rollups.dashboard_summary(days)
+    metric_keys = rollups.METRICS
+    category_names = dict(Item.CATEGORY_CHOICES)
+    claim_peak = max(summary['claim_time_buckets'].values(), default=0) or 1
+    median = summary['median_claim_hours']
+    
+    context = {
+        'days': days,
+        'ranges': DASHBOARD_RANGES,
+        'summary': summary,
+        'metric_labels': dict(rollups.DailyItemStat.METRIC_CHOICES),
+        'daily': _bar_rows(summary['daily'].items(), metric_keys),
+        'by_category': _bar_rows(
+            sorted(((category_names.get(key, key), counts) for key, counts in summary['by_category'].items()),
+                   key=lambda row: -row[1]['reported']),
+            metric_keys),
+        'by_department': _bar_rows(
+            sorted(summary['by_department'].items(), key=lambda row: -row[1]['reported']),
+            metric_keys),
+        'top_locations': summary['top_locations'],
+        'claim_times': [
+            (bound, summary['claim_time_buckets'].get(bound, 0),
+             round(100 * summary['claim_time_buckets'].get(bound, 0) / claim_peak))
+            for bound in rollups.CLAIM_TIME_BUCKETS + (rollups.CLAIM_TIME_OVERFLOW,)
+        ],
+        'median_claim_hours': median,
+        'median_claim_days': median / 24 if median is not None else None,
+        'claim_time_overflow': rollups.CLAIM_TIME_OVERFLOW,
+    }
+    return render(request, "Lost_Found/admin_dashboard.html", context)
+
+
+# ================= METRICS ==================
+def metrics_view(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+    has_token = bool(token) and constant_time_compare(auth_header, f'Bearer {token}')
+    if not has_token and not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponseForbidden('Forbidden')
+
+    return HttpResponse(
+        metrics.registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
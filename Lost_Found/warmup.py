@@ -0,0 +1,102 @@
+# Lost_Found/warmup.py
+"""
+Work a fresh process would otherwise do during its first requests.
+
+    run() -> {'connections': ms, 'routes': ms, 'templates': ms, 'caches': ms}
+
+wsgi.py calls run() right after the application is loaded. Under gunicorn
+with preload_app (see gunicorn.conf.py) that happens once in the master,
+and every worker is forked from a process that has already compiled the
+templates, built the URL resolver and loaded the reference caches. Database
+connections cannot be shared across a fork: the master closes them before
+forking and each worker opens its own with open_connections().
+"""
+import logging
+import os
+import time
+
+from django.db import DatabaseError, connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.urls import get_resolver
+
+from . import autocomplete, gazetteer, refdata
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIXES = ('.html', '.txt', '.xml')
+
+# Timings of the most recent run() in this process, for bench_startup
+last_run = {}
+
+
+def open_connections():
+    """Connect to every configured database (runs the init_command pragmas too)."""
+    for alias in connections:
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError as e:
+            logger.warning("Database not reachable during warmup", extra={'database': alias, 'error': str(e)})
+
+
+def close_connections():
+    """Close this process's connections; call in the gunicorn master before forking."""
+    connections.close_all()
+
+
+def _populate(resolver):
+    count = sum(1 for key in resolver.reverse_dict if isinstance(key, str))
+    for _, sub_resolver in resolver.namespace_dict.values():
+        count += _populate(sub_resolver)
+    return count
+
+
+def resolve_routes():
+    """Build the reverse lookup tables of the root and every namespaced resolver; returns the route names."""
+    return _populate(get_resolver())
+
+
+def compile_templates():
+    """Compile every template file into the engines' cached loaders; returns the number compiled."""
+    count = 0
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            for root, _, files in os.walk(directory):
+                for filename in files:
+                    if not filename.endswith(TEMPLATE_SUFFIXES):
+                        continue
+                    name = os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/')
+                    try:
+                        engine.get_template(name)
+                    except (TemplateDoesNotExist, TemplateSyntaxError) as e:
+                        # Partials of third-party apps may only compile in their own context
+                        logger.debug("Template not precompiled", extra={'template': name, 'error': str(e)})
+                        continue
+                    count += 1
+    return count
+
+
+def prime_caches():
+    refdata.warm()
+    gazetteer.warm()
+    autocomplete.warm()
+
+
+STEPS = (
+    ('connections', open_connections),
+    ('routes', resolve_routes),
+    ('templates', compile_templates),
+    ('caches', prime_caches),
+)
+
+
+def run():
+    """Run every warmup step; returns the milliseconds each one took."""
+    timings = {}
+    for name, step in STEPS:
+        started = time.perf_counter()
+        step()
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    last_run.clear()
+    last_run.update(timings)
+    logger.info("Process warmed up", extra={'pid': os.getpid(), **{f'{name}_ms': ms for name, ms in timings.items()}})
+    return timings
@@ -0,0 +1,48 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings; picked up automatically when gunicorn runs from the
+project directory:
+
+    gunicorn
+
+The application is imported once in the master (preload_app) and warmed
+there by wsgi.py (Lost_Found/warmup.py). Workers fork from the warm master,
+so a new worker, after a deploy or a max_requests recycle, does not pay for
+imports, template compilation or cache loading on its first requests.
+Database connections are the exception: the master closes its connections
+before forking and each worker opens its own.
+
+Every value can be overridden from the environment (GUNICORN_*), or on the
+command line as usual.
+"""
+import multiprocessing
+import os
+
+wsgi_app = 'Cyber_GST_project.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = timeout
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+# Recycle workers to bound memory growth; the jitter keeps them from restarting together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+
+
+def pre_fork(server, worker):
+    # A SQLite (or any) connection must not be used by two processes
+    if server.cfg.preload_app:
+        from Lost_Found import warmup
+
+        warmup.close_connections()
+
+
+def post_fork(server, worker):
+    # Without preloading the app is not imported yet; wsgi.py warms each worker on import
+    if server.cfg.preload_app:
+        from Lost_Found import warmup
+
+        warmup.open_connections()
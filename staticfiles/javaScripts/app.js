@@ -462,7 +462,8 @@ function initializeFoundItemsPage() {
             searchTimer = setTimeout(() => {
                 const form = this.closest('form');
                 if (form) {
-                    form.submit();
+                    // requestSubmit() fires the submit event so the fragment loader can take over
+                    form.requestSubmit ? form.requestSubmit() : form.submit();
                 }
             }, 500);
         });
@@ -485,6 +486,92 @@ function initializeFoundItemsPage() {
     });
 }
 
+// ================== ITEM RESULTS (FRAGMENTS) ==================
+// lost-item.html / found-item.html: filter changes and infinite scroll fetch
+// only the rendered result cards from the /results/ endpoints.
+
+function initializeItemResults() {
+    const results = document.getElementById('itemResults');
+    if (!results || !results.dataset.resultsUrl) return;
+
+    const resultsUrl = results.dataset.resultsUrl;
+    const sentinel = document.getElementById('itemResultsSentinel');
+    const total = document.getElementById('itemResultsTotal');
+    const chips = document.querySelector('[data-filter-chips]');
+    const searchForm = document.querySelector(`form[action="${window.location.pathname}"]`);
+    let query = new URLSearchParams(window.location.search);
+    let nextCursor = results.dataset.nextCursor || '';
+    let loading = false;
+
+    query.delete('page');
+    // Infinite scroll replaces the numbered pager
+    document.querySelectorAll('[data-item-pagination]').forEach(el => el.classList.add('hidden'));
+
+    function fetchResults(cursor) {
+        const params = new URLSearchParams(query);
+        if (cursor) params.set('cursor', cursor);
+        loading = true;
+        return fetch(`${resultsUrl}?${params.toString()}`, {
+            headers: { 'X-Requested-With': 'XMLHttpRequest' },
+            credentials: 'same-origin'
+        })
+        .then(response => {
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            nextCursor = response.headers.get('X-Next-Cursor') || '';
+            const count = response.headers.get('X-Total-Count');
+            if (total && count !== null) total.textContent = count;
+            return response.text();
+        })
+        .finally(() => { loading = false; });
+    }
+
+    function applyFilters(params) {
+        query = params;
+        query.delete('page');
+        history.replaceState(null, '', `${window.location.pathname}?${query.toString()}`);
+        fetchResults('')
+            .then(html => { results.innerHTML = html; })
+            .catch(() => { window.location.search = query.toString(); });
+    }
+
+    if (chips) {
+        const active = (chips.dataset.activeClass || '').split(' ').filter(Boolean);
+        const inactive = (chips.dataset.inactiveClass || '').split(' ').filter(Boolean);
+        chips.querySelectorAll('a').forEach(chip => {
+            chip.addEventListener('click', function(e) {
+                e.preventDefault();
+                chips.querySelectorAll('a').forEach(c => {
+                    c.classList.remove(...active);
+                    c.classList.add(...inactive);
+                });
+                this.classList.remove(...inactive);
+                this.classList.add(...active);
+                applyFilters(new URL(this.href).searchParams);
+            });
+        });
+    }
+
+    if (searchForm) {
+        searchForm.addEventListener('submit', function(e) {
+            e.preventDefault();
+            const params = new URLSearchParams(query);
+            const search = new FormData(this).get('search') || '';
+            if (search) params.set('search', search); else params.delete('search');
+            applyFilters(params);
+        });
+    }
+
+    if (sentinel && 'IntersectionObserver' in window) {
+        const observer = new IntersectionObserver(entries => {
+            if (!entries[0].isIntersecting || loading || !nextCursor) return;
+            fetchResults(nextCursor)
+                .then(html => { results.insertAdjacentHTML('beforeend', html); })
+                .catch(error => console.error('Error loading more items:', error));
+        }, { rootMargin: '400px' });
+        observer.observe(sentinel);
+    }
+}
+
 // ================== ITEM DETAIL PAGE ==================
 
 function initializeItemDetailPage() {
@@ -561,6 +648,51 @@ function markAsFound(itemId, itemTitle, defaultLocation) {
     }
 }
 
+// ================== SEARCH AUTOCOMPLETE ==================
+
+function initializeSearchAutocomplete() {
+    document.querySelectorAll('input[data-autocomplete-url]').forEach(function(input, n) {
+        const url = input.dataset.autocompleteUrl;
+        const list = document.createElement('datalist');
+        list.id = `searchSuggestions${n}`;
+        input.after(list);
+        input.setAttribute('list', list.id);
+
+        let timer = null;
+        let controller = null;
+
+        input.addEventListener('input', function() {
+            clearTimeout(timer);
+            const query = input.value.trim();
+            if (query.length < 2) {
+                list.innerHTML = '';
+                return;
+            }
+            timer = setTimeout(function() {
+                // Only the latest prefix matters; cancel a slower earlier request
+                if (controller) controller.abort();
+                controller = new AbortController();
+                fetch(`${url}?q=${encodeURIComponent(query)}`, {
+                    signal: controller.signal,
+                    credentials: 'same-origin'
+                })
+                .then(response => response.ok ? response.json() : null)
+                .then(data => {
+                    if (!data) return;
+                    list.innerHTML = '';
+                    data.suggestions.forEach(suggestion => {
+                        const option = document.createElement('option');
+                        option.value = suggestion.text;
+                        option.label = `${suggestion.kind} (${suggestion.count})`;
+                        list.appendChild(option);
+                    });
+                })
+                .catch(() => {});
+            }, 150);
+        });
+    });
+}
+
 // ================== MAIN INITIALIZATION ==================
 
 document.addEventListener('DOMContentLoaded', function() {
@@ -573,6 +705,12 @@ document.addEventListener('DOMContentLoaded', function() {
     // Initialize found items page (found-item.html)
     initializeFoundItemsPage();
     
+    // Fragment loading for lost-item.html / found-item.html
+    initializeItemResults();
+
+    // Search box suggestions for lost-item.html / found-item.html
+    initializeSearchAutocomplete();
+    
     // Initialize item detail page (item-detail.html)
     initializeItemDetailPage();
     